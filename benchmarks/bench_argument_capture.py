@@ -0,0 +1,77 @@
+"""
+Benchmark capturing the arguments of a logged call with a large numpy array argument.
+
+Before, the arguments were deep copied when they were registered to the object before and after the call, and
+pickled again to be recorded. Now they are pickled once with `LoggableObject.capture_log_and_record_args`, and the
+same snapshot is registered and recorded. The peak of the memory allocated while capturing is measured with
+tracemalloc.
+
+Usage:
+    python benchmarks/bench_argument_capture.py [array_size_in_megabytes]
+"""
+import copy
+import pickle
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from labchronicle import LoggableObject
+
+
+def deepcopy_and_pickle(obj: LoggableObject, args: list, kwargs: dict):
+    """
+    Capture the arguments as before: two deep copies to register them, and a pickle to record them.
+    """
+    for _ in range(2):
+        copy.deepcopy(args)
+        copy.deepcopy(kwargs)
+    return np.void(pickle.dumps(args)), np.void(pickle.dumps(kwargs))
+
+
+def capture_once(obj: LoggableObject, args: list, kwargs: dict):
+    """
+    Capture the arguments once, the snapshot is registered and recorded as it is.
+    """
+    return obj.capture_log_and_record_args(args, kwargs)
+
+
+def measure(capture, obj: LoggableObject, args: list, kwargs: dict, repeat: int = 5) -> tuple:
+    """
+    Measure the time and the peak memory allocation of capturing the arguments.
+
+    Parameters:
+        capture (Callable): The capture function.
+        obj (LoggableObject): The object of the logged call.
+        args (list): The arguments.
+        kwargs (dict): The keyword arguments.
+        repeat (int): The number of repetitions, the best time is returned.
+
+    Returns:
+        tuple: The best time in seconds and the peak of the allocated memory in bytes.
+    """
+    best_time = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        capture(obj, args, kwargs)
+        best_time = min(best_time, time.perf_counter() - start)
+
+    tracemalloc.start()
+    capture(obj, args, kwargs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return best_time, peak
+
+
+if __name__ == "__main__":
+    size = float(sys.argv[1]) if len(sys.argv) > 1 else 16
+
+    waveform = np.random.default_rng(0).normal(size=int(size * 2 ** 20 / 8))
+    args, kwargs = [waveform, 1.0], {"channels": [1, 2], "waveform_q": waveform.copy()}
+    obj = LoggableObject()
+
+    for name, capture in [("deepcopy + pickle", deepcopy_and_pickle), ("capture once", capture_once)]:
+        elapsed, peak = measure(capture, obj, args, kwargs)
+        print(f"{name:18}  {elapsed * 1e3:8.2f} ms  peak {peak / 2 ** 20:8.1f} MiB")
@@ -0,0 +1,78 @@
+"""
+Benchmark the cost of reading the attributes of a loggable object, with and without an active record entry.
+
+Without an active record entry, the reads should cost the same as the reads of a plain object. With an active record
+entry, each read of a data attribute is marked as touched in the record entry.
+
+Usage:
+    python benchmarks/bench_attribute_tracking.py [number_of_reads]
+"""
+import sys
+import time
+
+from labchronicle.core import LoggableObject
+
+
+class PlainObject(object):
+    def __init__(self):
+        self.value = 1
+
+    def method(self):
+        return 0
+
+
+class TrackedObject(LoggableObject):
+    def __init__(self):
+        super().__init__()
+        self.value = 1
+
+    def method(self):
+        return 0
+
+
+class NullRecordEntry(object):
+    """
+    A record entry that ignores the touched attributes, to measure the tracking alone.
+    """
+
+    def touch_attribute(self, key):
+        pass
+
+
+def read_attributes(obj, number_of_reads: int) -> float:
+    """
+    Time reading a data attribute and a method of the object.
+
+    Parameters:
+        obj (object): The object to read from.
+        number_of_reads (int): The number of reads of each attribute.
+
+    Returns:
+        float: The elapsed time in seconds.
+    """
+    start = time.perf_counter()
+    for _ in range(number_of_reads):
+        obj.value
+        obj.method
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+    tracked_object = TrackedObject()
+    record_entry = NullRecordEntry()
+
+    cases = [("plain object", PlainObject(), False), ("tracking off", tracked_object, False),
+             ("tracking on", tracked_object, True)]
+
+    for name, obj, tracking in cases:
+        if tracking:
+            obj.set_record_entry(record_entry)
+
+        elapsed = read_attributes(obj, n)
+
+        if tracking:
+            obj.set_record_entry()
+
+        print(f"{name:13}  {2 * n} reads  {elapsed:.3f} s  {elapsed / (2 * n) * 1e9:.1f} ns/read")
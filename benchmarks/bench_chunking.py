@@ -0,0 +1,80 @@
+"""
+Benchmark reading a 2D (sweep x samples) array stored with different chunk shapes: one row, one column and the whole
+array. The chunk shapes are guessed by h5py, or chosen by the chunking policy of the HDF5 handler for each access
+pattern. The arrays are compressed with lzf, so each read decompresses the whole chunks it touches. The rows and
+columns read are far apart, so the reads do not hit the chunk cache. Consecutive rows of the column layout, whose
+row reads touch many chunks, are then read with the default chunk cache and one that holds all of them.
+
+Usage:
+    python benchmarks/bench_chunking.py [sweep_points] [samples]
+"""
+import sys
+import tempfile
+import time
+
+import h5py
+import numpy as np
+
+from labchronicle.handlers import RecordHandlerHDF5
+
+
+def mean_time(read, indices: list) -> float:
+    """
+    Measure the mean time of reading each of the indices. The indices are far apart, so the reads do not share
+    chunks and each read decompresses its chunks again.
+
+    Parameters:
+        read (Callable): Reads the data at an index.
+        indices (list): The indices to read.
+
+    Returns:
+        float: The mean time in seconds.
+    """
+    start = time.perf_counter()
+    for index in indices:
+        read(index)
+    return (time.perf_counter() - start) / len(indices)
+
+
+if __name__ == "__main__":
+    sweep_points = int(sys.argv[1]) if len(sys.argv) > 1 else 512
+    samples = int(sys.argv[2]) if len(sys.argv) > 2 else 16384
+
+    rng = np.random.default_rng(0)
+    sweep = np.cumsum(rng.normal(size=(sweep_points, samples)), axis=1)
+    compression = {"array": {"codec": "lzf"}}
+
+    with tempfile.TemporaryDirectory() as directory:
+        # The chunk shape guessed by h5py, as the handler did before the chunking policy.
+        with h5py.File(f"{directory}/guess.hdf5", "w") as f:
+            f.create_dataset("sweep", data=sweep, chunks=True, compression="lzf")
+
+        files = [("h5py guess", f"{directory}/guess.hdf5")]
+        for access_pattern in ["row", "column", "balanced"]:
+            log_path = f"{directory}/{access_pattern}.hdf5"
+            handler = RecordHandlerHDF5({"log_path": log_path, "hdf5_compression": compression,
+                                         "hdf5_access_pattern": access_pattern})
+            handler.init_new_record_book()
+            handler.add_record("/sweep", sweep)
+            files.append((access_pattern, log_path))
+
+        print(f"array {sweep.shape} {sweep.nbytes / 2 ** 20:.0f} MiB")
+        for name, log_path in files:
+            with h5py.File(log_path, "r") as f:
+                dataset = f["sweep"]
+                row = mean_time(lambda i: dataset[i], list(range(0, sweep_points, sweep_points // 8)))
+                column = mean_time(lambda i: dataset[:, i], list(range(0, samples, samples // 8)))
+                full = mean_time(lambda i: dataset[()], [0, 0])
+                print(f"{name:11}  chunks {str(dataset.chunks):13}  row {row * 1e3:8.2f} ms  "
+                      f"column {column * 1e3:8.2f} ms  full {full * 1e3:8.2f} ms")
+
+        # Reading consecutive rows decompresses the same chunks again, unless they all stay in the chunk cache.
+        for cache_size in [None, sweep.nbytes * 2]:
+            handler = RecordHandlerHDF5({"log_path": f"{directory}/column.hdf5", "hdf5_chunk_cache_size": cache_size,
+                                         "hdf5_chunk_cache_slots": 10007})
+            handler.load_record_book()
+            with handler._open_file("r") as f:
+                dataset = f["sweep"]
+                rows = mean_time(lambda i: dataset[i], list(range(64)))
+            cache = "default" if cache_size is None else f"{cache_size // 2 ** 20} MiB"
+            print(f"column, chunk cache {cache:8}  consecutive rows {rows * 1e3:8.2f} ms")
@@ -0,0 +1,83 @@
+"""
+Benchmark the compression policies of the HDF5 handler.
+
+For each policy, digitizer-like float arrays (noisy ADC traces and smooth averaged signals) are written to a new
+record book, and the write throughput and the compression ratio are reported.
+
+Usage:
+    python benchmarks/bench_compression.py [number_of_records]
+"""
+import pathlib
+import sys
+import tempfile
+import time
+
+import h5py
+import numpy as np
+
+from labchronicle.handlers import RecordHandlerHDF5
+
+policies = {
+    "none": {"hdf5_compression": {"array": {"codec": None}}},
+    "gzip-1": {"hdf5_compression": {"array": {"codec": "gzip", "level": 1}}},
+    "gzip-4": {"hdf5_compression": {"array": {"codec": "gzip", "level": 4}}},
+    "gzip-9": {"hdf5_compression": {"array": {"codec": "gzip", "level": 9}}},
+    "lzf": {"hdf5_compression": {"array": {"codec": "lzf"}}},
+    "adaptive gzip-1": {
+        "hdf5_compression": {"array": {"codec": "gzip", "level": 1}},
+        "hdf5_adaptive_compression": True,
+    },
+}
+
+
+def make_data() -> dict:
+    """
+    Make the sample data.
+
+    Returns:
+        dict: The sample arrays by name.
+    """
+    samples = np.linspace(0, 100, 2 ** 18)
+    return {
+        "noisy trace": np.random.normal(size=2 ** 18),
+        "smooth signal": np.round(np.sin(samples), 4),
+    }
+
+
+def run_benchmark(policy: dict, data: np.ndarray, number_of_records: int):
+    """
+    Write the data with the given policy.
+
+    Parameters:
+        policy (dict): The handler config of the policy.
+        data (np.ndarray): The array to write.
+        number_of_records (int): The number of times to write the array.
+
+    Returns:
+        tuple: The throughput in MB/s and the compression ratio.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config = dict(policy, log_path=str(pathlib.Path(tmp_dir) / "bench.hdf5"))
+        handler = RecordHandlerHDF5(config)
+        handler.init_new_record_book()
+
+        start = time.perf_counter()
+        for i in range(number_of_records):
+            handler.add_record(f"/root/{i}", data)
+        elapsed = time.perf_counter() - start
+
+        with h5py.File(config["log_path"], "r") as f:
+            stored_size = sum(f[f"/root/{i}"].id.get_storage_size() for i in range(number_of_records))
+
+    raw_size = data.nbytes * number_of_records
+    return raw_size / elapsed / 1e6, raw_size / stored_size
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+    for data_name, data in make_data().items():
+        print(data_name)
+        for policy_name, policy in policies.items():
+            throughput, ratio = run_benchmark(policy, data, n)
+            print(f"  {policy_name:16} {throughput:8.1f} MB/s  ratio {ratio:5.2f}")
@@ -0,0 +1,72 @@
+"""
+Benchmark the per call overhead of the `log_and_record` and `log_event` decorators without an active record book,
+where the decorated function is simply executed.
+
+The arguments of the calls are bound with the binding plan of the function. For comparison, the same decorator is
+built with `decorator.decorator`, which binds the arguments with `inspect.Signature.bind` on every call.
+
+Usage:
+    python benchmarks/bench_decorator_overhead.py [number_of_calls]
+"""
+import logging
+import sys
+import time
+
+import decorator
+
+from labchronicle import LoggableObject, log_and_record, log_event
+from labchronicle.decorators import _log_and_record
+
+
+@decorator.decorator
+def signature_log_and_record(func, overwrite_func_name=None, *args, **kwargs):
+    return _log_and_record(func, args, kwargs, overwrite_func_name=overwrite_func_name)
+
+
+class SampleClass(LoggableObject):
+    def plain(self, a, b, c=1, *, d=2):
+        return a
+
+    @signature_log_and_record
+    def signature_bound(self, a, b, c=1, *, d=2):
+        return a
+
+    @log_and_record
+    def recorded(self, a, b, c=1, *, d=2):
+        return a
+
+    @log_event
+    def event(self, a, b, c=1, *, d=2):
+        return a
+
+
+def call(method, number_of_calls: int) -> float:
+    """
+    Time calling a method with positional and keyword arguments.
+
+    Parameters:
+        method (Callable): The method to call.
+        number_of_calls (int): The number of calls.
+
+    Returns:
+        float: The elapsed time in seconds.
+    """
+    start = time.perf_counter()
+    for i in range(number_of_calls):
+        method(i, 2, c=3)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    # Silence the warnings about the missing active record book, which are logged on every call.
+    logging.disable(logging.WARNING)
+
+    sample = SampleClass()
+    cases = [("plain method", sample.plain), ("Signature.bind", sample.signature_bound),
+             ("log_and_record", sample.recorded), ("log_event", sample.event)]
+
+    for name, method in cases:
+        elapsed = call(method, n)
+        print(f"{name:15}  {n} calls  {elapsed:.3f} s  {elapsed / n * 1e6:.2f} us/call")
@@ -0,0 +1,71 @@
+"""
+Benchmark the HDF5 handler with and without the persistent file session.
+
+Each iteration writes the datasets of a typical `log_and_record` call (metadata, arguments, return values, a few
+attributes and the object snapshot) and lists the parent group, as `Chronicle.new_record` does.
+
+Usage:
+    python benchmarks/bench_hdf5_session.py [number_of_records]
+"""
+import pathlib
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from labchronicle.handlers import RecordHandlerHDF5
+
+
+def write_records(handler: RecordHandlerHDF5, number_of_records: int):
+    """
+    Write the records of `number_of_records` function calls to the handler.
+
+    Parameters:
+        handler (RecordHandlerHDF5): The handler to write to.
+        number_of_records (int): The number of function calls to record.
+    """
+    data = np.random.rand(100)
+    for i in range(number_of_records):
+        handler.list_records("/root")
+        path = pathlib.Path(f"/root/{i}-Experiment.run")
+        handler.add_record(path / "__timestamp__", i)
+        handler.add_record(path / "__record_id__", f"record-{i}")
+        handler.add_record(path / "__name__", "Experiment.run")
+        handler.add_record(path / "__args__", (i, 2))
+        handler.add_record(path / "__kwargs__", {"repeat": 10})
+        handler.add_record(path / "data", data)
+        handler.add_record(path / "__return_values__", None)
+        handler.add_record(path / "__object__", {"data": data, "index": i})
+        handler.add_record(path / "__touched_attributes__", ["data"])
+        handler.add_record(f"/uuid/record-{i}", path.as_posix())
+
+
+def run_benchmark(number_of_records: int, session: bool) -> float:
+    """
+    Time writing the records with or without the file session.
+
+    Parameters:
+        number_of_records (int): The number of function calls to record.
+        session (bool): Whether to enable the file session.
+
+    Returns:
+        float: The elapsed time in seconds.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config = {"log_path": str(pathlib.Path(tmp_dir) / "bench.hdf5"), "hdf5_session": session}
+        handler = RecordHandlerHDF5(config)
+        handler.init_new_record_book()
+
+        start = time.perf_counter()
+        write_records(handler, number_of_records)
+        handler.close()
+        return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+    for session in (False, True):
+        elapsed = run_benchmark(n, session)
+        print(f"session={session!s:5}  {n} records  {elapsed:.3f} s  {elapsed / n * 1e3:.3f} ms/record")
@@ -0,0 +1,80 @@
+"""
+Benchmark reading a large 2D array attribute of a record entry, loaded in full or through a lazy proxy.
+
+The lazy proxy reads only the chunks of the dataset needed by a selection, so reading one row or iterating over the
+array block by block only allocates memory for the rows read. The peak of the memory allocated while reading is
+measured with tracemalloc.
+
+Usage:
+    python benchmarks/bench_lazy_reads.py [array_size_in_megabytes]
+"""
+import pathlib
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from labchronicle.core import RecordBook, RecordEntry
+
+
+def measure(func) -> tuple:
+    """
+    Measure the time and the peak memory allocation of a function call.
+
+    Parameters:
+        func (Callable): The function to call.
+
+    Returns:
+        tuple: The time in seconds and the peak of the allocated memory in bytes.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def sum_blocks(entry: RecordEntry) -> float:
+    """
+    Sum the array block by block through the lazy proxy.
+    """
+    with entry.load_attribute("sweep", lazy=True) as proxy:
+        return sum(block.sum() for _, block in proxy.iter_chunks())
+
+
+def read_row(entry: RecordEntry) -> np.ndarray:
+    """
+    Read one row of the array through the lazy proxy.
+    """
+    with entry.load_attribute("sweep", lazy=True) as proxy:
+        return proxy[len(proxy) // 2]
+
+
+if __name__ == "__main__":
+    size = float(sys.argv[1]) if len(sys.argv) > 1 else 64
+
+    samples = 4096
+    sweep = np.random.default_rng(0).normal(size=(int(size * 2 ** 20 / 8 / samples), samples))
+
+    with tempfile.TemporaryDirectory() as directory:
+        config = {"handler": "hdf5", "log_path": f"{directory}/bench.hdf5",
+                  "hdf5_compression": {"array": {"codec": None}}}
+        record_book = RecordBook(config, enable_write=True)
+        entry = RecordEntry(record_book=record_book, timestamp=0, record_id="sweep", record_order=0,
+                            base_path=pathlib.Path("/root"))
+        entry.set_name("acquire")
+        entry.record_metadata()
+        entry.save_attribute("sweep", sweep)
+
+        cases = [("full load", lambda: entry.load_attribute("sweep")),
+                 ("lazy one row", lambda: read_row(entry)),
+                 ("lazy blocks", lambda: sum_blocks(entry))]
+
+        print(f"array {sweep.shape} {sweep.nbytes / 2 ** 20:.0f} MiB")
+        for name, func in cases:
+            elapsed, peak = measure(func)
+            print(f"{name:13}  {elapsed * 1e3:8.2f} ms  peak {peak / 2 ** 20:8.2f} MiB")
@@ -0,0 +1,63 @@
+"""
+Benchmark reading a large array from a record book that is opened again for each read, as post-processing jobs do.
+
+The array is stored chunked, chunked without compression, or contiguous without compression, in which case the read
+returns a memory map of the file instead of a copy. The peak of the memory allocated by each read is measured with
+tracemalloc, and does not include the pages of the file mapped in memory, which are shared between the processes.
+
+Usage:
+    python benchmarks/bench_memmap_reads.py [array_size_in_megabytes] [number_of_reads]
+"""
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from labchronicle.handlers import RecordHandlerHDF5
+
+
+def read_column_means(config: dict, number_of_reads: int) -> tuple:
+    """
+    Open the record book and compute the mean of the first column of the array, several times.
+
+    Parameters:
+        config (dict): The config of the handler.
+        number_of_reads (int): The number of reads.
+
+    Returns:
+        tuple: The time per read in seconds and the peak of the allocated memory in bytes.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(number_of_reads):
+        handler = RecordHandlerHDF5(config)
+        handler.load_record_book()
+        handler.get_record_by_path("/sweep")[:, 0].mean()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed / number_of_reads, peak
+
+
+if __name__ == "__main__":
+    size = float(sys.argv[1]) if len(sys.argv) > 1 else 64
+    number_of_reads = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    samples = 4096
+    sweep = np.random.default_rng(0).normal(size=(int(size * 2 ** 20 / 8 / samples), samples))
+
+    cases = [("chunked gzip", {}),
+             ("chunked", {"hdf5_compression": {"array": {"codec": None}}}),
+             ("contiguous", {"hdf5_contiguous_min_size": 2 ** 20})]
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name, options in cases:
+            config = dict(options, log_path=f"{directory}/{name.replace(' ', '_')}.hdf5")
+            handler = RecordHandlerHDF5(config)
+            handler.init_new_record_book()
+            handler.add_record("/sweep", sweep)
+
+            elapsed, peak = read_column_means(config, number_of_reads)
+            print(f"{name:13}  {elapsed * 1e3:8.2f} ms/read  peak {peak / 2 ** 20:8.2f} MiB")
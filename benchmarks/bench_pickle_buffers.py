@@ -0,0 +1,61 @@
+"""
+Benchmark writing and reading a dict of large numpy arrays with the HDF5 handler.
+
+The dict is stored either as a single pickle, with the data of the arrays copied into it, or as a protocol 5 pickle
+with the data of the arrays stored as array datasets next to it. Compression is disabled, to measure the copies
+alone. The peak of the memory allocated while writing and reading is measured with tracemalloc.
+
+Usage:
+    python benchmarks/bench_pickle_buffers.py [array_size_in_megabytes]
+"""
+import pickle
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from labchronicle.core import RecordEntry
+from labchronicle.handlers import RecordHandlerHDF5
+
+
+def measure(func) -> tuple:
+    """
+    Measure the time and the peak memory allocation of a function call.
+
+    Parameters:
+        func (Callable): The function to call.
+
+    Returns:
+        tuple: The time in seconds and the peak of the allocated memory in bytes.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+if __name__ == "__main__":
+    size = float(sys.argv[1]) if len(sys.argv) > 1 else 32
+
+    rng = np.random.default_rng(0)
+    value = {"I": rng.normal(size=int(size * 2 ** 20 / 8)), "Q": rng.normal(size=int(size * 2 ** 20 / 8))}
+
+    with tempfile.TemporaryDirectory() as directory:
+        handler = RecordHandlerHDF5({"log_path": f"{directory}/bench.hdf5",
+                                     "hdf5_compression": {"array": {"codec": None}}})
+        handler.init_new_record_book()
+
+        cases = [("single pickle", "/pickle", lambda: np.void(pickle.dumps(value))),
+                 ("out-of-band", "/buffers", lambda: value)]
+
+        for name, path, record in cases:
+            write_time, write_peak = measure(lambda: handler.add_record(path, record()))
+            read_time, read_peak = measure(
+                lambda: RecordEntry._decode_record(handler.get_record_by_path(path)))
+            print(f"{name:14}  write {write_time * 1e3:8.2f} ms  peak {write_peak / 2 ** 20:7.1f} MiB  "
+                  f"read {read_time * 1e3:8.2f} ms  peak {read_peak / 2 ** 20:7.1f} MiB")
@@ -0,0 +1,79 @@
+"""
+Benchmark reading a dict of arrays attribute of a record entry, stored as a pickle or as groups and datasets.
+
+The pickled dict is unpickled in full to read any of its fields. The dict stored as groups and datasets can be read
+field by field, or lazily to read a slice of one array. The peak of the memory allocated while reading is measured
+with tracemalloc.
+
+Usage:
+    python benchmarks/bench_structured_records.py [array_size_in_megabytes]
+"""
+import pathlib
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from labchronicle.core import RecordBook, RecordEntry
+
+
+def measure(func) -> tuple:
+    """
+    Measure the time and the peak memory allocation of a function call.
+
+    Parameters:
+        func (Callable): The function to call.
+
+    Returns:
+        tuple: The time in seconds and the peak of the allocated memory in bytes.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def read_slice(entry: RecordEntry) -> np.ndarray:
+    """
+    Read a slice of the `Q` array of the dict, lazily if the dict is stored as groups and datasets.
+    """
+    iq = entry.load_attribute("iq", lazy=True)
+    q = iq["Q"][:100]
+    for value in iq.values():
+        if hasattr(value, "close"):
+            value.close()
+    return q
+
+
+if __name__ == "__main__":
+    size = float(sys.argv[1]) if len(sys.argv) > 1 else 32
+
+    points = int(size * 2 ** 20 / 8)
+    rng = np.random.default_rng(0)
+    iq = {"I": rng.normal(size=points), "Q": rng.normal(size=points), "meta": {"points": points, "unit": "V"}}
+
+    with tempfile.TemporaryDirectory() as directory:
+        for structured in [False, True]:
+            config = {"handler": "hdf5", "log_path": f"{directory}/bench_{structured}.hdf5",
+                      "hdf5_compression": {"array": {"codec": None}}, "hdf5_structured_records": structured}
+            record_book = RecordBook(config, enable_write=True)
+            entry = RecordEntry(record_book=record_book, timestamp=0, record_id="iq", record_order=0,
+                                base_path=pathlib.Path("/root"))
+            entry.set_name("measure")
+            entry.record_metadata()
+            entry.save_attribute("iq", iq)
+
+            cases = [("full load", lambda: entry.load_attribute("iq")),
+                     ("one field", lambda: entry.load_attribute("iq")["meta"] if not structured
+                      else entry.load_attribute("iq/meta")),
+                     ("lazy slice", lambda: read_slice(entry))]
+
+            layout = "groups" if structured else "pickle"
+            for name, func in cases:
+                elapsed, peak = measure(func)
+                print(f"{layout:6}  {name:10}  {elapsed * 1e3:8.2f} ms  peak {peak / 2 ** 20:8.2f} MiB")
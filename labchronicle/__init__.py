@@ -2,6 +2,8 @@ from .logger import setup_logging
 from .chronicle import Chronicle, load_object, load_attributes
 from .core import LoggableObject
 from .decorators import log_and_record, log_event, register_browser_function
+from .snapshots import SnapshotPolicy
+from .streams import RecordStream
 
 browser_function = register_browser_function  # Alias for backwards compatibility
 
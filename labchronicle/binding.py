@@ -0,0 +1,190 @@
+# This file contains the binding plans of the logged functions. A binding plan is built once from the signature of a
+# function and cached on the function, then used on every call to match the called arguments to the parameters,
+# which is much faster than binding them with `inspect.Signature.bind`.
+import inspect
+from typing import Any, Callable, Dict, Tuple
+
+_empty = inspect.Parameter.empty
+
+# The names of the attributes of the functions that cache their binding plan, and the binding plan of their bound
+# methods, which do not take the first parameter.
+_binding_plan_attribute = "__labchronicle_binding_plan__"
+_bound_binding_plan_attribute = "__labchronicle_bound_binding_plan__"
+
+
+class BindingPlan(object):
+    """
+    The parameters of a function, precomputed to match the called arguments to them quickly.
+    """
+
+    def __init__(self, func: Callable[..., Any]):
+        """
+        Build the binding plan of a function.
+
+        Parameters:
+            func (Callable): The function.
+        """
+        self._signature = inspect.signature(func)
+
+        self.positional = []  # The (name, default) of the parameters that can be passed positionally.
+        self.positional_only = set()
+        self.var_positional = None
+        self.keyword_only = []  # The (name, default) of the keyword only parameters.
+        self.var_keyword = None
+
+        for parameter in self._signature.parameters.values():
+            if parameter.kind is inspect.Parameter.POSITIONAL_ONLY:
+                self.positional.append((parameter.name, parameter.default))
+                self.positional_only.add(parameter.name)
+            elif parameter.kind is inspect.Parameter.POSITIONAL_OR_KEYWORD:
+                self.positional.append((parameter.name, parameter.default))
+            elif parameter.kind is inspect.Parameter.VAR_POSITIONAL:
+                self.var_positional = parameter.name
+            elif parameter.kind is inspect.Parameter.KEYWORD_ONLY:
+                self.keyword_only.append((parameter.name, parameter.default))
+            else:
+                self.var_keyword = parameter.name
+
+        self._names = {name for name, _ in self.positional} | {name for name, _ in self.keyword_only}
+
+    def _bind_slow(self, args: tuple, kwargs: dict) -> Tuple[tuple, dict]:
+        """
+        Bind the arguments with `inspect.Signature.bind`, which raises the same errors as calling the function.
+
+        Parameters:
+            args (tuple): The positional arguments.
+            kwargs (dict): The keyword arguments.
+
+        Returns:
+            tuple: The positional arguments.
+            dict: The keyword arguments.
+        """
+        bound_arguments = self._signature.bind(*args, **kwargs)
+        bound_arguments.apply_defaults()
+        return bound_arguments.args, bound_arguments.kwargs
+
+    def bind(self, args: tuple, kwargs: dict) -> Tuple[tuple, dict]:
+        """
+        Normalize the arguments of a call with the defaults applied, as `inspect.BoundArguments.args` and
+        `inspect.BoundArguments.kwargs` do: the parameters that can be passed positionally are passed positionally,
+        the others by keyword.
+
+        Parameters:
+            args (tuple): The positional arguments.
+            kwargs (dict): The keyword arguments.
+
+        Returns:
+            tuple: The positional arguments.
+            dict: The keyword arguments.
+
+        Raises:
+            TypeError: If the arguments do not match the signature of the function.
+        """
+        number_of_positional = len(self.positional)
+        if len(args) > number_of_positional and self.var_positional is None:
+            return self._bind_slow(args, kwargs)
+
+        bound_args = list(args[:number_of_positional])
+        used_keywords = 0
+
+        for name, default in self.positional[len(bound_args):]:
+            if name in kwargs and name not in self.positional_only:
+                bound_args.append(kwargs[name])
+                used_keywords += 1
+            elif default is not _empty:
+                bound_args.append(default)
+            else:
+                return self._bind_slow(args, kwargs)
+
+        bound_args.extend(args[number_of_positional:])
+
+        bound_kwargs = {}
+        for name, default in self.keyword_only:
+            if name in kwargs:
+                bound_kwargs[name] = kwargs[name]
+                used_keywords += 1
+            elif default is not _empty:
+                bound_kwargs[name] = default
+            else:
+                return self._bind_slow(args, kwargs)
+
+        if used_keywords < len(kwargs):
+            # Some keyword arguments do not match a parameter, they go to the `**kwargs` parameter.
+            if self.var_keyword is None:
+                return self._bind_slow(args, kwargs)
+
+            consumed = {name for name, _ in self.positional[len(args):]} | {name for name, _ in self.keyword_only}
+            for name, value in kwargs.items():
+                if name in self.positional_only or name not in self._names:
+                    bound_kwargs[name] = value
+                elif name not in consumed:
+                    # The argument is also passed positionally.
+                    return self._bind_slow(args, kwargs)
+
+        return tuple(bound_args), bound_kwargs
+
+    def map_arguments(self, args: tuple, kwargs: dict, skip_first: bool = False) -> Dict[str, Any]:
+        """
+        Map the arguments of a call to the names of the parameters. The missing arguments without defaults are
+        mapped to None, the extra positional arguments are mapped as a tuple to the name of the `*args` parameter,
+        and the extra keyword arguments are mapped to their own names.
+
+        Parameters:
+            args (tuple): The positional arguments.
+            kwargs (dict): The keyword arguments.
+            skip_first (bool): Whether the arguments do not include the first parameter, for example `self`.
+
+        Returns:
+            dict: The arguments mapped to the names of the parameters.
+        """
+        positional = self.positional[1:] if skip_first else self.positional
+
+        mapped_args = {}
+        for (name, default), value in zip(positional, args):
+            mapped_args[name] = value
+
+        for name, default in positional[len(args):]:
+            mapped_args[name] = kwargs.get(name, default if default is not _empty else None)
+
+        if self.var_positional is not None:
+            mapped_args[self.var_positional] = tuple(args[len(positional):])
+
+        for name, default in self.keyword_only:
+            mapped_args[name] = kwargs.get(name, default if default is not _empty else None)
+
+        for name, value in kwargs.items():
+            if name not in mapped_args:
+                mapped_args[name] = value
+
+        return mapped_args
+
+
+def get_binding_plan(func: Callable[..., Any]) -> BindingPlan:
+    """
+    Get the binding plan of a function. The plan is built on the first call and cached on the function.
+
+    Parameters:
+        func (Callable): The function.
+
+    Returns:
+        BindingPlan: The binding plan of the function.
+    """
+    if inspect.ismethod(func):
+        target, attribute = func.__func__, _bound_binding_plan_attribute
+    else:
+        target, attribute = func, _binding_plan_attribute
+
+    try:
+        return target.__dict__[attribute]
+    except (AttributeError, KeyError):
+        pass
+
+    plan = BindingPlan(func)
+
+    try:
+        setattr(target, attribute, plan)
+    except AttributeError:
+        # Some callables, such as the builtin functions, do not accept attributes.
+        pass
+
+    return plan
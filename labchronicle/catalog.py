@@ -0,0 +1,264 @@
+# This file contains the record catalog, a SQLite index of the records of all the record books in a log directory.
+# It allows finding records by their id, function name, time or user without opening the record books.
+#
+# The catalog is updated when the records are written, and can be rebuilt from the existing record books with:
+#     python -m labchronicle.catalog rebuild <log_dir>
+import argparse
+import pathlib
+import sqlite3
+from typing import Optional, Union
+
+import h5py
+
+from .core import RecordBook
+from .logger import setup_logging
+
+logger = setup_logging(__name__)
+
+_catalog_columns = ("record_id", "book_path", "entry_path", "name", "record_time", "user")
+
+
+def get_catalog_path(log_dir: Union[pathlib.Path, str]) -> pathlib.Path:
+    """
+    Get the default path of the catalog of a log directory.
+
+    Parameters:
+        log_dir (pathlib.Path or str): The log directory.
+
+    Returns:
+        pathlib.Path: The path of the catalog.
+    """
+    return pathlib.Path(log_dir) / "catalog.sqlite"
+
+
+class RecordCatalog(object):
+    """
+    A SQLite index of the records of the record books.
+
+    The added records are committed every `commit_interval` records, and when `commit` or `close` is called.
+    """
+
+    def __init__(self, path: Union[pathlib.Path, str], commit_interval: int = 100):
+        """
+        Open the catalog, and create it if it does not exist.
+
+        Parameters:
+            path (pathlib.Path or str): The path of the catalog.
+            commit_interval (int): The number of added records to commit at once.
+        """
+        path = pathlib.Path(path)
+        if not path.parent.exists():
+            path.parent.mkdir(parents=True)
+
+        self._path = path
+        self._commit_interval = commit_interval
+        self._uncommitted = 0
+        self._connection = sqlite3.connect(str(path), timeout=30, check_same_thread=False)
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS records (
+                record_id TEXT PRIMARY KEY,
+                book_path TEXT NOT NULL,
+                entry_path TEXT NOT NULL,
+                name TEXT,
+                record_time INTEGER,
+                user TEXT
+            );
+            CREATE INDEX IF NOT EXISTS records_name ON records (name);
+            CREATE INDEX IF NOT EXISTS records_record_time ON records (record_time);
+            CREATE INDEX IF NOT EXISTS records_book_path ON records (book_path);
+            CREATE INDEX IF NOT EXISTS records_user ON records (user);
+            """
+        )
+
+    def get_path(self) -> pathlib.Path:
+        """
+        Get the path of the catalog.
+
+        Returns:
+            pathlib.Path: The path of the catalog.
+        """
+        return self._path
+
+    def add_records(self, records: list):
+        """
+        Add records to the catalog. Records with an existing id are replaced.
+
+        Parameters:
+            records (list): A list of (record_id, book_path, entry_path, name, record_time, user) tuples.
+        """
+        self._connection.executemany(
+            f"INSERT OR REPLACE INTO records ({', '.join(_catalog_columns)}) VALUES (?, ?, ?, ?, ?, ?)",
+            [tuple(str(value) if isinstance(value, pathlib.PurePath) else value for value in record)
+             for record in records]
+        )
+
+        self._uncommitted += len(records)
+        if self._uncommitted >= self._commit_interval:
+            self.commit()
+
+    def add_record(self, record_id: str, book_path: Union[pathlib.Path, str], entry_path: Union[pathlib.Path, str],
+                   name: str, record_time: int, user: str):
+        """
+        Add a record to the catalog.
+
+        Parameters:
+            record_id (str): The id of the record entry.
+            book_path (pathlib.Path or str): The path to the record book.
+            entry_path (pathlib.Path or str): The path to the record entry.
+            name (str): The name of the record entry, usually the function qualname.
+            record_time (int): The time of the record entry.
+            user (str): The user who created the record book.
+        """
+        self.add_records([(record_id, book_path, entry_path, name, record_time, user)])
+
+    def add_book(self, record_book: RecordBook) -> int:
+        """
+        Add all the record entries of a record book to the catalog.
+
+        Parameters:
+            record_book (RecordBook): The record book to add.
+
+        Returns:
+            int: The number of added records.
+        """
+        book_path = record_book.get_path().resolve().as_posix()
+        user = record_book.get_system_info().get("user")
+
+        records = [
+            (entry.record_id, book_path, entry.get_path().as_posix(), entry.name, entry.record_time, user)
+            for entry in record_book.iter_entries()
+            if entry.record_id is not None
+        ]
+
+        self.add_records(records)
+        return len(records)
+
+    def query(self, name: Optional[str] = None, start_time: Optional[int] = None, end_time: Optional[int] = None,
+              user: Optional[str] = None, record_id: Optional[str] = None,
+              book_path: Optional[Union[pathlib.Path, str]] = None, limit: Optional[int] = None) -> list:
+        """
+        Find records in the catalog. Only the specified conditions are applied.
+
+        Parameters:
+            name (str): Optional. The name of the record entries, usually the function qualname.
+            start_time (int): Optional. The earliest record time, inclusive.
+            end_time (int): Optional. The latest record time, inclusive.
+            user (str): Optional. The user who created the record books.
+            record_id (str): Optional. The id of the record entry.
+            book_path (pathlib.Path or str): Optional. The path to the record book.
+            limit (int): Optional. The maximum number of records to return.
+
+        Returns:
+            list: The matching records as dictionaries, sorted by record time.
+        """
+        conditions = []
+        parameters = []
+
+        for column, operator, value in (
+                ("name", "=", name),
+                ("record_time", ">=", start_time),
+                ("record_time", "<=", end_time),
+                ("user", "=", user),
+                ("record_id", "=", record_id),
+                ("book_path", "=", pathlib.Path(book_path).as_posix() if book_path is not None else None),
+        ):
+            if value is not None:
+                conditions.append(f"{column} {operator} ?")
+                parameters.append(value)
+
+        statement = f"SELECT {', '.join(_catalog_columns)} FROM records"
+        if conditions:
+            statement += " WHERE " + " AND ".join(conditions)
+        statement += " ORDER BY record_time, book_path, entry_path"
+        if limit is not None:
+            statement += " LIMIT ?"
+            parameters.append(limit)
+
+        rows = self._connection.execute(statement, parameters).fetchall()
+        return [dict(zip(_catalog_columns, row)) for row in rows]
+
+    def get_record_location(self, record_id: str) -> Optional[tuple]:
+        """
+        Find the record book and the record entry path of a record.
+
+        Parameters:
+            record_id (str): The id of the record entry.
+
+        Returns:
+            tuple: The record book path and the record entry path, None if the record is not in the catalog.
+        """
+        row = self._connection.execute(
+            "SELECT book_path, entry_path FROM records WHERE record_id = ?", (str(record_id),)
+        ).fetchone()
+
+        return tuple(row) if row is not None else None
+
+    def rebuild(self, log_dir: Union[pathlib.Path, str]) -> int:
+        """
+        Clear the catalog and index all the record books under the log directory.
+
+        Parameters:
+            log_dir (pathlib.Path or str): The log directory.
+
+        Returns:
+            int: The number of indexed records.
+        """
+        self._connection.execute("DELETE FROM records")
+
+        number_of_records = 0
+        for path in sorted(pathlib.Path(log_dir).rglob("*")):
+            if not path.is_file() or not h5py.is_hdf5(path):
+                continue
+
+            try:
+                record_book = RecordBook({"handler": "hdf5", "log_path": path.as_posix()}, enable_write=False)
+                number_of_records += self.add_book(record_book)
+                record_book.close()
+            except Exception as e:
+                logger.warning(f"Failed to index {path}: {e}")
+
+        self.commit()
+        return number_of_records
+
+    def commit(self):
+        """
+        Commit the added records.
+        """
+        self._connection.commit()
+        self._uncommitted = 0
+
+    def close(self):
+        """
+        Commit the added records and close the catalog.
+        """
+        self.commit()
+        self._connection.close()
+
+
+def main(argv: Optional[list] = None):
+    """
+    The command line interface of the catalog.
+
+    Parameters:
+        argv (list): Optional. The command line arguments.
+    """
+    parser = argparse.ArgumentParser(prog="python -m labchronicle.catalog")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    rebuild_parser = subparsers.add_parser("rebuild", help="Rebuild the catalog from the record books.")
+    rebuild_parser.add_argument("log_dir", help="The log directory.")
+    rebuild_parser.add_argument("--catalog", help="The path of the catalog. Defaults to <log_dir>/catalog.sqlite.")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "rebuild":
+        catalog_path = args.catalog if args.catalog is not None else get_catalog_path(args.log_dir)
+        catalog = RecordCatalog(catalog_path)
+        number_of_records = catalog.rebuild(args.log_dir)
+        catalog.close()
+        print(f"Indexed {number_of_records} records in {catalog_path}.")
+
+
+if __name__ == "__main__":
+    main()
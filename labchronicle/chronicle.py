@@ -7,6 +7,7 @@ import datetime
 import yaml
 from typing import Optional, Union
 
+from .catalog import RecordCatalog, get_catalog_path
 from .core import RecordBook, RecordEntry
 from .logger import setup_logging
 from .utils import get_log_path
@@ -69,6 +70,7 @@ class Chronicle(Singleton):
         self._active_record_book = None
         self._record_tracking_stack = None
         self._log_start_time = None
+        self._catalog = None
 
         super().__init__()
 
@@ -187,7 +189,7 @@ class Chronicle(Singleton):
             logger.error(msg)
             raise ValueError(msg)
         else:
-            record_order = self._record_tracking_stack[-1].get_children_number()
+            record_order = self._record_tracking_stack[-1].allocate_child_order()
             record_path = self._record_tracking_stack[-1].get_path()
 
         new_record = RecordEntry(
@@ -196,6 +198,12 @@ class Chronicle(Singleton):
             record_book=self._active_record_book,
             record_order=record_order,
             base_path=record_path,
+            write_buffer=self._config.get("write_buffer", False) or self._config.get("async_write", False),
+            metadata_layout=self._config.get("metadata_layout", "datasets"),
+            change_detection=self._config.get("change_detection", False),
+            deduplicate_snapshots=self._config.get("deduplicate_snapshots", False),
+            snapshot_keyframe_interval=self._config.get("snapshot_keyframe_interval", 10)
+            if self._config.get("snapshot_mode", "full") == "delta" else None,
         )
 
         self._record_tracking_stack.append(new_record)
@@ -206,14 +214,43 @@ class Chronicle(Singleton):
             last_record = self._record_tracking_stack.pop()
 
             # Write the link of uuid to the path
-            self._active_record_book.handler.add_record(
-                f"/uuid/{last_record.record_id}", str(last_record.get_path())
-            )
+            last_record.record_index()
+            last_record.commit()
+
+            if self._config.get("catalog", False):
+                self.get_catalog().add_record(
+                    record_id=last_record.record_id,
+                    book_path=self._active_record_book.get_path().resolve().as_posix(),
+                    entry_path=last_record.get_path().as_posix(),
+                    name=last_record.name,
+                    record_time=last_record.record_time,
+                    user=self._active_record_book.get_system_info().get("user"),
+                )
+
+    def flush(self):
+        """
+        Wait for the pending records of the current log to be written, and flush them to the storage.
+        """
+        if self._active_record_book is not None:
+            self._active_record_book.flush()
+
+        if self._catalog is not None:
+            self._catalog.commit()
 
     def end_log(self):
         """
         End the current log.
         """
+        if self._active_record_book is not None:
+            if self._config.get("deduplicate_snapshots", False):
+                report = self._active_record_book.get_deduplication_report()
+                logger.info(f"Snapshot deduplication stored {report['stored_values']} of {report['values']} "
+                            f"snapshots, saving {report['saved_bytes']} bytes ({report['saved_ratio']:.1%}).")
+            self._active_record_book.close()
+
+        if self._catalog is not None:
+            self._catalog.commit()
+
         self._active_record_book = None
         self._record_tracking_stack = None
 
@@ -233,6 +270,21 @@ class Chronicle(Singleton):
 
         return RecordBook(enable_write=False, config=record_book_config)
 
+    def get_catalog(self) -> Optional[RecordCatalog]:
+        """
+        Get the record catalog of the log directory. The catalog is located at `catalog_path` in the config, by
+        default `catalog.sqlite` under the log directory.
+
+        Returns:
+            RecordCatalog: The record catalog, None if the catalog is not enabled and does not exist.
+        """
+        if self._catalog is None:
+            path = self._config.get("catalog_path", get_catalog_path(self._config["log_path"]))
+            if self._config.get("catalog", False) or pathlib.Path(path).exists():
+                self._catalog = RecordCatalog(path)
+
+        return self._catalog
+
     def is_recording(self) -> bool:
         """
         Return if currently an active record book is recording.
@@ -241,14 +293,15 @@ class Chronicle(Singleton):
         """
         return self._active_record_book is not None
 
-    def _get_record_by_path_or_id(self, record_book_path: Union[pathlib.Path, str], record_id: str = None,
-                                  record_entry_path: Union[pathlib.Path, str] = None):
+    def _get_record_by_path_or_id(self, record_book_path: Optional[Union[pathlib.Path, str]] = None,
+                                  record_id: str = None, record_entry_path: Union[pathlib.Path, str] = None):
         """
         A helper function to get the record entry by either the record id or the record entry path.
-        Note that record_id and record_entry_path cannot be both None.
+        Note that record_id and record_entry_path cannot be both None. If record_book_path is None, the record is
+        looked up by its id in the record catalog.
 
         Parameters:
-            record_book_path (str): The path to the record book.
+            record_book_path (str): Optional. The path to the record book.
             record_id (str): Optional. The id of the record entry.
             record_entry_path (str): Optional. The path to the record entry.
 
@@ -259,6 +312,19 @@ class Chronicle(Singleton):
             logger.error(msg)
             raise ValueError(msg)
 
+        if record_book_path is None:
+            catalog = self.get_catalog()
+            location = catalog.get_record_location(record_id) if catalog is not None and record_id is not None \
+                else None
+
+            if location is None:
+                msg = f"Record {record_id} is not found in the record catalog. Please specify the record book path."
+                logger.error(msg)
+                raise ValueError(msg)
+
+            record_book_path, record_entry_path = location
+            record_id = None
+
         record_book = self.open_record_book(record_book_path)
         if record_id is not None:
             record = record_book.get_record_by_id(record_id)
@@ -267,14 +333,15 @@ class Chronicle(Singleton):
 
         return record
 
-    def load_attributes(self, record_book_path: Union[pathlib.Path, str], record_id: str = None,
+    def load_attributes(self, record_book_path: Optional[Union[pathlib.Path, str]] = None, record_id: str = None,
                         record_entry_path: Union[pathlib.Path, str] = None):
         """
         A shortcut for loading all the attributes of a record entry.
         Note that record_id and record_entry_path cannot be both None.
 
         Parameters:
-            record_book_path (str): The path to the record book.
+            record_book_path (str): Optional. The path to the record book. If not specified, the record is looked up by
+                                    its id in the record catalog.
             record_id (str): Optional. The id of the record entry.
             record_entry_path (str): Optional. The path to the record entry.
 
@@ -287,14 +354,15 @@ class Chronicle(Singleton):
 
         return record.load_all_attributes()
 
-    def load_object(self, record_book_path: Union[pathlib.Path, str], record_id: str = None,
+    def load_object(self, record_book_path: Optional[Union[pathlib.Path, str]] = None, record_id: str = None,
                     record_entry_path: Union[pathlib.Path, str] = None):
         """
         A shortcut for loading all the attributes of a record entry.
         Note that record_id and record_entry_path cannot be both None.
 
         Parameters:
-            record_book_path (str): The path to the record book.
+            record_book_path (str): Optional. The path to the record book. If not specified, the record is looked up by
+                                    its id in the record catalog.
             record_id (str): Optional. The id of the record entry.
             record_entry_path (str): Optional. The path to the record entry.
         """
@@ -305,14 +373,15 @@ class Chronicle(Singleton):
         return record.get_object()
 
 
-def load_object(record_book_path: Union[pathlib.Path, str], record_id: str = None,
+def load_object(record_book_path: Optional[Union[pathlib.Path, str]] = None, record_id: str = None,
                 record_entry_path: Union[pathlib.Path, str] = None):
     """
     A shortcut for loading all the attributes of a record entry.
     Note that record_id and record_entry_path cannot be both None.
 
     Parameters:
-        record_book_path (str): The path to the record book.
+        record_book_path (str): Optional. The path to the record book. If not specified, the record is looked up by
+                                its id in the record catalog.
         record_id (str): Optional. The id of the record entry.
         record_entry_path (str): Optional. The path to the record entry.
 
@@ -322,14 +391,15 @@ def load_object(record_book_path: Union[pathlib.Path, str], record_id: str = Non
     return Chronicle().load_object(record_book_path, record_id, record_entry_path)
 
 
-def load_attributes(record_book_path: Union[pathlib.Path, str], record_id: str = None,
+def load_attributes(record_book_path: Optional[Union[pathlib.Path, str]] = None, record_id: str = None,
                     record_entry_path: Union[pathlib.Path, str] = None):
     """
     A shortcut for loading all the attributes of a record entry.
     Note that record_id and record_entry_path cannot be both None.
 
     Parameters:
-        record_book_path (str): The path to the record book.
+        record_book_path (str): Optional. The path to the record book. If not specified, the record is looked up by
+                                its id in the record catalog.
         record_id (str): Optional. The id of the record entry.
         record_entry_path (str): Optional. The path to the record entry.
 
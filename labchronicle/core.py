@@ -4,43 +4,212 @@
 # 2. The `LogRecord` class is used to represent a specific log. Providing the abstract interface for the handlers.
 # 3. The `LogHandler` class is the abstract class for all the handlers. It
 # provides the interface for the handlers.
+import atexit
+import collections
 import copy
 import inspect
 import pathlib
-import pickle
-from typing import Any, Callable, Dict, List, Optional, Union
+import threading
+import weakref
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 
 from .logger import setup_logging
-from .handlers import get_handler, RecordHandlersBase
+from .handlers import get_handler, RecordHandlersBase, RecordAttributes, RecordLink, RecordPickle, RecordRows, \
+    RecordTree
 from .utils import get_system_info, find_methods_with_tag
+from .serialization import capture_record, capture_value, fingerprint_record, fingerprint_bytes, dumps_with_blobs, \
+    loads_with_blobs
+from .writer import AsyncRecordWriter
+from .index import RecordIndex
+from .binding import get_binding_plan
+from .streams import RecordStream
 import json
 
 logger = setup_logging(__name__)
 
-_reserved_keys = [
+_reserved_keys = frozenset([
     "_loggable",
     "_register_log_and_record_args_map",
     "logger",
     "_record_entry",
     "_browse_functions",
+    "_routine_attributes",
+    "_tracking_mode",
+    "_tracked_attributes",
+    "_untracked_attributes",
+    "_track_reads",
+    "_tracked_attribute_names",
+    "_untracked_attribute_names",
+    "_snapshot_policy",
     "__dict__",
-]
+    "__class__",
+])
+
+# The names of the metadata values of a record entry.
+_metadata_keys = ("__timestamp__", "__record_id__", "__name__", "__touched_attributes__")
+
+# The path of the content addressed store of the serialized values in the record books.
+_blobs_path = "/blobs"
+
+# The snapshot modes of the record books.
+_snapshot_modes = ("full", "delta")
+
+# The tracking modes of the loggable objects.
+_tracking_modes = ("read_write", "write")
+
+# The record books opened to be written that are not closed yet, closed at interpreter exit.
+_open_record_books = weakref.WeakSet()
+
+
+@atexit.register
+def _close_open_record_books():
+    """
+    Close all the record books that are still open to be written, so the pending index entries are written and the
+    index is marked as complete. It runs before the writers and the file sessions are closed.
+    """
+    for record_book in list(_open_record_books):
+        record_book.close()
 
 
 class SetBrowserFunctionAttributeMeta(type):
     """
     A metaclass that set class attributes from the base class to the subclass,
-    making sure they do not share the same reference.
+    making sure they do not share the same reference. It also resolves the
+    tracking options declared on the class.
     """
 
     def __new__(mcls, name, bases, class_dict):
         new_class = super().__new__(mcls, name, bases, class_dict)
         new_class._browse_functions = []
+        new_class._routine_attributes = {}
+
+        if new_class._tracking_mode not in _tracking_modes:
+            msg = f"Unknown tracking mode {new_class._tracking_mode} of {name}. Available modes: {_tracking_modes}."
+            logger.error(msg)
+            raise ValueError(msg)
+
+        new_class._track_reads = new_class._tracking_mode == "read_write"
+        new_class._tracked_attribute_names = frozenset(new_class._tracked_attributes) \
+            if new_class._tracked_attributes is not None else None
+        new_class._untracked_attribute_names = frozenset(new_class._untracked_attributes)
         return new_class
 
 
+def _is_tracked_attribute(cls: type, key: str) -> bool:
+    """
+    Check whether an attribute is tracked according to the declared tracked and untracked attributes of the class.
+
+    Parameters:
+        cls (type): The class of the loggable object.
+        key (str): The name of the attribute.
+
+    Returns:
+        bool: True if the attribute is tracked.
+    """
+    tracked_attribute_names = cls._tracked_attribute_names
+    if tracked_attribute_names is not None and key not in tracked_attribute_names:
+        return False
+
+    return key not in cls._untracked_attribute_names
+
+
+# The number of loggable objects with an active record entry. The attribute reads are only tracked while it is
+# positive, see `LoggableObject.set_record_entry`.
+_active_record_entries = 0
+_active_record_entries_lock = threading.Lock()
+
+# Whether the values of a type are routines. `inspect.isroutine` only depends on the type of the value.
+_routine_types = {}
+
+
+def _is_routine_attribute(cls: type, key: str) -> bool:
+    """
+    Check whether a class attribute is a routine, for example a method. The result is cached on the class.
+
+    Parameters:
+        cls (type): The class of the loggable object.
+        key (str): The name of the attribute.
+
+    Returns:
+        bool: True if the attribute is a routine.
+    """
+    routine_attributes = cls._routine_attributes
+    is_routine = routine_attributes.get(key)
+
+    if is_routine is None:
+        attribute = inspect.getattr_static(cls, key, None)
+        is_routine = isinstance(attribute, (staticmethod, classmethod)) or inspect.isroutine(attribute)
+        routine_attributes[key] = is_routine
+
+    return is_routine
+
+
+def _tracking_getattribute(self, key):
+    """
+    The `__getattribute__` method of the loggable objects while any record entry is active. It marks the attributes
+    read as touched in the record entry of the object, if the class of the object tracks the reads.
+
+    Parameters:
+        key (str): The name of the attribute.
+
+    Returns:
+        Any: The value of the attribute.
+    """
+    # Use the original __getattribute__ method, to avoid infinite recursion
+    # that may be induced by the child class overriding the
+    # __getattribute__ method.
+    result = object.__getattribute__(self, key)
+
+    if key in _reserved_keys:
+        return result
+
+    instance_dict = object.__getattribute__(self, "__dict__")
+    record_entry = instance_dict.get("_record_entry")
+    if record_entry is None:
+        # The object is not being monitored.
+        return result
+
+    cls = type(self)
+    if not cls._track_reads or not _is_tracked_attribute(cls, key):
+        return result
+
+    if key in instance_dict:
+        value_type = type(result)
+        is_routine = _routine_types.get(value_type)
+        if is_routine is None:
+            is_routine = _routine_types[value_type] = inspect.isroutine(result)
+        if is_routine:
+            return result
+    elif _is_routine_attribute(cls, key):
+        return result
+
+    record_entry.touch_attribute(key)
+
+    return result
+
+
+def _update_tracking(delta: int):
+    """
+    Update the number of loggable objects with an active record entry, and install the tracking `__getattribute__`
+    on `LoggableObject` when it becomes positive, or remove it when it drops to zero. Without active record entries,
+    the attribute reads of the loggable objects have no overhead.
+
+    Parameters:
+        delta (int): The change of the number of active record entries.
+    """
+    global _active_record_entries
+
+    with _active_record_entries_lock:
+        _active_record_entries = max(_active_record_entries + delta, 0)
+
+        if _active_record_entries > 0 and "__getattribute__" not in LoggableObject.__dict__:
+            LoggableObject.__getattribute__ = _tracking_getattribute
+        elif _active_record_entries == 0 and "__getattribute__" in LoggableObject.__dict__:
+            del LoggableObject.__getattribute__
+
+
 class LoggableObject(metaclass=SetBrowserFunctionAttributeMeta):
     """
     This is the base class for all classes that want to be logged.
@@ -52,8 +221,26 @@ class LoggableObject(metaclass=SetBrowserFunctionAttributeMeta):
 
     For the attributes that are not manually set, the loggable object will pickle them. For the records that are
     captured by the `__setattr__` method, the loggable object will record them in a separate file/record.
+
+    The subclasses can declare which attributes are tracked with the class attributes:
+
+    + `_tracking_mode`: `read_write` tracks the attributes that are read or written, `write` only tracks the
+      attributes that are written, so the attributes that are only read are not saved again in each record.
+    + `_tracked_attributes`: If not None, only these attributes are tracked.
+    + `_untracked_attributes`: These attributes are never tracked.
+
+    The `_snapshot_policy` class attribute can be set to a `SnapshotPolicy` to decide when the decorated functions
+    take a snapshot of the object.
+
+    The attribute reads are tracked by a `__getattribute__` method that is only installed while a record entry is
+    active, so the objects that are not being recorded read their attributes at the normal speed.
     """
 
+    _tracking_mode = "read_write"
+    _tracked_attributes = None
+    _untracked_attributes = ()
+    _snapshot_policy = None
+
     def __init__(self):
         self._register_log_and_record_args_map = {}
         self.logger = setup_logging(self.hrid)
@@ -79,18 +266,13 @@ class LoggableObject(metaclass=SetBrowserFunctionAttributeMeta):
             value (Any): The value of the attribute.
         """
 
-        if key in _reserved_keys:
-            # If the key is reserved, simply set the attribute.
-            super().__setattr__(key, value)
-            return
-
-        if "_record_entry" not in self.__dict__ or self._record_entry is None:
+        if key not in _reserved_keys:
             # If the record entry is not in the dict, it means that the object
             # is not being monitored.
-            super().__setattr__(key, value)
-            return
+            record_entry = object.__getattribute__(self, "__dict__").get("_record_entry")
+            if record_entry is not None and _is_tracked_attribute(type(self), key):
+                record_entry.touch_attribute(key, write=True)
 
-        self._record_entry.touch_attribute(key)
         super().__setattr__(key, value)
 
     def __repr__(self):
@@ -103,48 +285,56 @@ class LoggableObject(metaclass=SetBrowserFunctionAttributeMeta):
 
         return f"<{self.hrid}>"
 
-    def __getattribute__(self, key):
-        """
-        Override the `__getattribute__` method to record the attributes.
+    @staticmethod
+    def _safe_deepcopy(obj):
         """
+        Safely deepcopy an object.
 
-        # Make sure we use the original __getattribute__ method, to avoid infinite recursion
-        # that may be induced by the child class overriding the
-        # __getattribute__ method.
-        get_attribute = super().__getattribute__
-
-        result = get_attribute(key)
-
-        if key in _reserved_keys:
-            return result
+        Parameters:
+            obj (object): The object to deepcopy.
 
-        if (
-                "_record_entry" not in get_attribute("__dict__")
-                or get_attribute("_record_entry") is None
-        ):
-            # If the record entry is not in the dict, it means that the object
-            # is not being monitored.
-            return result
+        Returns:
+            object: The copied object.
+        """
+        return copy.deepcopy(obj)
 
-        if inspect.isroutine(result):
-            return result
+    def capture_log_and_record_args(self, args: list, kwargs: dict) -> Tuple[Any, Any]:
+        """
+        Take a snapshot of the arguments of a function call, to record them and register them with the same
+        snapshot. The arguments are pickled once, and the numpy arrays in them are loaded back as read-only views of
+        the snapshot. The arguments that cannot be pickled are deep copied instead.
 
-        get_attribute("_record_entry").touch_attribute(key)
+        Parameters:
+            args (list): The arguments of the function.
+            kwargs (dict): The keyword arguments of the function.
 
-        return result
+        Returns:
+            tuple: The snapshots of the arguments and of the keyword arguments.
+        """
+        try:
+            return capture_value(args), capture_value(kwargs)
+        except Exception:
+            return self._safe_deepcopy(args), self._safe_deepcopy(kwargs)
 
-    @staticmethod
-    def _safe_deepcopy(obj):
+    def open_stream(self, key: str, dtype: np.dtype, chunk_shape: tuple = None) -> RecordStream:
         """
-        Safely deepcopy an object.
+        Open a stream in the record entry of the function call being recorded, to write an array attribute block by
+        block, see `RecordEntry.open_stream`. If the object is not being recorded, the stream discards the blocks.
 
         Parameters:
-            obj (object): The object to deepcopy.
+            key (str): The key of the attribute.
+            dtype (np.dtype): The data type of the array.
+            chunk_shape (tuple): Optional. The chunk shape of the record, including the first axis.
 
         Returns:
-            object: The copied object.
+            RecordStream: The stream.
         """
-        return copy.deepcopy(obj)
+        record_entry = self.__dict__.get("_record_entry")
+
+        if record_entry is None:
+            return RecordStream(None, key, dtype, chunk_shape)
+
+        return record_entry.open_stream(key, dtype, chunk_shape)
 
     def get_browser_functions(self):
         """
@@ -169,18 +359,20 @@ class LoggableObject(metaclass=SetBrowserFunctionAttributeMeta):
 
         Parameters:
             func (function): The function to register the arguments from.
-            args (list): The arguments of the function.
-            kwargs (dict): The keyword arguments of the function.
+            args (list): The arguments of the function, or their snapshot from `capture_log_and_record_args`.
+            kwargs (dict): The keyword arguments of the function, or their snapshot from
+                           `capture_log_and_record_args`.
             record_details (dict): The latest record entry details of the function call.
-            deepcopy (bool): Whether to deepcopy the arguments.
+            deepcopy (bool): Whether to deepcopy the arguments. The snapshots are never copied.
             overwrite_func_name (str): Optional. The name of the function to be recorded. If not specified, the name of
                                         the function will be used.
 
         Returns:
             dict: The arguments of the function.
         """
-        if deepcopy:
+        if deepcopy and not isinstance(args, RecordPickle):
             args = self._safe_deepcopy(args)
+        if deepcopy and not isinstance(kwargs, RecordPickle):
             kwargs = self._safe_deepcopy(kwargs)
 
         name = overwrite_func_name if overwrite_func_name is not None else func.__qualname__
@@ -198,8 +390,10 @@ class LoggableObject(metaclass=SetBrowserFunctionAttributeMeta):
         """
         Reconstruct the arguments dictionary for a given function based on its signature and the called arguments.
 
-        This method fetches the signature of the function and tries to match the provided called arguments and
-        keyword arguments to build the true arguments dictionary for the function call.
+        This method matches the provided called arguments and keyword arguments to the parameters of the function,
+        with the binding plan of the function that is built once from its signature, to build the true arguments
+        dictionary for the function call. The extra positional arguments are mapped as a tuple to the name of the
+        `*args` parameter, and the extra keyword arguments to their own names.
 
         Note that we have removed "self" from the called args, so be careful to remove it when it's a class method.
 
@@ -214,30 +408,12 @@ class LoggableObject(metaclass=SetBrowserFunctionAttributeMeta):
         Raises:
         - Exception: If there is a mismatch between the function's default arguments and its signature.
         """
-        sig = inspect.signature(func)
-        parameters = list(sig.parameters.values())
-
-        mapped_args = {}
+        plan = get_binding_plan(func)
 
         # Remove "self" from the parameters if it's a class method
-        if parameters[0].name == "self" or parameters[0].name == "cls":
-            parameters = parameters[1:]
-
-        # First, populate with defaults and arguments provided
-        for param in parameters:
-            if param.default != param.empty:  # if a default is provided
-                mapped_args[param.name] = param.default
-            else:
-                mapped_args[param.name] = None
-
-        # For positional arguments
-        for param, value in zip(parameters, called_args):
-            mapped_args[param.name] = value
-
-        # For keyword arguments (this will override any values set before)
-        mapped_args.update(called_kwargs)
+        skip_first = len(plan.positional) > 0 and plan.positional[0][0] in ("self", "cls")
 
-        return mapped_args
+        return plan.map_arguments(called_args, called_kwargs, skip_first=skip_first)
 
     def retrieve_args(
             self,
@@ -258,9 +434,14 @@ class LoggableObject(metaclass=SetBrowserFunctionAttributeMeta):
             self.logger.error(msg)
             raise ValueError(msg)
 
-        val = self._register_log_and_record_args_map[func.__qualname__]
+        args, kwargs, _ = self._register_log_and_record_args_map[func.__qualname__]
 
-        return self._rebuild_args_dict(func, val[0], val[1])
+        if isinstance(args, RecordPickle):
+            args = args.load()
+        if isinstance(kwargs, RecordPickle):
+            kwargs = kwargs.load()
+
+        return self._rebuild_args_dict(func, args, kwargs)
 
     def retrieve_latest_record_entry_details(self, func: callable):
         """
@@ -287,8 +468,18 @@ class LoggableObject(metaclass=SetBrowserFunctionAttributeMeta):
         Parameters:
             record_entry (RecordEntry): The record entry of the loggable object.
         """
+        previous_record_entry = self.__dict__.get("_record_entry")
         self._record_entry = record_entry
 
+        if not type(self)._track_reads:
+            # The writes are tracked by `__setattr__`, there is no need to intercept the reads.
+            return
+
+        if previous_record_entry is None and record_entry is not None:
+            _update_tracking(1)
+        elif previous_record_entry is not None and record_entry is None:
+            _update_tracking(-1)
+
 
 class RecordBook(object):
     """
@@ -322,6 +513,43 @@ class RecordBook(object):
             system_info_json = json.dumps(self._system_info)
             self._handler.add_record("system_info", system_info_json)
 
+        self._writer = None
+        if enable_write and config.get("async_write", False):
+            self._writer = AsyncRecordWriter(
+                self._handler,
+                max_queue_size=config.get("async_queue_size", 64),
+                backpressure=config.get("async_backpressure", "block"),
+            )
+
+        record_id_layout = config.get("record_id_layout", "datasets")
+        if record_id_layout not in ("datasets", "index"):
+            msg = f"Unknown record id layout {record_id_layout}. Available layouts: ('datasets', 'index')."
+            logger.error(msg)
+            raise ValueError(msg)
+
+        # The fingerprints of the attributes last written for each loggable object, keyed by the object id.
+        self._attribute_fingerprints = {}
+
+        snapshot_mode = config.get("snapshot_mode", "full")
+        if snapshot_mode not in _snapshot_modes:
+            msg = f"Unknown snapshot mode {snapshot_mode}. Available modes: {_snapshot_modes}."
+            logger.error(msg)
+            raise ValueError(msg)
+
+        # The state of the last delta encoded snapshot of each loggable object, keyed by the object id.
+        self._snapshot_states = {}
+        # The recently rebuilt delta encoded snapshots, keyed by their record entry path.
+        self._snapshot_cache = collections.OrderedDict()
+        self._snapshot_cache_size = config.get("snapshot_cache_size", 16)
+
+        # The sizes of the values in the blob store, keyed by their fingerprint.
+        self._blob_sizes = {}
+        self._blob_min_size = config.get("blob_min_size", 4096)
+        self._deduplication_statistics = {"values": 0, "value_bytes": 0, "stored_values": 0, "stored_bytes": 0}
+
+        self._index = RecordIndex(self, flush_size=config.get("index_flush_size", 100), loaded=enable_write,
+                                  index_record_ids=record_id_layout == "index")
+
         self._root_entry = RecordEntry(
             record_book=self,
             timestamp=0,
@@ -332,6 +560,9 @@ class RecordBook(object):
 
         self._root_entry.set_name("root")
 
+        if enable_write:
+            _open_record_books.add(self)
+
     def get_path(self):
         """
         Get the path of the record book.
@@ -368,9 +599,112 @@ class RecordBook(object):
 
         Returns:
             Any: The record.
+
+        Raises:
+            KeyError: If no record entry has the record id.
         """
-        path = self._handler.get_record_by_path(f"/uuid/{str(record_id)}").decode()
-        return self.get_record_by_path(path)
+        try:
+            # The record ids that are not in the index, which are all the record ids of the record books written with
+            # the datasets layout, store the path of their record entry in their own record.
+            path = self._handler.get_record_by_path(f"/uuid/{str(record_id)}")
+        except KeyError:
+            path = None
+
+        if path is None:
+            path = self._index.find_by_record_id(record_id)
+
+        if path is None:
+            msg = f"No record entry with the record id {record_id}."
+            logger.error(msg)
+            raise KeyError(msg)
+
+        return self.get_record_by_path(path.decode() if isinstance(path, bytes) else path)
+
+    def index_record(self, entry: "RecordEntry") -> bool:
+        """
+        Add a finished record entry to the index of the record book.
+
+        Parameters:
+            entry (RecordEntry): The record entry to index.
+
+        Returns:
+            bool: True if the record id of the record entry is indexed, False if it has to be recorded separately.
+        """
+        return self._index.add_entry(entry)
+
+    def get_record_by_timestamp(self, record_time: int) -> Optional["RecordEntry"]:
+        """
+        Get the record entry that started last at or before the given time.
+
+        Parameters:
+            record_time (int): The record time, in seconds since the epoch.
+
+        Returns:
+            RecordEntry: The record entry, None if no record entry started before the given time.
+        """
+        path = self._index.find_by_time(record_time)
+        return self.get_record_by_path(path) if path is not None else None
+
+    def get_records_by_time_range(self, start_time: int, end_time: int) -> list:
+        """
+        Get the record entries that started within the time range.
+
+        Parameters:
+            start_time (int): The start of the time range in seconds since the epoch, inclusive.
+            end_time (int): The end of the time range in seconds since the epoch, inclusive.
+
+        Returns:
+            list: The record entries, sorted by record time.
+        """
+        return [self.get_record_by_path(path) for path in self._index.find_by_time_range(start_time, end_time)]
+
+    def load_tree(self) -> "RecordEntry":
+        """
+        Load all the record entries of the record book in one pass, with their metadata.
+
+        The children of the returned entries are cached, so browsing the tree does not read the record book again.
+        If the handler cannot walk through the records in one pass, the entries are loaded on access instead.
+
+        Returns:
+            RecordEntry: The root entry of the record book.
+        """
+        root_path = self._root_entry.get_path()
+
+        try:
+            records = self._handler.walk_records(root_path, _metadata_keys)
+        except NotImplementedError:
+            return self._root_entry
+
+        root_entry = RecordEntry(record_book=self, full_path=root_path)
+        root_entry._children = []
+        entries = {root_path: root_entry}
+
+        for record_path, metadata in records:
+            record_path = pathlib.Path(record_path)
+            entry = RecordEntry(record_book=self, full_path=record_path, metadata=metadata)
+            entry._children = []
+            entries[record_path] = entry
+            entries[record_path.parent]._children.append(entry)
+
+        for entry in entries.values():
+            entry._children.sort(key=lambda child: child.record_order)
+
+        return root_entry
+
+    def iter_entries(self):
+        """
+        Iterate over all the record entries of the record book in depth first order, excluding the root entry.
+        The entries are loaded in one pass with `load_tree`.
+
+        Returns:
+            Iterator[RecordEntry]: The record entries.
+        """
+        stack = list(reversed(self.load_tree().children))
+
+        while stack:
+            entry = stack.pop()
+            yield entry
+            stack.extend(reversed(entry.children))
 
     def get_available_record_ids(self):
         """
@@ -379,7 +713,15 @@ class RecordBook(object):
         Returns:
             list: The available record ids.
         """
-        return self._handler.list_records("/uuid")
+        try:
+            record_ids = self._handler.list_records("/uuid")
+        except KeyError:
+            # The record books with the index layout have no `/uuid` group.
+            record_ids = []
+
+        listed_record_ids = set(record_ids)
+        return record_ids + [record_id for record_id in self._index.get_record_ids()
+                             if record_id not in listed_record_ids]
 
     @property
     def handler(self):
@@ -391,6 +733,26 @@ class RecordBook(object):
         """
         return self._handler
 
+    @property
+    def is_writable(self) -> bool:
+        """
+        Whether the record book is opened to be written, otherwise it is read only.
+
+        Returns:
+            bool: True if the record book can be written.
+        """
+        return self._enable_write
+
+    @property
+    def is_async(self) -> bool:
+        """
+        Whether the records are written by a background writer, after the write of the records returns.
+
+        Returns:
+            bool: True if the record book has a background writer.
+        """
+        return self._writer is not None
+
     def get_root_entry(self):
         """
         Get the root entry of the record book.
@@ -409,6 +771,251 @@ class RecordBook(object):
         """
         return int(self._system_info["start_time"])
 
+    def write_records(self, records: list):
+        """
+        Write a batch of records to the record book.
+
+        Parameters:
+            records (list): A list of (record_path, record) tuples.
+        """
+        if self._writer is not None:
+            self._writer.submit(records)
+        else:
+            self._handler.add_records(records)
+
+    def get_attribute_fingerprints(self, obj: LoggableObject) -> dict:
+        """
+        Get the fingerprints of the attributes of a loggable object that were last written to the record book. The
+        fingerprints are dropped when the object is garbage collected.
+
+        Parameters:
+            obj (LoggableObject): The loggable object.
+
+        Returns:
+            dict: The attribute names mapped to their (fingerprint, record path) tuples. Update it when an attribute
+                is written.
+        """
+        return self._get_object_state(self._attribute_fingerprints, obj)
+
+    def get_snapshot_state(self, obj: LoggableObject) -> dict:
+        """
+        Get the state of the last delta encoded snapshot of a loggable object. The state is dropped when the object
+        is garbage collected.
+
+        Parameters:
+            obj (LoggableObject): The loggable object.
+
+        Returns:
+            dict: The `path` of the record entry of the last snapshot, the `fingerprints` of the attributes of the
+                object at that snapshot, and the `count` of snapshots since the last keyframe. Empty if the object
+                has no snapshot yet. Update it when a snapshot is written.
+        """
+        return self._get_object_state(self._snapshot_states, obj)
+
+    @staticmethod
+    def _get_object_state(states: dict, obj: LoggableObject) -> dict:
+        """
+        Get the state kept for a loggable object, and create it if it does not exist.
+
+        Parameters:
+            states (dict): The states, keyed by the object id.
+            obj (LoggableObject): The loggable object.
+
+        Returns:
+            dict: The state of the object.
+        """
+        key = id(obj)
+        state = states.get(key)
+
+        if state is None:
+            state = states[key] = {}
+            weakref.finalize(obj, states.pop, key, None)
+
+        return state
+
+    def _load_entry_record(self, entry_path: str, key: str) -> Any:
+        """
+        Load and decode a record of a record entry, without loading the record entry.
+
+        Parameters:
+            entry_path (str): The path of the record entry.
+            key (str): The key of the record.
+
+        Returns:
+            Any: The decoded record, None if it does not exist.
+        """
+        try:
+            loaded_data = self._handler.get_record_by_path(f"{entry_path}/{key}")
+        except KeyError:
+            return None
+
+        if loaded_data is None:
+            return None
+
+        return RecordEntry._decode_record(loaded_data, self._handler.get_record_by_path)
+
+    def load_snapshot(self, entry_path: str) -> Optional[LoggableObject]:
+        """
+        Load the delta encoded snapshot of a record entry, by applying the deltas since the nearest keyframe. The
+        recently loaded snapshots are cached, so loading the record entries one after another only applies one
+        delta each time.
+
+        Parameters:
+            entry_path (str): The path of the record entry.
+
+        Returns:
+            LoggableObject: The snapshot, None if the record entry has no delta encoded snapshot.
+        """
+        deltas = []
+        path = entry_path
+
+        while True:
+            cached_obj = self._snapshot_cache.get(path)
+            if cached_obj is not None:
+                self._snapshot_cache.move_to_end(path)
+                obj = copy.deepcopy(cached_obj)
+                break
+
+            delta = self._load_entry_record(path, "__object_delta__")
+            if delta is None:
+                obj = self._load_entry_record(path, "__object_keyframe__")
+                break
+
+            deltas.append(delta)
+            path = delta["base"]
+
+        if obj is None:
+            if deltas:
+                msg = f"The keyframe of the snapshot of {entry_path} is missing at {path}."
+                logger.error(msg)
+                raise ValueError(msg)
+            return None
+
+        for delta in reversed(deltas):
+            obj.__dict__.update(delta["changed"])
+            for key in delta["removed"]:
+                obj.__dict__.pop(key, None)
+
+        if self._snapshot_cache_size > 0:
+            self._snapshot_cache[entry_path] = obj
+            while len(self._snapshot_cache) > self._snapshot_cache_size:
+                self._snapshot_cache.popitem(last=False)
+            obj = copy.deepcopy(obj)
+
+        return obj
+
+    def add_blob(self, fingerprint: bytes, size: int) -> Tuple[str, bool]:
+        """
+        Add a serialized value to the blob store of the record book, where each distinct value is stored once.
+
+        Parameters:
+            fingerprint (bytes): The fingerprint of the value.
+            size (int): The size of the serialized value in bytes.
+
+        Returns:
+            str: The path of the value in the blob store.
+            bool: True if the value is new and has to be written to the path, False if it is already stored.
+        """
+        name = fingerprint.hex()
+        is_new = name not in self._blob_sizes
+
+        statistics = self._deduplication_statistics
+        statistics["values"] += 1
+        statistics["value_bytes"] += size
+
+        if is_new:
+            self._blob_sizes[name] = size
+            statistics["stored_values"] += 1
+            statistics["stored_bytes"] += size
+
+        return f"{_blobs_path}/{name}", is_new
+
+    @property
+    def blob_min_size(self) -> int:
+        """
+        The minimum size in bytes of the arrays in the object snapshots to store separately in the blob store.
+
+        Returns:
+            int: The minimum size in bytes.
+        """
+        return self._blob_min_size
+
+    def get_deduplication_report(self) -> dict:
+        """
+        Get the report of the blob store, with the number and size of the values added to it and actually stored.
+        The report of a record book is saved to the record book when it is flushed.
+
+        Returns:
+            dict: The number of values and stored values, their size and the stored size in bytes, the saved size in
+                bytes and the saved fraction of the size.
+        """
+        if self._enable_write:
+            report = dict(self._deduplication_statistics)
+        else:
+            try:
+                report = {key: int(value) for key, value in self._handler.get_record_attributes(_blobs_path).items()}
+            except (KeyError, NotImplementedError):
+                report = {}
+
+            for key in self._deduplication_statistics:
+                report.setdefault(key, 0)
+
+        report["saved_bytes"] = report["value_bytes"] - report["stored_bytes"]
+        report["saved_ratio"] = report["saved_bytes"] / report["value_bytes"] if report["value_bytes"] else 0.0
+
+        return report
+
+    def _write_deduplication_report(self):
+        """
+        Save the report of the blob store to the record book, if any value has been added to it.
+        """
+        if self._deduplication_statistics["values"] > 0:
+            self.write_records([(_blobs_path, RecordAttributes(self._deduplication_statistics))])
+
+    def get_writer_statistics(self) -> Optional[dict]:
+        """
+        Get the statistics of the background writer.
+
+        Returns:
+            dict: The statistics of the background writer, None if the asynchronous write is not enabled.
+        """
+        if self._writer is None:
+            return None
+        return self._writer.get_statistics()
+
+    def get_system_info(self) -> dict:
+        """
+        Get the system information recorded when the record book was created.
+
+        Returns:
+            dict: The system information, including the start time and the user.
+        """
+        return self._system_info
+
+    def flush(self):
+        """
+        Flush the pending records of the record book to the storage.
+        """
+        if self._enable_write:
+            self._index.flush()
+            self._write_deduplication_report()
+        if self._writer is not None:
+            self._writer.flush()
+        self._handler.flush()
+
+    def close(self):
+        """
+        Flush the pending records and close the record book.
+        """
+        if self._enable_write and self in _open_record_books:
+            # The index is only closed once, the record book may be closed again at interpreter exit.
+            _open_record_books.discard(self)
+            self._index.close()
+            self._write_deduplication_report()
+        if self._writer is not None:
+            self._writer.close()
+        self._handler.close()
+
 
 class RecordEntry(object):
     """
@@ -427,6 +1034,12 @@ class RecordEntry(object):
             record_order: Optional[int] = None,
             base_path: Optional[pathlib.Path] = None,
             full_path: Optional[pathlib.Path] = None,
+            write_buffer: bool = False,
+            metadata_layout: str = "datasets",
+            metadata: Optional[dict] = None,
+            change_detection: bool = False,
+            deduplicate_snapshots: bool = False,
+            snapshot_keyframe_interval: Optional[int] = None,
     ):
         """
         Initialize the RecordEntry class.
@@ -437,6 +1050,19 @@ class RecordEntry(object):
             record_order (int): The order of the record entry.
             base_path (pathlib.Path): The base path of the record entry.
             record_book (RecordBook): The record book of the record entry.
+            write_buffer (bool): Whether to buffer the saved attributes in memory, and write them to the record book
+                                 in one batch when `commit` is called.
+            metadata_layout (str): How to store the metadata. `datasets` saves each value as a separate attribute
+                                   record, `attributes` saves them together as the attributes of the record entry.
+            metadata (dict): Optional. The metadata of the record entry loaded from `full_path`, to skip reading
+                             it from the record book again.
+            change_detection (bool): Whether to link the attributes that have not changed since the last record of
+                                     the same object to their earlier record, instead of writing them again.
+            deduplicate_snapshots (bool): Whether to store the object snapshots in the blob store of the record
+                                          book, so identical snapshots are stored once.
+            snapshot_keyframe_interval (int): Optional. If set, the object snapshots are stored as the changes since
+                                              the last snapshot of the same object, with a full snapshot every
+                                              `snapshot_keyframe_interval` snapshots.
         """
         self._timestamp = timestamp
         self._record_id = record_id
@@ -444,7 +1070,19 @@ class RecordEntry(object):
         self._name = None
         self._record_book = record_book
         self._base_path = base_path
-        self._touched_attributes = []
+        # The touched attributes in the order they are first touched, with their [reads, writes] counts.
+        self._touched_attributes = {}
+        # A new record entry has no children yet. The loaded record entries, and the root entry of a read only
+        # record book, seed the count from the record book on the first child allocation, the new ones may not be
+        # written to the record book yet.
+        self._children_count = 0 if record_book.is_writable else None
+        self._write_buffer = [] if write_buffer else None
+        self._metadata_layout = metadata_layout
+        self._change_detection = change_detection
+        self._deduplicate_snapshots = deduplicate_snapshots
+        self._snapshot_keyframe_interval = snapshot_keyframe_interval
+        self._children = None  # Cached children, set when the record book tree is loaded in one pass.
+        self._streams = {}  # The streams opened in the record entry, by their keys.
 
         if (
                 timestamp is None
@@ -456,15 +1094,17 @@ class RecordEntry(object):
             # a record entry.
             assert full_path is not None
             self._base_path = full_path
+            self._children_count = None
 
-            self._load_from_path(full_path)
+            self._load_from_path(full_path, metadata)
 
-    def _load_from_path(self, path: pathlib.Path):
+    def _load_from_path(self, path: pathlib.Path, metadata: Optional[dict] = None):
         """
         Load the record entry from the path.
 
         Parameters:
             path (pathlib.Path): The path to the record entry.
+            metadata (dict): Optional. The metadata of the record entry, if it has been loaded already.
         """
 
         if path == pathlib.Path("/root"):
@@ -487,7 +1127,11 @@ class RecordEntry(object):
             raise ValueError(msg)
 
         self._record_order, self._name = int(splits[0]), splits[1]
-        self._load_metadata()
+
+        if metadata is not None:
+            self._apply_metadata(metadata)
+        else:
+            self._load_metadata()
 
     @property
     def record_book(self):
@@ -554,7 +1198,7 @@ class RecordEntry(object):
         """
         return self.get_path() / key
 
-    def touch_attribute(self, key: str):
+    def touch_attribute(self, key: str, write: bool = False):
         """
         Touch an attribute of the record entry, and set it as dirty.
         The dirty attribute will be recorded separately when the record entry is saved.
@@ -562,9 +1206,55 @@ class RecordEntry(object):
 
         Parameters:
             key (str): The key of the attribute.
+            write (bool): Whether the attribute is written, otherwise it is read.
+        """
+        counts = self._touched_attributes.get(key)
+        if counts is None:
+            counts = self._touched_attributes[key] = [0, 0]
+        counts[write] += 1
+
+    def open_stream(self, key: str, dtype: np.dtype, chunk_shape: tuple = None) -> RecordStream:
+        """
+        Open a stream, an array attribute written block by block while the function is running. The attribute is
+        recorded with the touched attributes, the object does not need to have it.
+
+        Parameters:
+            key (str): The key of the attribute.
+            dtype (np.dtype): The data type of the array.
+            chunk_shape (tuple): Optional. The chunk shape of the record, including the first axis.
+
+        Returns:
+            RecordStream: The stream.
+
+        Raises:
+            ValueError: If a stream is already opened with the same key.
+        """
+        self._check_initiated()
+
+        if key in self._streams:
+            msg = f"Stream {key} is already opened in {self.get_path()}."
+            logger.error(msg)
+            raise ValueError(msg)
+
+        stream = RecordStream(self, key, dtype, chunk_shape)
+        self._streams[key] = stream
+        self.touch_attribute(key, write=True)
+        return stream
+
+    def write_stream_rows(self, key: str, rows: RecordRows):
         """
-        if key not in self._touched_attributes:
-            self._touched_attributes.append(key)
+        Write the rows appended to a stream. The rows are written to the record book right away, bypassing the write
+        buffer of the record entry.
+
+        Parameters:
+            key (str): The key of the stream.
+            rows (RecordRows): The rows to append.
+        """
+        if self._record_book.is_async:
+            # The rows may be written by the background writer, after the block is reused.
+            rows = capture_record(rows)
+
+        self._record_book.write_records([(self._get_attribute_path(key), rows)])
 
     def set_name(self, name: str):
         """
@@ -575,20 +1265,165 @@ class RecordEntry(object):
         """
         self._name = name
 
-    def record_object(self, obj: LoggableObject):
+    def record_object(self, obj: LoggableObject, snapshot: bool = True):
         """
         Record the loggable object.
 
         Parameters:
             obj (LoggableObject): The loggable object to record.
+            snapshot (bool): Whether to save a snapshot of the whole object, otherwise only the touched attributes
+                             are saved.
         """
-        # Save all the dirty attributes
-        for attr in self._touched_attributes:
-            self.save_attribute(attr, getattr(obj, attr))
+        # Save all the dirty attributes, the streams are written already.
+        if self._change_detection:
+            self._record_changed_attributes(obj)
+        else:
+            for attr in self._touched_attributes:
+                if attr not in self._streams:
+                    self.save_attribute(attr, getattr(obj, attr))
 
         # Save the object itself
-        self.save_attribute("__object__", obj)
-        self.save_attribute("__touched_attributes__", self._touched_attributes)
+        if snapshot:
+            if self._snapshot_keyframe_interval is not None and self._is_delta_encodable(obj):
+                self._save_snapshot_delta(obj)
+            else:
+                self._save_snapshot("__object__", obj)
+
+        # The touched attributes are stored as json by both layouts, a single string value.
+        if self._metadata_layout == "attributes":
+            self._write_record(self.get_path(), RecordAttributes(
+                __touched_attributes__=json.dumps(self._touched_attributes)
+            ))
+        else:
+            self.save_attribute("__touched_attributes__", json.dumps(self._touched_attributes))
+
+    def _save_snapshot(self, key: str, obj: LoggableObject):
+        """
+        Save a full snapshot of the loggable object.
+
+        Parameters:
+            key (str): The key of the snapshot.
+            obj (LoggableObject): The loggable object.
+        """
+        if self._deduplicate_snapshots:
+            self._save_blob(key, obj)
+        else:
+            self.save_attribute(key, obj)
+
+    @staticmethod
+    def _is_delta_encodable(obj: LoggableObject) -> bool:
+        """
+        Check whether the snapshot of an object can be delta encoded, that is whether it is pickled as its class and
+        its `__dict__`.
+
+        Parameters:
+            obj (LoggableObject): The loggable object.
+
+        Returns:
+            bool: True if the snapshot can be delta encoded.
+        """
+        cls = type(obj)
+        return (
+                cls.__reduce_ex__ is object.__reduce_ex__
+                and cls.__reduce__ is object.__reduce__
+                and getattr(cls, "__getstate__", None) is getattr(object, "__getstate__", None)
+                and not hasattr(cls, "__setstate__")
+                and not hasattr(cls, "__slots__")
+        )
+
+    def _save_snapshot_delta(self, obj: LoggableObject):
+        """
+        Save the snapshot of the loggable object as the attributes that changed since its last snapshot, or as a
+        full keyframe every `snapshot_keyframe_interval` snapshots.
+
+        Parameters:
+            obj (LoggableObject): The loggable object.
+        """
+        state = self._record_book.get_snapshot_state(obj)
+        attributes = obj.__dict__
+        fingerprints = {}
+
+        if state and state["count"] < self._snapshot_keyframe_interval:
+            changed = {}
+            for key, val in attributes.items():
+                fingerprints[key], _ = fingerprint_record(val)
+                if state["fingerprints"].get(key) != fingerprints[key]:
+                    changed[key] = val
+
+            removed = [key for key in state["fingerprints"] if key not in attributes]
+            self.save_attribute("__object_delta__", {"base": state["path"], "changed": changed, "removed": removed})
+            state["count"] += 1
+        else:
+            for key, val in attributes.items():
+                fingerprints[key], _ = fingerprint_record(val)
+
+            self._save_snapshot("__object_keyframe__", obj)
+            state["count"] = 1
+
+        state["path"] = self.get_path().as_posix()
+        state["fingerprints"] = fingerprints
+
+    def _write_blob(self, fingerprint: bytes, size: int, val: Any) -> str:
+        """
+        Write a value to the blob store of the record book, unless the blob store already contains it.
+
+        Parameters:
+            fingerprint (bytes): The fingerprint of the value.
+            size (int): The size of the value in bytes.
+            val (Any): The value, a numpy array or a pickle as `np.void`.
+
+        Returns:
+            str: The path of the value in the blob store.
+        """
+        blob_path, is_new = self._record_book.add_blob(fingerprint, size)
+        if is_new:
+            self._write_record(blob_path, val)
+        return blob_path
+
+    def _save_blob(self, key: str, val: Any):
+        """
+        Save an attribute to the blob store of the record book, and link the attribute to it. The large numpy
+        arrays in the value are stored as separate values, so the arrays that do not change are stored once even
+        when the rest of the value changes.
+
+        Parameters:
+            key (str): The key of the attribute.
+            val (Any): The value of the attribute.
+        """
+
+        def save_array(array: np.ndarray) -> str:
+            fingerprint, array = fingerprint_record(array)
+            return self._write_blob(fingerprint, array.nbytes, array)
+
+        pickled_val = dumps_with_blobs(val, save_array, self._record_book.blob_min_size)
+        blob_path = self._write_blob(fingerprint_bytes(pickled_val), len(pickled_val), np.void(pickled_val))
+
+        self._write_record(self._get_attribute_path(key), RecordLink(blob_path))
+
+    def _record_changed_attributes(self, obj: LoggableObject):
+        """
+        Save the touched attributes that have changed since the last record of the same object, and link the others
+        to the record they were last written to.
+
+        Parameters:
+            obj (LoggableObject): The loggable object to record.
+        """
+        fingerprints = self._record_book.get_attribute_fingerprints(obj)
+
+        for attr in self._touched_attributes:
+            if attr in self._streams:
+                continue
+
+            fingerprint, val = fingerprint_record(getattr(obj, attr))
+            path = self._get_attribute_path(attr)
+
+            last_written = fingerprints.get(attr)
+            if last_written is not None and last_written[0] == fingerprint:
+                self._write_record(path, RecordLink(last_written[1]))
+                continue
+
+            self._write_record(path, val)
+            fingerprints[attr] = (fingerprint, path)
 
     def record_return_values(self, return_values: Any):
         """
@@ -622,8 +1457,9 @@ class RecordEntry(object):
         Record the arguments of the function.
 
         Parameters:
-            args (list): The arguments of the function.
-            kwargs (dict): The keyword arguments of the function.
+            args (list): The arguments of the function, or their snapshot from
+                         `LoggableObject.capture_log_and_record_args`.
+            kwargs (dict): The keyword arguments of the function, or their snapshot.
         """
         self.save_attribute("__args__", args)
         self.save_attribute("__kwargs__", kwargs)
@@ -632,19 +1468,82 @@ class RecordEntry(object):
         """
         Record the metadata of the record entry.
         """
+        if self._metadata_layout == "attributes":
+            self._check_initiated()
+            self._write_record(self.get_path(), RecordAttributes(
+                __timestamp__=self._timestamp,
+                __record_id__=str(self._record_id),
+                __name__=self._name,
+            ))
+            return
+
         self.save_attribute("__timestamp__", self._timestamp)
         self.save_attribute("__record_id__", self._record_id)
         self.save_attribute("__name__", self._name)
 
     def _load_metadata(self):
         """
-        Load the metadata of the record entry.
+        Load the metadata of the record entry. The metadata saved as attributes of the record entry are read in one
+        operation, otherwise each value is loaded from its own record.
         """
+        try:
+            attributes = self._record_book.handler.get_record_attributes(self.get_path())
+        except NotImplementedError:
+            attributes = {}
+
+        if "__name__" in attributes:
+            self._apply_metadata(attributes)
+            return
+
         self._timestamp = self.load_attribute("__timestamp__")
         self._record_id = self.load_attribute("__record_id__")
         self._name = self.load_attribute("__name__")
-        self._touched_attributes = self.load_attribute(
-            "__touched_attributes__")
+        try:
+            touched_attributes = self.load_attribute("__touched_attributes__")
+        except KeyError:
+            # Records without an object, for example the events, have no touched attributes.
+            touched_attributes = None
+        self._touched_attributes = self._parse_touched_attributes(touched_attributes)
+
+    def _apply_metadata(self, metadata: dict):
+        """
+        Set the metadata of the record entry from the values read from the record book.
+
+        Parameters:
+            metadata (dict): The metadata values, as stored by either metadata layout.
+        """
+        metadata = {key: self._decode_record(value) for key, value in metadata.items()}
+
+        if "__timestamp__" in metadata:
+            self._timestamp = int(metadata["__timestamp__"])
+        self._record_id = metadata.get("__record_id__")
+        self._name = metadata.get("__name__", self._name)
+
+        self._touched_attributes = self._parse_touched_attributes(metadata.get("__touched_attributes__"))
+
+    @staticmethod
+    def _parse_touched_attributes(touched_attributes: Any) -> dict:
+        """
+        Parse the touched attributes read from the record book.
+
+        Parameters:
+            touched_attributes (Any): The touched attributes as stored, a dict of the attribute names to their
+                [reads, writes] counts, or a list of the attribute names for the records written without counts. They
+                are stored as json, or pickled by the older records of the datasets layout.
+
+        Returns:
+            dict: The attribute names mapped to their [reads, writes] counts, None if the counts are not recorded.
+        """
+        if touched_attributes is None:
+            return {}
+
+        if isinstance(touched_attributes, str):
+            touched_attributes = json.loads(touched_attributes)
+
+        if isinstance(touched_attributes, dict):
+            return {key: list(counts) if counts is not None else None for key, counts in touched_attributes.items()}
+
+        return dict.fromkeys(touched_attributes)
 
     def get_object(self):
         """
@@ -653,14 +1552,29 @@ class RecordEntry(object):
         Returns:
             LoggableObject: The loggable object.
         """
-        return self.load_attribute("__object__")
+        try:
+            obj = self.load_attribute("__object__")
+        except KeyError:
+            obj = None
+
+        if obj is None:
+            # The snapshot may be delta encoded.
+            obj = self._record_book.load_snapshot(self.get_path().as_posix())
+
+        if obj is None:
+            msg = f"The record entry {self.get_path()} has no snapshot of the object."
+            logger.error(msg)
+            raise KeyError(msg)
+
+        return obj
 
-    def get_attribute(self, key: str):
+    def get_attribute(self, key: str, lazy: bool = False):
         """
         Get an attribute of the record entry.
 
         Parameters:
             key (str): The key of the attribute.
+            lazy (bool): Optional. Whether to return a proxy for the arrays, see `load_attribute`.
 
         Returns:
             Any: The value of the attribute.
@@ -668,16 +1582,25 @@ class RecordEntry(object):
         assert (
                 key in self._touched_attributes
         ), f"Attribute {key} is not recorded. Please try access through the object."
-        return self.load_attribute(key)
+        return self.load_attribute(key, lazy=lazy)
 
-    def get_recorded_attribute_names(self):
+    def get_recorded_attribute_names(self, with_counts: bool = False):
         """
         Get the recorded attributes of the record entry.
 
+        Parameters:
+            with_counts (bool): Whether to return the number of reads and writes of each attribute.
+
         Returns:
-            list: The recorded attributes of the record entry.
+            list: The recorded attributes of the record entry, in the order they are first touched. With
+                `with_counts`, a dict of the attribute names to their (reads, writes) counts instead. The counts are
+                None for the records written without counts.
         """
-        return self._touched_attributes
+        if with_counts:
+            return {key: tuple(counts) if counts is not None else None
+                    for key, counts in self._touched_attributes.items()}
+
+        return list(self._touched_attributes)
 
     def get_args(self):
         """
@@ -704,14 +1627,50 @@ class RecordEntry(object):
         self._check_initiated()
 
         path = self._get_attribute_path(key)
-        self._record_book.handler.add_record(path, val)
+        self._write_record(path, val)
+
+    def _write_record(self, path: Union[pathlib.Path, str], val: Any):
+        """
+        Write a record to the record book, or to the write buffer if it is enabled.
+
+        Parameters:
+            path (pathlib.Path or str): The path of the record.
+            val (Any): The value of the record.
+        """
+        if self._write_buffer is None:
+            self._record_book.handler.add_record(path, val)
+        else:
+            # Capture the value now, it may be modified before the buffer is committed.
+            self._write_buffer.append((path, capture_record(val)))
+
+    def record_index(self):
+        """
+        Record the link from the record id to the path of the record entry, and add the record entry to the index of
+        the record book.
+        """
+        if not self._record_book.index_record(self):
+            self._write_record(f"/uuid/{self._record_id}", str(self.get_path()))
 
-    def load_attribute(self, key: str):
+    def commit(self):
+        """
+        Write the buffered records to the record book in one batch.
+        """
+        if not self._write_buffer:
+            return
+
+        self._record_book.write_records(self._write_buffer)
+        self._write_buffer = []
+
+    def load_attribute(self, key: str, lazy: bool = False):
         """
         Load an attribute of the record entry.
 
         Parameters:
             key (str): The key of the attribute.
+            lazy (bool): Optional. Whether to return a proxy for the arrays, which reads only the parts of the array
+                         that are sliced, instead of reading the whole array. Only the handlers that support it
+                         return proxies, for example `HDF5DatasetProxy` of the hdf5 handler. The arrays in the
+                         dicts, lists and tuples that the handler stores natively are returned as proxies as well.
 
         Returns:
             Any: The value of the attribute.
@@ -720,14 +1679,39 @@ class RecordEntry(object):
         self._check_initiated()
 
         path = self._get_attribute_path(key)
-        loaded_data = self._record_book.handler.get_record_by_path(path)
 
+        if lazy:
+            loaded_data = self._record_book.handler.get_lazy_record_by_path(path)
+        else:
+            loaded_data = self._record_book.handler.get_record_by_path(path)
+
+        return self._decode_record(loaded_data, self._record_book.handler.get_record_by_path)
+
+    @staticmethod
+    def _decode_record(loaded_data: Any, load_blob: Optional[Callable[[str], Any]] = None):
+        """
+        Decode the data loaded from the handler, converting bytes to strings, rebuilding record trees and unpickling
+        serialized objects.
+
+        Parameters:
+            loaded_data (Any): The data loaded from the handler.
+            load_blob (Callable): Optional. Loads the arrays that the object snapshots store in the blob store.
+
+        Returns:
+            Any: The decoded value.
+        """
         if isinstance(loaded_data, bytes):
             loaded_data = loaded_data.decode()
 
-        if isinstance(loaded_data, np.void):
+        if isinstance(loaded_data, RecordTree):
+            loaded_data = loaded_data.load()
+
+        if isinstance(loaded_data, (np.void, RecordPickle)):
             try:
-                loaded_data = pickle.loads(loaded_data.tobytes())
+                if isinstance(loaded_data, RecordPickle):
+                    loaded_data = loaded_data.load()
+                else:
+                    loaded_data = loads_with_blobs(loaded_data.tobytes(), load_blob)
             except Exception as e:
                 msg = f'Pickle loading failed:{e}'
                 loaded_data = None
@@ -744,6 +1728,24 @@ class RecordEntry(object):
         """
         return len(self._get_children_names())
 
+    def allocate_child_order(self):
+        """
+        Allocate the order of a new child record entry.
+
+        The number of existing children is only read from the record book once, afterwards the allocated orders
+        are counted in memory, so the allocation does not slow down with the number of children.
+
+        Returns:
+            int: The order of the new child record entry.
+        """
+        if self._children_count is None:
+            self._children_count = self.get_children_number()
+
+        record_order = self._children_count
+        self._children_count += 1
+
+        return record_order
+
     def _get_children_names(self):
         """
         Get the children names of the record entry.
@@ -754,8 +1756,7 @@ class RecordEntry(object):
         list_of_names = self._record_book.handler.list_records(self.get_path())
 
         # Sub record names always start with a number, while attributes cannot.
-        # TODO: this search is not efficient, may significantly slow down when a same routine get repeatedly executed,
-        #  should be improved.
+        # Use `allocate_child_order` instead when creating new records, it only runs this search once.
         children_names = [
             name for name in list_of_names if name[0] in "0123456789"]
 
@@ -770,6 +1771,9 @@ class RecordEntry(object):
             list: The children of the record entry.
         """
 
+        if self._children is not None:
+            return self._children
+
         children_names = self._get_children_names()
 
         return [
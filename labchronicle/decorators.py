@@ -1,3 +1,4 @@
+import functools
 import inspect
 
 import decorator
@@ -5,12 +6,49 @@ import decorator
 from .logger import setup_logging
 from .chronicle import Chronicle
 from .core import LoggableObject
+from .binding import get_binding_plan
+from .snapshots import SnapshotPolicy
 
 logger = setup_logging(__name__)
 
 
-@decorator.decorator
-def log_and_record(func, overwrite_func_name=None, *args, **kwargs):
+def _binding_decorator(caller):
+    """
+    Convert a caller function into a decorator, as `decorator.decorator` does. `decorator.decorator` binds the
+    arguments with `inspect.Signature.bind` on every call of the decorated function, here they are bound with the
+    binding plan of the function, which is built once when the function is decorated.
+
+    Parameters:
+        caller (function): The caller function, taking the decorated function, the arguments of the decorator and the
+                           arguments of the call.
+
+    Returns:
+        function: The decorator.
+    """
+    decorator_parameters = [parameter for parameter in inspect.signature(caller).parameters.values()
+                            if parameter.kind is inspect.Parameter.POSITIONAL_OR_KEYWORD][1:]
+
+    def bound_caller(func, plan, extras, /, *args, **kwargs):
+        # The parameters of the bound caller are positional only, so they do not clash with the keyword arguments
+        # of the call, which have not been bound yet.
+        args, kwargs = plan.bind(args, kwargs)
+        return caller(func, *extras, *args, **kwargs)
+
+    @functools.wraps(caller)
+    def binding_decorator(func=None, *args, **kwargs):
+        extras = args + tuple(kwargs.get(parameter.name, parameter.default)
+                              for parameter in decorator_parameters[len(args):])
+
+        def decorate(func):
+            return decorator.decorate(func, bound_caller, (get_binding_plan(func), extras), kwsyntax=True)
+
+        return decorate if func is None else decorate(func)
+
+    return binding_decorator
+
+
+@_binding_decorator
+def log_and_record(func, overwrite_func_name=None, snapshot_policy: SnapshotPolicy = None, *args, **kwargs):
     """
     Decorator function for the functions that want to be logged. The function must be a method of a LoggableObject.
     Using this decorator will record the object and modified attributes within this function call
@@ -20,16 +58,20 @@ def log_and_record(func, overwrite_func_name=None, *args, **kwargs):
         func (function): The function to be logged.
         overwrite_func_name (str): Optional. The name of the function to be recorded. If not specified, the name of
                                     the function will be used.
+        snapshot_policy (SnapshotPolicy): Optional. The policy deciding when to take a snapshot of the object. If
+                                          not specified, the `_snapshot_policy` of the class is used, and a snapshot
+                                          is taken on every call if it is None.
         args (list): The arguments of the function.
         kwargs (dict): The keyword arguments of the function.
 
     Returns:
         Any: The return value of the function.
     """
-    return _log_and_record(func, args, kwargs, overwrite_func_name=overwrite_func_name)
+    return _log_and_record(func, args, kwargs, overwrite_func_name=overwrite_func_name,
+                           snapshot_policy=snapshot_policy)
 
 
-@decorator.decorator
+@_binding_decorator
 def log_event(func,overwrite_func_name=None, *args, **kwargs):
     """
     Decorator function for the functions that want to be logged. The function must be a method of a LoggableObject.
@@ -48,7 +90,7 @@ def log_event(func,overwrite_func_name=None, *args, **kwargs):
     return _log_and_record(func, args, kwargs, record_details=False, overwrite_func_name=overwrite_func_name)
 
 
-def _log_and_record(func, args, kwargs, record_details=True, overwrite_func_name=None):
+def _log_and_record(func, args, kwargs, record_details=True, overwrite_func_name=None, snapshot_policy=None):
     """
     Decorator function for the functions that want to be logged. The function must be a method of a LoggableObject.
 
@@ -60,6 +102,8 @@ def _log_and_record(func, args, kwargs, record_details=True, overwrite_func_name
                                 If false, only the arguments and return values are recorded.
         overwrite_func_name (str): Optional. The name of the function to be recorded. If not specified, the name of
                                     the function will be used.
+        snapshot_policy (SnapshotPolicy): Optional. The policy deciding when to take a snapshot of the object,
+                                          defaults to the `_snapshot_policy` of the class.
 
     Returns:
         Any: The return value of the function.
@@ -92,7 +136,10 @@ def _log_and_record(func, args, kwargs, record_details=True, overwrite_func_name
 
         record.set_name(name)
         record.record_metadata()
-        record.record_args(args[1:], kwargs)
+
+        # The arguments are captured once, the same snapshot is recorded and registered to the object.
+        captured_args, captured_kwargs = self.capture_log_and_record_args(args[1:], kwargs)
+        record.record_args(captured_args, captured_kwargs)
 
         # Save the argument to the class as well.
 
@@ -100,7 +147,7 @@ def _log_and_record(func, args, kwargs, record_details=True, overwrite_func_name
             self.set_record_entry(record)
 
         # Set attributes to the object to indicate the latest record details.
-        record_details = {
+        latest_record_details = {
             "record_id": str(record.record_id),
             "record_entry_path": str(record.get_path()),
             "record_book_path": str(record.record_book.get_path()),
@@ -108,7 +155,7 @@ def _log_and_record(func, args, kwargs, record_details=True, overwrite_func_name
         }
 
         self.register_log_and_record_args(
-            func, args[1:], kwargs, record_details=record_details
+            func, captured_args, captured_kwargs, record_details=latest_record_details, deepcopy=False
         )
 
         try:
@@ -128,7 +175,7 @@ def _log_and_record(func, args, kwargs, record_details=True, overwrite_func_name
         # self.logger.info(f'{record.record_id}: {func.__qualname__} recorded.')
 
         # Set attributes to the object to indicate the latest record details.
-        record_details = {
+        latest_record_details = {
             "record_id": str(record.record_id),
             "record_entry_path": str(record.get_path()),
             "record_book_path": str(record.record_book.get_path()),
@@ -136,12 +183,16 @@ def _log_and_record(func, args, kwargs, record_details=True, overwrite_func_name
         }
 
         self.register_log_and_record_args(
-            func, args[1:], kwargs, record_details=record_details, overwrite_func_name=overwrite_func_name
+            func, captured_args, captured_kwargs, record_details=latest_record_details, deepcopy=False,
+            overwrite_func_name=overwrite_func_name
         )
 
         # Take a snapshot of the object after finish the function execution.
         if record_details:
-            record.record_object(self)
+            if snapshot_policy is None:
+                snapshot_policy = type(self)._snapshot_policy
+            snapshot = snapshot_policy is None or snapshot_policy.should_snapshot(self)
+            record.record_object(self, snapshot=snapshot)
 
     if error_info is not None:
         raise error_info
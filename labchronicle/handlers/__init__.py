@@ -1,7 +1,7 @@
-from .hdf5 import RecordHandlerHDF5
+from .hdf5 import RecordHandlerHDF5, HDF5DatasetProxy
 from .dummy import RecordHandlerDummy
 from labchronicle.logger import setup_logging
-from .handlers import RecordHandlersBase
+from .handlers import RecordHandlersBase, RecordAttributes, RecordRows, RecordLink, RecordPickle, RecordTree
 from .memory import RecordHandlerMemory
 
 logger = setup_logging(__name__)
@@ -0,0 +1,66 @@
+# This file contains the chunking policy of the array datasets, which picks the chunk shape of an array from its
+# shape, its data type, a target chunk size in bytes and the way the array is read.
+import math
+from typing import Optional
+
+import numpy as np
+
+# The access patterns of the arrays:
+# + `row`: The array is read along its trailing axes, one or a few indices of its first axis at a time, for example
+#          one trace of a sweep. The chunks span the trailing axes.
+# + `column`: The array is read along its first axis, one or a few indices of its trailing axes at a time, for
+#             example one sample of every trace. The chunks span the first axis.
+# + `balanced`: The chunks are shrunk along all the axes in turn, so they keep the proportions of the array.
+access_patterns = ("row", "column", "balanced")
+
+# The target size of a chunk in bytes, when only the access pattern is set.
+default_chunk_size = 2 ** 20
+
+
+def choose_chunk_shape(shape: tuple, dtype: np.dtype, chunk_size: int = default_chunk_size,
+                       access_pattern: str = "balanced", unlimited: bool = False) -> Optional[tuple]:
+    """
+    Choose the chunk shape of an array dataset. Starting from the whole array, the axes are halved in turn, in an
+    order set by the access pattern, until a chunk is at most `chunk_size` bytes.
+
+    Parameters:
+        shape (tuple): The shape of the array.
+        dtype (np.dtype): The data type of the array.
+        chunk_size (int): The target size of a chunk in bytes.
+        access_pattern (str): How the array is read, one of `access_patterns`.
+        unlimited (bool): Whether the first axis of the array grows, for the resizable datasets. The trailing axes
+                          are shrunk first, and the chunks span as many indices of the first axis as the chunk size
+                          allows, except for the `column` access pattern.
+
+    Returns:
+        tuple: The chunk shape, or None if the array has no elements.
+    """
+    if len(shape) == 0 or 0 in shape[1:] or (0 in shape[:1] and not unlimited):
+        return None
+
+    max_elements = max(chunk_size // max(np.dtype(dtype).itemsize, 1), 1)
+
+    chunk = list(shape)
+    if unlimited:
+        chunk[0] = max_elements if access_pattern == "column" else 1
+
+    if access_pattern == "row":
+        axes_order = [[0], list(range(1, len(chunk)))]
+    elif access_pattern == "column":
+        axes_order = [list(range(1, len(chunk))), [0]]
+    else:
+        axes_order = [list(range(len(chunk)))]
+
+    for axes in axes_order:
+        turn = 0
+        while math.prod(chunk) > max_elements and any(chunk[axis] > 1 for axis in axes):
+            # Halve the axes of the group in turn, skipping the axes that cannot be shrunk anymore.
+            axis = axes[turn % len(axes)]
+            turn += 1
+            if chunk[axis] > 1:
+                chunk[axis] = (chunk[axis] + 1) // 2
+
+    if unlimited and access_pattern != "column":
+        chunk[0] = max(max_elements // math.prod(chunk[1:]), 1)
+
+    return tuple(chunk)
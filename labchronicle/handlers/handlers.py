@@ -1,9 +1,255 @@
 # This file contains the abstract definition of the handlers.
-from typing import Any, Union
+from typing import Any, Optional, Union
 import pathlib
+import pickle
+
+import numpy as np
 from labchronicle.logger import setup_logging
 
 
+class RecordAttributes(dict):
+    """
+    A record that holds small metadata values. Adding it to a path attaches the values to the group at that path,
+    for example as HDF5 attributes, instead of creating a separate record for each value.
+    """
+
+    def copy(self):
+        """
+        Make a shallow copy of the record attributes.
+
+        Returns:
+            RecordAttributes: The copy.
+        """
+        return RecordAttributes(self)
+
+
+class RecordRows(object):
+    """
+    A record that holds rows to append to a resizable record along its first axis. Adding it to a path creates the
+    record if it does not exist, otherwise the rows are appended to the existing record.
+    """
+
+    def __init__(self, rows, chunk_shape: tuple = None):
+        """
+        Initialize the record rows.
+
+        Parameters:
+            rows (np.ndarray): The rows to append.
+            chunk_shape (tuple): Optional. The chunk shape of the record, used when the record is created.
+        """
+        self.rows = rows
+        self.chunk_shape = chunk_shape
+
+    def copy(self):
+        """
+        Make a copy of the record rows.
+
+        Returns:
+            RecordRows: The copy.
+        """
+        return RecordRows(self.rows.copy(), self.chunk_shape)
+
+
+class RecordLink(object):
+    """
+    A record that refers to an existing record. Adding it to a path makes the path point to the same data as the
+    target record, for example as an HDF5 hard link, instead of writing the data again.
+    """
+
+    def __init__(self, target_path: Union[pathlib.Path, str]):
+        """
+        Initialize the record link.
+
+        Parameters:
+            target_path (pathlib.Path or str): The path to the existing record.
+        """
+        if isinstance(target_path, pathlib.Path):
+            target_path = target_path.as_posix()
+
+        self.target_path = target_path
+
+
+class RecordPickle(object):
+    """
+    A record that holds a value pickled with protocol 5, and the buffers of the pickle that are serialized
+    out-of-band, for example the data of the numpy arrays. The buffers are stored as they are next to the pickle,
+    instead of being copied into it, and the value is rebuilt on top of them without copying them again.
+    """
+
+    @classmethod
+    def dumps(cls, value: Any, min_buffer_size: int = 4096, copy_buffers: bool = True) -> "RecordPickle":
+        """
+        Pickle a value, with the buffers of at least `min_buffer_size` bytes serialized out-of-band. The buffers of
+        the numpy arrays with numeric data types keep their data type and shape, the others are stored as bytes.
+
+        Parameters:
+            value (Any): The value to pickle.
+            min_buffer_size (int): The minimum size in bytes of the buffers to serialize out-of-band, the smaller
+                                   buffers are copied into the pickle.
+            copy_buffers (bool): Whether to copy the buffers into read-only arrays, so that the record is not
+                                 affected by the modifications of the value. Otherwise the buffers are views of the
+                                 value, and the record must be written before the value is modified.
+
+        Returns:
+            RecordPickle: The pickled value.
+        """
+        buffers = []
+
+        def buffer_callback(buffer: pickle.PickleBuffer):
+            raw = buffer.raw()
+            if raw.nbytes < min_buffer_size:
+                return True
+
+            array = np.asarray(buffer)
+            if array.dtype.kind not in "biufc" or not array.flags.c_contiguous:
+                array = np.frombuffer(raw, dtype=np.uint8)
+
+            if copy_buffers:
+                array = array.copy()
+                array.flags.writeable = False
+
+            buffers.append(array)
+            return False
+
+        return cls(pickle.dumps(value, protocol=5, buffer_callback=buffer_callback), buffers)
+
+    def __init__(self, data: bytes, buffers: tuple = ()):
+        """
+        Initialize the record pickle.
+
+        Parameters:
+            data (bytes): The pickle.
+            buffers (tuple): The out-of-band buffers of the pickle, as numpy arrays.
+        """
+        self.data = data
+        self.buffers = tuple(buffers)
+
+    def load(self) -> Any:
+        """
+        Unpickle the value. The numpy arrays of the value are views of the buffers.
+
+        Returns:
+            Any: The value.
+        """
+        return pickle.loads(self.data, buffers=self.buffers)
+
+
+# The maximum number of containers and values in a record tree, larger containers are pickled instead.
+max_tree_nodes = 256
+
+
+class RecordTree(object):
+    """
+    A record that holds a nested container of dicts with string keys, lists and tuples, whose values are numpy arrays
+    with numeric data types, numbers and strings. The handlers can store its structure natively, for example as HDF5
+    groups and datasets, so that each field can be read on its own without unpickling the whole value. The lists and
+    tuples of Python numbers of a single type count as one value, see `is_number_sequence`.
+    """
+
+    @staticmethod
+    def is_number_sequence(value: Any) -> bool:
+        """
+        Check whether a value is a non empty list or tuple of Python numbers of a single type, which can be stored as
+        one array and read back as the same numbers.
+
+        Parameters:
+            value (Any): The value.
+
+        Returns:
+            bool: True if the value is such a list or tuple.
+        """
+        if type(value) not in (list, tuple) or not value:
+            return False
+
+        item_types = set(map(type, value))
+        if len(item_types) != 1 or not item_types <= {bool, int, float, complex}:
+            return False
+
+        return item_types != {int} or -2 ** 63 <= min(value) and max(value) < 2 ** 63
+
+    @classmethod
+    def from_value(cls, value: Any, copy: bool = True) -> Optional["RecordTree"]:
+        """
+        Build a record tree from a value, if the value is a container that a record tree can hold.
+
+        Parameters:
+            value (Any): The value.
+            copy (bool): Whether to copy the numpy arrays into read-only arrays, so that the record is not affected
+                         by the modifications of the value. The containers are always copied.
+
+        Returns:
+            RecordTree: The record tree, or None if the value cannot be stored as a record tree.
+        """
+        if type(value) not in (dict, list, tuple):
+            return None
+
+        nodes = 0
+        invalid = object()
+
+        def _build(item: Any) -> Any:
+            nonlocal nodes
+            nodes += 1
+            if nodes > max_tree_nodes:
+                return invalid
+
+            kind = type(item)
+
+            if kind is dict:
+                # The keys are the names of the HDF5 groups and datasets.
+                if not all(type(key) is str and key not in ("", ".") and "/" not in key for key in item):
+                    return invalid
+                children = {key: _build(child) for key, child in item.items()}
+                return invalid if any(child is invalid for child in children.values()) else children
+
+            if RecordTree.is_number_sequence(item):
+                return kind(item)
+
+            if kind is list or kind is tuple:
+                children = [_build(child) for child in item]
+                return invalid if any(child is invalid for child in children) else kind(children)
+
+            if kind is np.ndarray:
+                # The 0-d arrays would be read back as numpy scalars.
+                if item.dtype.kind not in "biufc" or item.ndim == 0:
+                    return invalid
+                if copy:
+                    item = item.copy()
+                    item.flags.writeable = False
+                return item
+
+            if kind is str:
+                return item if "\0" not in item else invalid
+
+            if kind is int:
+                return item if -2 ** 63 <= item < 2 ** 63 else invalid
+
+            if kind in (bool, float, complex) or (isinstance(item, np.generic) and item.dtype.kind in "biufc"):
+                return item
+
+            return invalid
+
+        tree = _build(value)
+        return cls(tree) if tree is not invalid else None
+
+    def __init__(self, value: Any):
+        """
+        Initialize the record tree. Use `RecordTree.from_value` to check the value.
+
+        Parameters:
+            value (Any): The nested container.
+        """
+        self.value = value
+
+    def load(self) -> Any:
+        """
+        Rebuild the value. The containers are new, the numpy arrays are shared with the record.
+
+        Returns:
+            Any: The value.
+        """
+        return RecordTree.from_value(self.value, copy=False).value
+
+
 class RecordHandlersBase(object):
     """
     The abstract class for all the handlers. It provides the interface for the handlers.
@@ -48,6 +294,17 @@ class RecordHandlersBase(object):
         """
         raise NotImplementedError()
 
+    def add_records(self, records: list):
+        """
+        Add a batch of records to the database. By default, the records are added one by one, handlers should
+        override it if the storage supports writing multiple records at once.
+
+        Parameters:
+            records (list): A list of (record_path, record) tuples.
+        """
+        for record_path, record in records:
+            self.add_record(record_path, record)
+
     def get_record_by_path(self, record_path: Union[pathlib.Path, str]):
         """
         Get a record by its path.
@@ -60,6 +317,44 @@ class RecordHandlersBase(object):
         """
         raise NotImplementedError()
 
+    def get_lazy_record_by_path(self, record_path: Union[pathlib.Path, str]):
+        """
+        Get a record by its path, without reading the large arrays into memory. The handlers that can read parts of
+        an array should return a proxy of it, by default the record is read as with `get_record_by_path`.
+
+        Parameters:
+            record_path (pathlib.Path or str): The path to the record.
+
+        Returns:
+            Any: The record, or a proxy of it.
+        """
+        return self.get_record_by_path(record_path)
+
+    def get_record_attributes(self, record_path: Union[pathlib.Path, str]) -> dict:
+        """
+        Get the attributes added to a path with a `RecordAttributes` record.
+
+        Parameters:
+            record_path (pathlib.Path or str): The path to the record.
+
+        Returns:
+            dict: The attributes of the record, empty if there are none.
+        """
+        raise NotImplementedError()
+
+    def walk_records(self, record_path: Union[pathlib.Path, str], metadata_keys: tuple) -> list:
+        """
+        Walk through all the record entries under the given path in one pass, and read their metadata.
+
+        Parameters:
+            record_path (pathlib.Path or str): The path to start from.
+            metadata_keys (tuple): The names of the metadata values to read.
+
+        Returns:
+            list: A list of (record_path, metadata) tuples, parents are listed before their children.
+        """
+        raise NotImplementedError()
+
     def get_record_by_id(self, record_id: str):
         """
         Get a record by its id.
@@ -95,3 +390,15 @@ class RecordHandlersBase(object):
             list: A list of records.
         """
         raise NotImplementedError()
+
+    def flush(self):
+        """
+        Flush the buffered records to the storage. Handlers that do not buffer writes do not need to implement it.
+        """
+        pass
+
+    def close(self):
+        """
+        Flush and release the resources held by the handler. The handler should not be used afterwards.
+        """
+        self.flush()
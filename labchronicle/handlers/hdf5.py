@@ -1,4 +1,7 @@
-import pickle
+import atexit
+import time
+import weakref
+import zlib
 from typing import Any, Union
 import h5py
 from contextlib import contextmanager
@@ -7,12 +10,186 @@ import numbers
 
 import numpy as np
 
-from .handlers import RecordHandlersBase
+from .handlers import RecordHandlersBase, RecordAttributes, RecordRows, RecordLink, RecordPickle, RecordTree
+from .chunking import choose_chunk_shape, access_patterns, default_chunk_size
+
+# The default compression policy for each kind of data. The codec can be any filter supported by h5py, for example
+# "gzip" or "lzf", or None to disable compression. Data smaller than `min_size` bytes is not compressed.
+default_compression_policy = {
+    "array": {"codec": "gzip", "level": 9, "min_size": 0},
+    "object": {"codec": None, "level": None, "min_size": 10},
+}
+
+# The serialization markers of the groups of the record trees, and of the Python numbers in them, which h5py reads
+# back as numpy scalars.
+tree_container_types = {"dict": dict, "list": list, "tuple": tuple}
+tree_number_types = {"bool": bool, "int": int, "float": float, "complex": complex}
+
+# Handlers that currently hold a persistent file session, closed at interpreter exit.
+_open_sessions = weakref.WeakSet()
+
+
+@atexit.register
+def _close_open_sessions():
+    """
+    Flush and close all the HDF5 file sessions that are still open.
+    """
+    for handler in list(_open_sessions):
+        handler.close()
+
+
+class HDF5DatasetProxy(object):
+    """
+    A lazy proxy of an array dataset in a HDF5 file. Slicing the proxy like a numpy array reads only the chunks of
+    the dataset that the selection needs, and `iter_chunks` reads the dataset one chunk at a time.
+
+    The proxy opens the file on the first read and keeps it open until it is closed, or uses the file session of
+    the handler when it has one. The handler closes the file of its proxies before it opens the file to write it, and
+    the proxies open it again on their next read. Use it as a context manager to close the file when it is not needed
+    anymore.
+    """
+
+    def __init__(self, handler: "RecordHandlerHDF5", record_path: str, dataset: h5py.Dataset):
+        """
+        Initialize the proxy.
+
+        Parameters:
+            handler (RecordHandlerHDF5): The handler of the record book.
+            record_path (str): The path to the dataset.
+            dataset (h5py.Dataset): The dataset, to read its shape and data type from.
+        """
+        self._handler = handler
+        self._record_path = record_path
+        self._file = None
+        self._finalizer = None
+
+        self.shape = dataset.shape
+        self.dtype = dataset.dtype
+        self.chunks = dataset.chunks
+
+    @property
+    def ndim(self) -> int:
+        return len(self.shape)
+
+    @property
+    def size(self) -> int:
+        return int(np.prod(self.shape))
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __repr__(self) -> str:
+        return f"<HDF5DatasetProxy {self._record_path} shape={self.shape} dtype={self.dtype}>"
+
+    def _get_dataset(self) -> h5py.Dataset:
+        """
+        Get the dataset, opening the file if needed.
+
+        Returns:
+            h5py.Dataset: The dataset.
+        """
+        if self._handler._session_file is not None:
+            return self._handler._session_file[self._record_path]
+
+        if self._file is None:
+            self._file = h5py.File(self._handler._get_file_path(), "r", **self._handler._file_options)
+            self._finalizer = weakref.finalize(self, self._file.close)
+            self._handler._dataset_proxies.add(self)
+
+        return self._file[self._record_path]
+
+    def __getitem__(self, key) -> np.ndarray:
+        """
+        Read a selection of the dataset.
+
+        Parameters:
+            key: The selection, as supported by h5py, for example slices and integers.
+
+        Returns:
+            np.ndarray: The selected data.
+        """
+        return self._get_dataset()[key]
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        data = self._get_dataset()[()]
+        return data if dtype is None else data.astype(dtype)
+
+    def iter_chunks(self, chunk_rows: int = None):
+        """
+        Iterate over the dataset along its first axis, reading one block of rows at a time.
+
+        Parameters:
+            chunk_rows (int): Optional. The number of rows of each block. Defaults to the number of rows of the
+                              chunks of the dataset, or to about 1 MiB of rows if the dataset is not chunked.
+
+        Yields:
+            tuple: The slice of the rows of the block, and the block.
+        """
+        if chunk_rows is None:
+            if self.chunks is not None:
+                chunk_rows = self.chunks[0]
+            else:
+                row_size = max(self.dtype.itemsize * int(np.prod(self.shape[1:])), 1)
+                chunk_rows = max(2 ** 20 // row_size, 1)
+
+        for start in range(0, self.shape[0], chunk_rows):
+            selection = slice(start, min(start + chunk_rows, self.shape[0]))
+            # The dataset is got for each block, the handler may have closed the file to write it in between.
+            yield selection, self._get_dataset()[selection]
+
+    def close(self):
+        """
+        Close the file opened by the proxy.
+        """
+        if self._finalizer is not None:
+            self._finalizer()
+            self._finalizer = None
+            self._file = None
+            self._handler._dataset_proxies.discard(self)
+
+    def __enter__(self) -> "HDF5DatasetProxy":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
 
 class RecordHandlerHDF5(RecordHandlersBase):
     """
     The HDF5 handler.
+
+    By default, the HDF5 file is opened and closed for every operation, so other processes can read the file
+    while it is being written. Set ``hdf5_session`` to True in the config to keep a single file handle open for the
+    life of the record book instead. In session mode the file is flushed every ``hdf5_flush_interval`` seconds
+    (default 10), when the handler is closed and at interpreter exit.
+
+    The compression of the numpy arrays and pickled objects is set by ``hdf5_compression``, a dictionary that
+    updates `default_compression_policy` for each kind of data. With ``hdf5_adaptive_compression`` enabled, a sample
+    of ``hdf5_adaptive_sample_size`` bytes (default 65536) is compressed first, and the data is stored uncompressed
+    if the sample does not compress below ``hdf5_adaptive_max_ratio`` (default 0.9) of its size.
+
+    The objects are pickled with protocol 5, and the buffers of their numpy arrays of at least
+    ``hdf5_pickle_buffer_min_size`` bytes (default 4096) are stored as array datasets next to the pickle, see
+    `RecordPickle`.
+
+    The dicts, lists and tuples of numeric arrays, numbers and strings are stored natively as a `RecordTree`: each
+    container is a group with a ``__serialization__`` attribute set to its type, the items of the lists and tuples are
+    named by their index, and the arrays, numbers and strings are datasets. The lists and tuples of Python numbers of
+    a single type are stored as one array dataset, with the ``__serialization__`` attribute. Other HDF5 tools can read
+    them, and each field can be read on its own. The internal records, whose names start and end with ``__``, are
+    always pickled, so the metadata of each record stays a single dataset. Set ``hdf5_structured_records`` to False
+    to pickle them all.
+
+    With ``hdf5_contiguous_min_size`` set, the numeric arrays of at least this size in bytes are stored with the
+    contiguous layout and without compression. Reading the contiguous arrays of at least ``hdf5_memmap_min_size``
+    bytes (default 1 MiB) returns a read-only `np.memmap` of their data in the file instead of a copy, so the
+    processes that read the same book share the pages of the file.
+
+    The chunk shape of the arrays is chosen by `choose_chunk_shape`, for chunks of ``hdf5_chunk_size`` bytes (default
+    1 MiB) and the access pattern ``hdf5_access_pattern`` (default `balanced`). ``hdf5_attribute_access_patterns``
+    sets the access pattern of the records by their name, for example `{"sweep": "row"}`. If none of them is set, the
+    chunk shape is guessed by h5py. The raw data chunk cache of the file is set by ``hdf5_chunk_cache_size`` in bytes
+    and ``hdf5_chunk_cache_slots`` when the file is opened, the defaults of HDF5 are used if they are not set.
     """
 
     def __init__(self, config: dict):
@@ -20,12 +197,64 @@ class RecordHandlerHDF5(RecordHandlersBase):
         Initialize the handler.
         """
         super().__init__(config)
-        pass
+        self._session_enabled = config.get("hdf5_session", False)
+        self._flush_interval = config.get("hdf5_flush_interval", 10)
+        self._session_file = None
+        self._last_flush_time = None
+
+        # The dataset proxies that keep the file open to read it, closed before the file is opened to be written.
+        self._dataset_proxies = weakref.WeakSet()
+
+        self._compression_policy = {
+            kind: dict(policy, **config.get("hdf5_compression", {}).get(kind, {}))
+            for kind, policy in default_compression_policy.items()
+        }
+        self._adaptive_compression = config.get("hdf5_adaptive_compression", False)
+        self._adaptive_sample_size = config.get("hdf5_adaptive_sample_size", 65536)
+        self._adaptive_max_ratio = config.get("hdf5_adaptive_max_ratio", 0.9)
+        self._pickle_buffer_min_size = config.get("hdf5_pickle_buffer_min_size", 4096)
+        self._structured_records = config.get("hdf5_structured_records", True)
+        self._contiguous_min_size = config.get("hdf5_contiguous_min_size", None)
+        self._memmap_min_size = config.get("hdf5_memmap_min_size", 2 ** 20)
+
+        self._chunk_size = config.get("hdf5_chunk_size", None)
+        self._access_pattern = config.get("hdf5_access_pattern", None)
+        self._attribute_access_patterns = config.get("hdf5_attribute_access_patterns", {})
+
+        for access_pattern in [self._access_pattern] + list(self._attribute_access_patterns.values()):
+            if access_pattern is not None and access_pattern not in access_patterns:
+                msg = f"Unknown access pattern {access_pattern}. Available access patterns: {access_patterns}."
+                self._logger.error(msg)
+                raise ValueError(msg)
+
+        self._file_options = {}
+        if config.get("hdf5_chunk_cache_size") is not None:
+            self._file_options["rdcc_nbytes"] = config["hdf5_chunk_cache_size"]
+        if config.get("hdf5_chunk_cache_slots") is not None:
+            self._file_options["rdcc_nslots"] = config["hdf5_chunk_cache_slots"]
+
+    def _get_file_path(self) -> pathlib.Path:
+        """
+        Get the path of the HDF5 file, and create its parent directory if it does not exist.
+
+        Returns:
+            pathlib.Path: The path of the HDF5 file.
+        """
+        path = self._config["log_path"]
+
+        if isinstance(path, str):
+            path = pathlib.Path(path)
+
+        if not path.parent.exists():
+            path.parent.mkdir(parents=True)
+
+        return path
 
     @contextmanager
     def _open_file(self, mode: str):
         """
         Open the HDF5 file. Use `with` statement with this function to operate hdf5 files.
+        If a file session is open, the session file handle is returned instead.
 
         Parameters:
             mode (str): The mode to open the file.
@@ -34,20 +263,52 @@ class RecordHandlerHDF5(RecordHandlersBase):
             file: The HDF5 file object.
         """
 
-        path = self._config["log_path"]
-
-        if isinstance(path, str):
-            path = pathlib.Path(path)
+        if self._session_file is not None:
+            yield self._session_file
+            if mode != "r":
+                self._flush_if_due()
+            return
 
-        if not path.parent.exists():
-            path.parent.mkdir(parents=True)
+        if mode != "r":
+            self._close_dataset_proxies()
 
-        h5 = h5py.File(path, mode)
+        h5 = h5py.File(self._get_file_path(), mode, **self._file_options)
         try:
             yield h5
         finally:
             h5.close()
 
+    def _start_session(self, mode: str):
+        """
+        Open the persistent file session, if session mode is enabled.
+
+        Parameters:
+            mode (str): The mode to open the file.
+        """
+        if not self._session_enabled or self._session_file is not None:
+            return
+
+        if mode != "r":
+            self._close_dataset_proxies()
+
+        self._session_file = h5py.File(self._get_file_path(), mode, **self._file_options)
+        self._last_flush_time = time.monotonic()
+        _open_sessions.add(self)
+
+    def _close_dataset_proxies(self):
+        """
+        Close the files opened by the dataset proxies, as a file opened to be read cannot be opened to be written.
+        """
+        for proxy in list(self._dataset_proxies):
+            proxy.close()
+
+    def _flush_if_due(self):
+        """
+        Flush the session file if the flush interval has passed since the last flush.
+        """
+        if time.monotonic() - self._last_flush_time >= self._flush_interval:
+            self.flush()
+
     def init_new_record_book(self):
         """
         Initialize a new record book.
@@ -55,6 +316,7 @@ class RecordHandlerHDF5(RecordHandlersBase):
         with self._open_file("w") as f:
             f.create_group("root")
             pass
+        self._start_session("a")
         self._initiated = True
 
     def load_record_book(self):
@@ -63,30 +325,133 @@ class RecordHandlerHDF5(RecordHandlersBase):
         """
         with self._open_file("r"):
             pass
+        self._start_session("r")
         self._initiated = True
 
-    def add_record(self, record_path: Union[pathlib.Path, str], record: Any):
+    def flush(self):
         """
-        Add a record to the database.
+        Flush the buffered data of the file session to the disk.
+        """
+        if self._session_file is None:
+            return
+
+        if self._session_file.mode != "r":
+            self._session_file.flush()
+        self._last_flush_time = time.monotonic()
+
+    def close(self):
+        """
+        Flush and close the file session.
+        """
+        if self._session_file is None:
+            return
+
+        self.flush()
+        self._session_file.close()
+        self._session_file = None
+        _open_sessions.discard(self)
+
+    def _is_compressible(self, data: np.ndarray) -> bool:
+        """
+        Check whether the data is worth compressing, by compressing a sample from its beginning.
 
         Parameters:
-            record_path (pathlib.Path): The path to the record.
-            record (Any): The record to add.
+            data (np.ndarray): The data to check.
+
+        Returns:
+            bool: True if the sample compresses better than the configured ratio.
         """
+        sample = np.ascontiguousarray(data).reshape(-1).view(np.uint8)[:self._adaptive_sample_size].tobytes()
 
-        self._check_initiated()
+        if len(sample) == 0:
+            return False
 
-        extra_options = {}
+        return len(zlib.compress(sample, 1)) / len(sample) <= self._adaptive_max_ratio
 
-        if isinstance(record_path, pathlib.Path):
-            record_path = record_path.as_posix()
+    def _get_compression_options(self, kind: str, data: np.ndarray) -> dict:
+        """
+        Get the compression options of a dataset according to the compression policy.
+
+        Parameters:
+            kind (str): The kind of the data, `array` or `object`.
+            data (np.ndarray): The data to store.
+
+        Returns:
+            dict: The compression options to create the dataset with.
+        """
+        policy = self._compression_policy[kind]
+        codec = policy.get("codec")
+
+        if codec is None or data.nbytes < policy.get("min_size", 0):
+            return {}
+
+        if self._adaptive_compression and not self._is_compressible(data):
+            return {}
+
+        options = {"compression": codec}
+        if policy.get("level") is not None and codec != "lzf":
+            options["compression_opts"] = policy["level"]
+
+        return options
+
+    def _is_contiguous_array(self, data: np.ndarray) -> bool:
+        """
+        Check whether an array is stored with the contiguous layout, according to ``hdf5_contiguous_min_size``.
+
+        Parameters:
+            data (np.ndarray): The array to store.
+
+        Returns:
+            bool: True if the array is stored contiguously and without compression.
+        """
+        return (self._contiguous_min_size is not None and data.nbytes >= self._contiguous_min_size
+                and data.dtype.kind in "biufc")
+
+    def _get_chunk_shape(self, record_path: str, data: np.ndarray, unlimited: bool = False) -> Union[tuple, bool]:
+        """
+        Get the chunk shape of an array dataset according to the chunking policy.
+
+        Parameters:
+            record_path (str): The path to the dataset, its name sets the access pattern.
+            data (np.ndarray): The data to store.
+            unlimited (bool): Whether the first axis of the dataset grows.
+
+        Returns:
+            tuple or bool: The chunk shape, or True to let h5py guess it.
+        """
+        name = record_path.rstrip("/").rsplit("/", 1)[-1]
+        access_pattern = self._attribute_access_patterns.get(name, self._access_pattern)
+
+        if access_pattern is None and self._chunk_size is None:
+            return True
+
+        chunk_size = self._chunk_size if self._chunk_size is not None else default_chunk_size
+        chunk_shape = choose_chunk_shape(data.shape, data.dtype, chunk_size, access_pattern or "balanced", unlimited)
+        return chunk_shape if chunk_shape is not None else True
+
+    def _prepare_record(self, record: Any, record_path: str = ""):
+        """
+        Convert a record to the data to store in the HDF5 file, and the options to create the dataset with.
+
+        Parameters:
+            record (Any): The record to convert.
+            record_path (str): Optional. The path to the record, to choose the chunk shape of the arrays.
+
+        Returns:
+            tuple: The data to store, the options of the dataset and the attributes of the dataset.
+        """
+        options = {"chunks": False}
+        attributes = {}
 
         # Check the data type
         if isinstance(record, np.ndarray):
-            # Save numpy directly, with compression
-            extra_options.update({
-                "compression": "gzip", "compression_opts": 9
-            })
+            if record.ndim > 0 and self._is_contiguous_array(record):
+                # Save large arrays contiguously without compression, so they can be memory mapped.
+                options["chunks"] = None
+            elif record.ndim > 0:
+                # Save numpy directly, with compression
+                options["chunks"] = self._get_chunk_shape(record_path, record)
+                options.update(self._get_compression_options("array", record))
         elif isinstance(record, str):
             # Save string directly
             pass
@@ -94,16 +459,192 @@ class RecordHandlerHDF5(RecordHandlersBase):
             # Save number directly
             pass
         else:
-            # Pickle and convert to np.void
-            pickled_record = pickle.dumps(record)
-            record = np.void(pickled_record)
-            if len(record) > 10:  # Data too short does not worth compression.
-                extra_options.update({
-                    "compression": "gzip", "compression_opts": 9
-                })
+            # The pickles are np.void scalars. Scalar datasets cannot be compressed, compressed pickles are stored
+            # as byte arrays instead.
+            pickled_bytes = np.frombuffer(record.tobytes(), dtype=np.uint8)
+            compression_options = self._get_compression_options("object", pickled_bytes)
+            if compression_options:
+                record = pickled_bytes
+                options["chunks"] = True
+                options.update(compression_options)
+                attributes["__serialization__"] = "pickle"
+
+        return record, options, attributes
+
+    def _write_record(self, f: h5py.File, record_path: Union[pathlib.Path, str], record: Any):
+        """
+        Write a record to an opened HDF5 file.
+
+        Parameters:
+            f (h5py.File): The opened HDF5 file.
+            record_path (pathlib.Path or str): The path to the record.
+            record (Any): The record to add.
+        """
+        if isinstance(record_path, pathlib.Path):
+            record_path = record_path.as_posix()
+
+        if isinstance(record, RecordAttributes):
+            f.require_group(record_path).attrs.update(record)
+            return
+
+        if isinstance(record, RecordRows):
+            self._append_rows(f, record_path, record)
+            return
+
+        if isinstance(record, RecordLink):
+            f[record_path] = f[record.target_path]
+            return
+
+        name = record_path.rstrip("/").rsplit("/", 1)[-1]
+        structured = self._structured_records and not (name.startswith("__") and name.endswith("__"))
+
+        if structured and type(record) in tree_container_types.values():
+            # The tree is written right away, the arrays do not need to be copied.
+            record = RecordTree.from_value(record, copy=False) or record
+
+        if isinstance(record, RecordTree):
+            if structured:
+                self._write_tree(f, record_path, record.value)
+                return
+            record = record.value
+
+        if not isinstance(record, (np.ndarray, np.void, str, numbers.Number, RecordPickle)):
+            # The buffers are views of the record, it is written right away.
+            record = RecordPickle.dumps(record, self._pickle_buffer_min_size, copy_buffers=False)
+
+        if isinstance(record, RecordPickle):
+            self._write_pickle(f, record_path, record)
+            return
+
+        record, options, attributes = self._prepare_record(record, record_path)
+        dataset = f.create_dataset(record_path, data=record, **options)
+        dataset.attrs.update(attributes)
+
+    def _write_pickle(self, f: h5py.File, record_path: str, record: RecordPickle):
+        """
+        Write a pickle with out-of-band buffers to a group, with the pickle and each buffer in their own dataset.
+        The buffers are stored as arrays, and compressed with the compression policy of the arrays, so the numpy
+        arrays of the pickled value can be read directly from the datasets. A pickle without out-of-band buffers is
+        stored as a single `np.void` dataset.
+
+        Parameters:
+            f (h5py.File): The opened HDF5 file.
+            record_path (str): The path to the group.
+            record (RecordPickle): The pickle to write.
+        """
+        if not record.buffers:
+            data, options, attributes = self._prepare_record(np.void(record.data))
+            dataset = f.create_dataset(record_path, data=data, **options)
+            dataset.attrs.update(attributes)
+            return
+
+        group = f.create_group(record_path)
+        group.attrs["__serialization__"] = "pickle5"
+        group.attrs["__buffers__"] = len(record.buffers)
+
+        for name, data in [("pickle", np.void(record.data))] + [
+            (f"buffer_{i}", buffer) for i, buffer in enumerate(record.buffers)
+        ]:
+            data, options, attributes = self._prepare_record(data, record_path)
+            dataset = group.create_dataset(name, data=data, **options)
+            dataset.attrs.update(attributes)
+
+    def _write_tree(self, group: h5py.Group, name: str, value: Any):
+        """
+        Write the value of a record tree, with a group for each container and a dataset for each array, number and
+        string. The lists and tuples of numbers of a single type are stored as one array. The arrays are stored with
+        the compression and chunking policies of the arrays.
+
+        Parameters:
+            group (h5py.Group): The group to write to.
+            name (str): The name of the value in the group.
+            value (Any): The value to write.
+        """
+        value_type = type(value).__name__
+
+        if RecordTree.is_number_sequence(value):
+            data, options, attributes = self._prepare_record(np.asarray(value), name)
+            dataset = group.create_dataset(name, data=data, **options)
+            dataset.attrs.update(attributes)
+            dataset.attrs["__serialization__"] = value_type
+            return
+
+        if value_type in tree_container_types:
+            # Keep the order of the dict keys.
+            child_group = group.create_group(name, track_order=True)
+            child_group.attrs["__serialization__"] = value_type
+            items = value.items() if value_type == "dict" else enumerate(value)
+            for key, item in items:
+                self._write_tree(child_group, str(key), item)
+            return
+
+        if isinstance(value, np.ndarray):
+            data, options, attributes = self._prepare_record(value, name)
+            dataset = group.create_dataset(name, data=data, **options)
+            dataset.attrs.update(attributes)
+            return
+
+        dataset = group.create_dataset(name, data=value)
+        if tree_number_types.get(value_type) is type(value):
+            dataset.attrs["__serialization__"] = value_type
+
+    def _append_rows(self, f: h5py.File, record_path: str, record: RecordRows):
+        """
+        Append rows to a resizable dataset, and create the dataset if it does not exist.
+
+        Parameters:
+            f (h5py.File): The opened HDF5 file.
+            record_path (str): The path to the dataset.
+            record (RecordRows): The rows to append.
+        """
+        rows = record.rows
+
+        if record_path in f:
+            dataset = f[record_path]
+            size = dataset.shape[0]
+            dataset.resize(size + rows.shape[0], axis=0)
+            dataset[size:] = rows
+            return
+
+        # Strings are stored with variable length.
+        dtype = h5py.string_dtype() if rows.dtype == object else rows.dtype
+        if record.chunk_shape is not None:
+            chunks = record.chunk_shape
+        else:
+            chunks = self._get_chunk_shape(record_path, rows, unlimited=True)
+
+        options = self._get_compression_options("array", rows) if rows.dtype != object else {}
+
+        f.create_dataset(record_path, data=rows, dtype=dtype, maxshape=(None,) + rows.shape[1:], chunks=chunks,
+                         **options)
+
+    def add_record(self, record_path: Union[pathlib.Path, str], record: Any):
+        """
+        Add a record to the database.
+
+        Parameters:
+            record_path (pathlib.Path): The path to the record.
+            record (Any): The record to add.
+        """
+
+        self._check_initiated()
 
         with self._open_file('a') as f:
-            f.create_dataset(record_path, data=record, chunks=not np.isscalar(record), **extra_options)
+            self._write_record(f, record_path, record)
+
+    def add_records(self, records: list):
+        """
+        Add a batch of records to the database, opening the file only once.
+
+        Parameters:
+            records (list): A list of (record_path, record) tuples.
+        """
+
+        self._check_initiated()
+
+        with self._open_file('a') as f:
+            for record_path, record in records:
+                self._write_record(f, record_path, record)
 
     def get_record_by_path(self, record_path: Union[pathlib.Path, str]):
         """
@@ -123,7 +664,184 @@ class RecordHandlerHDF5(RecordHandlersBase):
         with self._open_file("r") as f:
             from pathlib import PureWindowsPath
             record_path = PureWindowsPath(record_path).as_posix()
-            return f[record_path][()]
+            return self._read_record(f[record_path])
+
+    def get_lazy_record_by_path(self, record_path: Union[pathlib.Path, str]):
+        """
+        Get a record by its path, without reading the array datasets into memory.
+
+        Parameters:
+            record_path (pathlib.Path or str): The path to the record.
+
+        Returns:
+            Any: A `HDF5DatasetProxy` for the array datasets, otherwise the record. The arrays of the record trees are
+                 `HDF5DatasetProxy` as well.
+        """
+        self._check_initiated()
+
+        if isinstance(record_path, pathlib.Path):
+            record_path = record_path.as_posix()
+
+        with self._open_file("r") as f:
+            node = f[record_path]
+            if isinstance(node, h5py.Dataset) and node.ndim > 0 and "__serialization__" not in node.attrs:
+                return HDF5DatasetProxy(self, record_path, node)
+            if node.attrs.get("__serialization__") in tree_container_types:
+                return self._read_tree(node, lazy=True)
+            return self._read_record(node)
+
+    def _memmap_dataset(self, dataset: h5py.Dataset) -> Union[np.memmap, None]:
+        """
+        Memory map the data of a contiguous dataset in the file, if it is large enough according to
+        ``hdf5_memmap_min_size``.
+
+        Parameters:
+            dataset (h5py.Dataset): The dataset to map.
+
+        Returns:
+            np.memmap: The read-only memory map of the data, or None if the dataset cannot be mapped.
+        """
+        if dataset.chunks is not None or dataset.ndim == 0 or dataset.nbytes < self._memmap_min_size:
+            return None
+
+        if dataset.dtype.kind not in "biufc" or dataset.file.driver not in ("sec2", "stdio"):
+            return None
+
+        if dataset.file.mode != "r" and self._session_file is not None:
+            # The data written in this session may not be flushed to the file yet.
+            return None
+
+        offset = dataset.id.get_offset()
+        if offset is None:
+            return None
+
+        return np.memmap(dataset.file.filename, dtype=dataset.dtype, mode="r", offset=offset, shape=dataset.shape)
+
+    def _read_record(self, node: Union[h5py.Dataset, h5py.Group]):
+        """
+        Read the record stored in a dataset, or in a group for the pickles with out-of-band buffers and the record
+        trees. The large contiguous arrays are memory mapped instead of read.
+
+        Parameters:
+            node (h5py.Dataset or h5py.Group): The dataset or group to read.
+
+        Returns:
+            Any: The record.
+        """
+        serialization = node.attrs.get("__serialization__")
+
+        if serialization == "pickle":
+            # Compressed pickles are stored as byte arrays, convert them back to np.void.
+            return np.void(node[()].tobytes())
+
+        if serialization == "pickle5":
+            buffers = [self._read_record(node[f"buffer_{i}"]) for i in range(node.attrs["__buffers__"])]
+            return RecordPickle(self._read_record(node["pickle"]).tobytes(), buffers)
+
+        if serialization in tree_container_types:
+            return self._read_tree(node)
+
+        memmap = self._memmap_dataset(node)
+        if memmap is not None:
+            return memmap
+
+        return node[()]
+
+    def _read_tree(self, node: Union[h5py.Dataset, h5py.Group], lazy: bool = False) -> Any:
+        """
+        Read the value of a record tree.
+
+        Parameters:
+            node (h5py.Dataset or h5py.Group): The group of the tree, or the dataset of one of its values.
+            lazy (bool): Whether to return a `HDF5DatasetProxy` for the arrays instead of reading them.
+
+        Returns:
+            Any: The value.
+        """
+        serialization = node.attrs.get("__serialization__")
+
+        if serialization == "dict":
+            return {name: self._read_tree(child, lazy) for name, child in node.items()}
+
+        if serialization in ("list", "tuple") and isinstance(node, h5py.Dataset):
+            # The numbers are converted back to Python numbers.
+            return tree_container_types[serialization](node[()].tolist())
+
+        if serialization in ("list", "tuple"):
+            items = [self._read_tree(node[str(i)], lazy) for i in range(len(node))]
+            return tree_container_types[serialization](items)
+
+        if lazy and node.ndim > 0:
+            return HDF5DatasetProxy(self, node.name, node)
+
+        value = self._read_record(node)
+
+        if isinstance(value, bytes):
+            return value.decode()
+
+        if serialization in tree_number_types:
+            return tree_number_types[serialization](value)
+
+        return value
+
+    def walk_records(self, record_path: Union[pathlib.Path, str], metadata_keys: tuple) -> list:
+        """
+        Walk through all the record entries under the given path in one pass, and read their metadata.
+
+        Record entries are the groups whose names start with a number. Their metadata is read from the attributes of
+        the group, or from the datasets named after the metadata keys if the group has no such attributes.
+
+        Parameters:
+            record_path (pathlib.Path or str): The path to start from.
+            metadata_keys (tuple): The names of the metadata values to read.
+
+        Returns:
+            list: A list of (record_path, metadata) tuples, parents are listed before their children.
+        """
+        self._check_initiated()
+
+        if isinstance(record_path, pathlib.Path):
+            record_path = record_path.as_posix()
+
+        records = []
+
+        def _walk(group: h5py.Group, path: str):
+            for name in group.keys():
+                if name[0] not in "0123456789":
+                    continue
+
+                child = group[name]
+                child_path = path.rstrip("/") + "/" + name
+                metadata = {key: child.attrs[key] for key in metadata_keys if key in child.attrs}
+
+                if not metadata:
+                    metadata = {key: self._read_record(child[key]) for key in metadata_keys if key in child}
+
+                records.append((child_path, metadata))
+                _walk(child, child_path)
+
+        with self._open_file("r") as f:
+            _walk(f[record_path], record_path)
+
+        return records
+
+    def get_record_attributes(self, record_path: Union[pathlib.Path, str]) -> dict:
+        """
+        Get the attributes added to a path with a `RecordAttributes` record.
+
+        Parameters:
+            record_path (pathlib.Path or str): The path to the record.
+
+        Returns:
+            dict: The attributes of the record, empty if there are none.
+        """
+        self._check_initiated()
+
+        if isinstance(record_path, pathlib.Path):
+            record_path = record_path.as_posix()
+
+        with self._open_file("r") as f:
+            return dict(f[record_path].attrs)
 
     def list_records(self, record_path: Union[pathlib.Path, str]) -> list:
         """
@@ -22,7 +22,7 @@ from collections import deque
 
 import numpy as np
 
-from .handlers import RecordHandlersBase
+from .handlers import RecordHandlersBase, RecordAttributes, RecordRows, RecordLink
 
 
 class RecordHandlerMemory(RecordHandlersBase):
@@ -36,6 +36,7 @@ class RecordHandlerMemory(RecordHandlersBase):
         """
         super().__init__(config)
         self.records = {}  # Dictionary to store records
+        self.attributes = {}  # Dictionary to store the attributes of the paths
         self.max_records = config.get('max_records', 5)
         self.record_keys = deque(maxlen=self.max_records)  # To track and limit records
         self._initiated = True
@@ -45,6 +46,7 @@ class RecordHandlerMemory(RecordHandlersBase):
         Initialize a new record book.
         """
         self.records.clear()
+        self.attributes.clear()
         self.record_keys.clear()
         self._initiated = True
 
@@ -68,6 +70,17 @@ class RecordHandlerMemory(RecordHandlersBase):
         if not isinstance(record_path, str):
             record_path = str(record_path)
 
+        if isinstance(record, RecordAttributes):
+            self.attributes.setdefault(record_path, {}).update(record)
+            return
+
+        if isinstance(record, RecordRows):
+            existing_rows = self.get_record_by_path(record_path)
+            record = record.rows if existing_rows is None else np.concatenate([existing_rows, record.rows])
+
+        if isinstance(record, RecordLink):
+            record = self.get_record_by_path(record.target_path)
+
         # Navigate or create the nested dictionary structure based on the path
         path_parts = record_path.split('/')
         current_dict = self.records
@@ -105,6 +118,19 @@ class RecordHandlerMemory(RecordHandlersBase):
                 return None
         return current_dict
 
+    def get_record_attributes(self, record_path: str) -> dict:
+        """
+        Get the attributes added to a path with a `RecordAttributes` record.
+
+        Parameters:
+            record_path (str): The path to the record.
+
+        Returns:
+            dict: The attributes of the record, empty if there are none.
+        """
+        self._check_initiated()
+        return dict(self.attributes.get(str(record_path), {}))
+
     def _remove_record(self, record_path: str):
         """
         Remove a record by its path.
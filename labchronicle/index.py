@@ -0,0 +1,321 @@
+# This file contains the index of the record entries of a record book. It allows finding record entries by their
+# record time or their record id without walking through the record book.
+import bisect
+import uuid
+from typing import Optional
+
+import numpy as np
+
+from .handlers import RecordAttributes, RecordRows
+from .logger import setup_logging
+
+logger = setup_logging(__name__)
+
+
+class RecordIndex(object):
+    """
+    The index of the record entries of a record book.
+
+    The paths of the record entries are stored once in `/index/paths`, and referred to by their position, the path
+    id. The time index in `/index/time` holds (record time, path id) rows. Both are appended in batches while the
+    record book is written, and loaded into memory the first time the index of a read only record book is used.
+    The time index is kept sorted in memory, so the lookups by time are O(log n).
+
+    With `index_record_ids`, the record ids are also indexed in `/index/uuid` as fixed width (uuid bytes, path id)
+    rows, replacing the `/uuid/<record_id>` record of each record entry. The record ids are kept in a dict in memory.
+
+    Record books written without an index are indexed in memory from their record entries when they are loaded.
+    Closing the index marks it as complete. The index of a record book that was not closed, for example when the
+    process was killed, may miss the last record entries: it is only used if it indexes all the record entries of the
+    record book, otherwise the record entries are indexed again.
+    """
+
+    index_record_path = "/index"
+    paths_record_path = "/index/paths"
+    time_record_path = "/index/time"
+    record_id_record_path = "/index/uuid"
+    time_dtype = np.dtype([("record_time", "<i8"), ("path_id", "<i8")])
+    record_id_dtype = np.dtype([("record_id", "S16"), ("path_id", "<i8")])
+
+    def __init__(self, record_book, flush_size: int = 100, loaded: bool = False, index_record_ids: bool = False):
+        """
+        Initialize the index.
+
+        Parameters:
+            record_book (RecordBook): The record book to index.
+            flush_size (int): The number of new record entries to write to the record book at once.
+            loaded (bool): Whether the index is complete in memory, for example for a new record book.
+            index_record_ids (bool): Whether to write the record ids of the new record entries to the index.
+        """
+        self._record_book = record_book
+        self._flush_size = flush_size
+        self._loaded = loaded
+        self._index_record_ids = index_record_ids
+
+        self._paths = []
+        self._path_ids = {}
+        self._record_times = []
+        self._record_time_path_ids = []
+        self._record_ids = {}
+
+        self._pending_paths = []
+        self._pending_times = []
+        self._pending_record_ids = []
+
+    @staticmethod
+    def _get_record_id_bytes(record_id) -> Optional[bytes]:
+        """
+        Get the fixed width form of a record id.
+
+        Parameters:
+            record_id (Any): The record id.
+
+        Returns:
+            bytes: The bytes of the uuid, None if the record id is not a uuid.
+        """
+        if isinstance(record_id, uuid.UUID):
+            return record_id.bytes
+
+        try:
+            return uuid.UUID(str(record_id)).bytes
+        except ValueError:
+            return None
+
+    def _add_path(self, path: str) -> int:
+        """
+        Add a record entry path to the index.
+
+        Parameters:
+            path (str): The path of the record entry.
+
+        Returns:
+            int: The id of the path.
+        """
+        path_id = self._path_ids.get(path)
+
+        if path_id is None:
+            path_id = len(self._paths)
+            self._paths.append(path)
+            self._path_ids[path] = path_id
+
+        return path_id
+
+    def _insert_time(self, record_time: int, path_id: int):
+        """
+        Insert a record time to the sorted time index.
+
+        Parameters:
+            record_time (int): The record time.
+            path_id (int): The id of the record entry path.
+        """
+        position = bisect.bisect_right(self._record_times, record_time)
+        self._record_times.insert(position, record_time)
+        self._record_time_path_ids.insert(position, path_id)
+
+    def add_entry(self, entry) -> bool:
+        """
+        Add a new record entry to the index. The index is written to the record book every `flush_size` entries.
+
+        Parameters:
+            entry (RecordEntry): The record entry to add.
+
+        Returns:
+            bool: True if the record id is written to the index, otherwise the caller has to record it.
+        """
+        path = entry.get_path().as_posix()
+        record_time = int(entry.record_time)
+
+        path_id = self._add_path(path)
+        self._insert_time(record_time, path_id)
+        self._record_ids[str(entry.record_id)] = path_id
+
+        self._pending_paths.append(path)
+        self._pending_times.append((record_time, path_id))
+
+        record_id_bytes = self._get_record_id_bytes(entry.record_id) if self._index_record_ids else None
+        if record_id_bytes is not None:
+            self._pending_record_ids.append((record_id_bytes, path_id))
+
+        if len(self._pending_times) >= self._flush_size:
+            self.flush()
+
+        return record_id_bytes is not None
+
+    def flush(self):
+        """
+        Write the new entries of the index to the record book.
+        """
+        if not self._pending_times:
+            return
+
+        records = [
+            (self.paths_record_path, RecordRows(np.array(self._pending_paths, dtype=object))),
+            (self.time_record_path, RecordRows(np.array(self._pending_times, dtype=self.time_dtype))),
+        ]
+        if self._pending_record_ids:
+            records.append((self.record_id_record_path,
+                            RecordRows(np.array(self._pending_record_ids, dtype=self.record_id_dtype))))
+
+        self._pending_paths = []
+        self._pending_times = []
+        self._pending_record_ids = []
+
+        self._record_book.write_records(records)
+
+    def close(self):
+        """
+        Write the new entries of the index to the record book, and mark the index as complete.
+        """
+        self.flush()
+        self._record_book.write_records([(self.index_record_path, RecordAttributes(complete=True))])
+
+    def _is_complete(self, number_of_rows: int) -> bool:
+        """
+        Check whether the index stored in the record book indexes all the record entries. The index is complete if
+        it was closed, otherwise the record entries are counted.
+
+        Parameters:
+            number_of_rows (int): The number of rows of the stored time index.
+
+        Returns:
+            bool: True if the index is complete.
+        """
+        try:
+            if self._record_book.handler.get_record_attributes(self.index_record_path).get("complete", False):
+                return True
+        except (KeyError, NotImplementedError):
+            pass
+
+        root_path = self._record_book.get_root_entry().get_path()
+        try:
+            # Only the names of the groups are read.
+            number_of_entries = len(self._record_book.handler.walk_records(root_path, ()))
+        except NotImplementedError:
+            number_of_entries = sum(1 for _ in self._record_book.iter_entries())
+
+        return number_of_entries == number_of_rows
+
+    @staticmethod
+    def _decode_record_id(record_id: bytes) -> str:
+        """
+        Decode a record id stored in `/index/uuid`.
+
+        Parameters:
+            record_id (bytes): The bytes of the uuid. Fixed width strings are read without their trailing null bytes.
+
+        Returns:
+            str: The record id.
+        """
+        return str(uuid.UUID(bytes=bytes(record_id).ljust(16, b"\0")))
+
+    def _read_record(self, record_path: str) -> Optional[np.ndarray]:
+        """
+        Read an index record from the record book.
+
+        Parameters:
+            record_path (str): The path of the index record.
+
+        Returns:
+            np.ndarray: The record, None if it does not exist.
+        """
+        try:
+            return self._record_book.handler.get_record_by_path(record_path)
+        except KeyError:
+            return None
+
+    def load(self):
+        """
+        Load the index from the record book, if it has not been loaded yet.
+        """
+        if self._loaded:
+            return
+
+        paths = self._read_record(self.paths_record_path)
+        times = self._read_record(self.time_record_path)
+
+        if paths is not None and times is not None and not self._is_complete(len(times)):
+            logger.warning("The index of the record book is incomplete, indexing the record entries again.")
+            paths = times = None
+
+        if paths is not None and times is not None:
+            for path in paths:
+                self._add_path(path.decode() if isinstance(path, bytes) else str(path))
+
+            order = np.argsort(times["record_time"], kind="stable")
+            self._record_times = times["record_time"][order].tolist()
+            self._record_time_path_ids = times["path_id"][order].tolist()
+
+            record_ids = self._read_record(self.record_id_record_path)
+            if record_ids is not None:
+                self._record_ids.update(
+                    (self._decode_record_id(record_id), int(path_id)) for record_id, path_id in record_ids)
+        else:
+            # The record book is written without an index, build it from the record entries.
+            logger.info("The record book has no index, indexing the record entries.")
+            for entry in self._record_book.iter_entries():
+                path_id = self._add_path(entry.get_path().as_posix())
+                self._insert_time(int(entry.record_time), path_id)
+                self._record_ids[str(entry.record_id)] = path_id
+
+        self._loaded = True
+
+    def find_by_record_id(self, record_id) -> Optional[str]:
+        """
+        Find the record entry with the given record id.
+
+        Parameters:
+            record_id (Any): The record id.
+
+        Returns:
+            str: The path of the record entry, None if the record id is not in the index.
+        """
+        self.load()
+
+        path_id = self._record_ids.get(str(record_id))
+        return self._paths[path_id] if path_id is not None else None
+
+    def get_record_ids(self) -> list:
+        """
+        Get the indexed record ids.
+
+        Returns:
+            list: The record ids.
+        """
+        self.load()
+        return list(self._record_ids.keys())
+
+    def find_by_time(self, record_time: int) -> Optional[str]:
+        """
+        Find the record entry that started last at or before the given time.
+
+        Parameters:
+            record_time (int): The record time.
+
+        Returns:
+            str: The path of the record entry, None if no record entry started before the given time.
+        """
+        self.load()
+
+        position = bisect.bisect_right(self._record_times, record_time)
+        if position == 0:
+            return None
+
+        return self._paths[self._record_time_path_ids[position - 1]]
+
+    def find_by_time_range(self, start_time: int, end_time: int) -> list:
+        """
+        Find the record entries that started within the time range.
+
+        Parameters:
+            start_time (int): The start of the time range, inclusive.
+            end_time (int): The end of the time range, inclusive.
+
+        Returns:
+            list: The paths of the record entries, sorted by record time.
+        """
+        self.load()
+
+        start = bisect.bisect_left(self._record_times, start_time)
+        end = bisect.bisect_right(self._record_times, end_time)
+
+        return [self._paths[path_id] for path_id in self._record_time_path_ids[start:end]]
@@ -0,0 +1,174 @@
+# This file contains the helper functions to serialize the records before they are passed to the handlers.
+import hashlib
+import io
+import numbers
+import pickle
+from typing import Any, Callable, Optional, Tuple
+
+import numpy as np
+
+from .handlers import RecordAttributes, RecordRows, RecordLink, RecordPickle, RecordTree
+
+
+def capture_record(record: Any) -> Any:
+    """
+    Take a snapshot of a record, so that it can be written to the handler later without being affected by the
+    modifications made to the original value in the meantime.
+
+    Strings, numbers, record links, record pickles and record trees are immutable and returned as is, numpy arrays,
+    record attributes and record rows are copied, the dicts, lists and tuples of arrays, numbers and strings are
+    captured as `RecordTree`, so the handlers can store their structure, and any other value is captured with
+    `capture_value`.
+
+    Parameters:
+        record (Any): The record to capture.
+
+    Returns:
+        Any: The captured record.
+    """
+    if isinstance(record, (str, numbers.Number, np.void, RecordLink, RecordPickle, RecordTree)):
+        return record
+
+    if isinstance(record, (np.ndarray, RecordAttributes, RecordRows)):
+        return record.copy()
+
+    tree = RecordTree.from_value(record)
+    if tree is not None:
+        return tree
+
+    return capture_value(record)
+
+
+def capture_value(value: Any, min_buffer_size: int = 4096) -> RecordPickle:
+    """
+    Take an immutable snapshot of a value by pickling it once with protocol 5. The buffers of the numpy arrays of at
+    least `min_buffer_size` bytes are serialized out-of-band: each one is copied once into a read-only array, and the
+    value is rebuilt from the snapshot with views of these arrays instead of copies.
+
+    Parameters:
+        value (Any): The value to capture.
+        min_buffer_size (int): The minimum size in bytes of the buffers to serialize out-of-band, the smaller
+                               buffers are copied into the pickle.
+
+    Returns:
+        RecordPickle: The snapshot, which can be written to the handlers as it is.
+    """
+    return RecordPickle.dumps(value, min_buffer_size)
+
+
+def fingerprint_record(record: Any) -> Tuple[bytes, Any]:
+    """
+    Compute a fingerprint of the value of a record, to detect whether it has changed since it was last written.
+
+    Numpy arrays are hashed from their buffer, any other value is hashed from its pickle and the out-of-band
+    buffers of the pickle. The pickled value is returned as a `RecordPickle`, so it does not need to be pickled again
+    to be written, or as a `RecordTree` for the containers that the handlers can store natively.
+
+    Parameters:
+        record (Any): The record to fingerprint.
+
+    Returns:
+        bytes: The fingerprint of the record.
+        Any: The record in the form to pass to the handlers.
+    """
+    if isinstance(record, np.ndarray) and not record.dtype.hasobject:
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{record.dtype.str}{record.shape}".encode())
+        digest.update(np.ascontiguousarray(record).view(np.uint8).data)
+        return digest.digest(), record
+
+    if isinstance(record, (str, numbers.Number)):
+        return fingerprint_bytes(pickle.dumps(record)), record
+
+    captured_record = RecordTree.from_value(record)
+    if captured_record is not None:
+        # The digest does not depend on how the tree is stored, the arrays are not copied again to compute it.
+        pickled_record = RecordPickle.dumps(captured_record.value, copy_buffers=False)
+    else:
+        pickled_record = captured_record = capture_value(record)
+
+    digest = hashlib.blake2b(pickled_record.data, digest_size=16)
+    for buffer in pickled_record.buffers:
+        digest.update(f"{buffer.dtype.str}{buffer.shape}".encode())
+        digest.update(buffer)
+
+    return digest.digest(), captured_record
+
+
+def fingerprint_bytes(data: bytes) -> bytes:
+    """
+    Compute the fingerprint of serialized data.
+
+    Parameters:
+        data (bytes): The data.
+
+    Returns:
+        bytes: The fingerprint of the data.
+    """
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+class _BlobPickler(pickle.Pickler):
+    """
+    A pickler that stores the large numpy arrays separately, and only keeps references to them in the pickle.
+    """
+
+    def __init__(self, file, save_array: Callable[[np.ndarray], str], min_size: int):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._save_array = save_array
+        self._min_size = min_size
+
+    def persistent_id(self, obj):
+        if type(obj) is np.ndarray and obj.nbytes >= self._min_size and not obj.dtype.hasobject:
+            return "blob", self._save_array(obj)
+        return None
+
+
+class _BlobUnpickler(pickle.Unpickler):
+    """
+    An unpickler that loads the arrays stored separately by `_BlobPickler`.
+    """
+
+    def __init__(self, file, load_array: Callable[[str], np.ndarray]):
+        super().__init__(file)
+        self._load_array = load_array
+
+    def persistent_load(self, pid):
+        kind, path = pid
+        if kind != "blob":
+            raise pickle.UnpicklingError(f"Unknown persistent id {pid}.")
+        return self._load_array(path)
+
+
+def dumps_with_blobs(record: Any, save_array: Callable[[np.ndarray], str], min_size: int = 4096) -> bytes:
+    """
+    Pickle a record, storing the numpy arrays of at least `min_size` bytes separately.
+
+    Parameters:
+        record (Any): The record to pickle.
+        save_array (Callable): Stores an array and returns the path it is stored at.
+        min_size (int): The minimum size in bytes of the arrays to store separately.
+
+    Returns:
+        bytes: The pickle, referring to the separately stored arrays by their path.
+    """
+    file = io.BytesIO()
+    _BlobPickler(file, save_array, min_size).dump(record)
+    return file.getvalue()
+
+
+def loads_with_blobs(data: bytes, load_array: Optional[Callable[[str], np.ndarray]] = None) -> Any:
+    """
+    Unpickle a record pickled by `pickle.dumps` or `dumps_with_blobs`.
+
+    Parameters:
+        data (bytes): The pickle.
+        load_array (Callable): Optional. Loads an array stored separately from its path.
+
+    Returns:
+        Any: The record.
+    """
+    if load_array is None:
+        return pickle.loads(data)
+
+    return _BlobUnpickler(io.BytesIO(data), load_array).load()
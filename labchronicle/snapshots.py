@@ -0,0 +1,111 @@
+# This file contains the snapshot policies, that decide whether `log_and_record` takes a snapshot of the object at
+# the end of a function call. The touched attributes are recorded either way.
+import pickle
+import threading
+import time
+import weakref
+from typing import Optional
+
+from .core import LoggableObject, _reserved_keys
+from .logger import setup_logging
+from .serialization import fingerprint_bytes
+
+logger = setup_logging(__name__)
+
+
+class SnapshotPolicy(object):
+    """
+    A policy that decides when to take a snapshot of a loggable object. A snapshot is taken when all the specified
+    conditions are met:
+
+    + `every`: Every `every` calls, starting from the first call.
+    + `min_interval`: At most once every `min_interval` seconds.
+    + `on_change`: Only when the state of the object changed since the last snapshot.
+    + `max_size`: Only when the pickled state of the object is at most `max_size` bytes.
+
+    A policy can be passed to a decorator, `@log_and_record(snapshot_policy=SnapshotPolicy(every=10))`, or set for all
+    the decorated functions of a class with the `_snapshot_policy` class attribute. The policy counts the calls of
+    each object separately.
+    """
+
+    def __init__(self, every: Optional[int] = None, min_interval: Optional[float] = None, on_change: bool = False,
+                 max_size: Optional[int] = None):
+        """
+        Initialize the snapshot policy.
+
+        Parameters:
+            every (int): Optional. Take a snapshot every `every` calls.
+            min_interval (float): Optional. The minimum time between two snapshots, in seconds.
+            on_change (bool): Whether to only take a snapshot when the state of the object changed.
+            max_size (int): Optional. The maximum size of the pickled state of the object, in bytes.
+        """
+        if every is not None and every < 1:
+            msg = f"The snapshot interval must be at least 1 call, got {every}."
+            logger.error(msg)
+            raise ValueError(msg)
+
+        self.every = every
+        self.min_interval = min_interval
+        self.on_change = on_change
+        self.max_size = max_size
+
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def _get_state(self, obj: LoggableObject) -> dict:
+        """
+        Get the state of the policy for an object. The state is dropped when the object is garbage collected.
+
+        Parameters:
+            obj (LoggableObject): The loggable object.
+
+        Returns:
+            dict: The number of `calls`, and the `last_time` and `last_fingerprint` of the last snapshot.
+        """
+        key = id(obj)
+        state = self._states.get(key)
+
+        if state is None:
+            state = self._states[key] = {"calls": 0, "last_time": None, "last_fingerprint": None}
+            weakref.finalize(obj, self._states.pop, key, None)
+
+        return state
+
+    def should_snapshot(self, obj: LoggableObject) -> bool:
+        """
+        Count a call of the object, and decide whether to take a snapshot of it.
+
+        Parameters:
+            obj (LoggableObject): The loggable object.
+
+        Returns:
+            bool: True if a snapshot should be taken.
+        """
+        with self._lock:
+            state = self._get_state(obj)
+            state["calls"] += 1
+
+            if self.every is not None and (state["calls"] - 1) % self.every != 0:
+                return False
+
+            now = time.monotonic()
+            if (self.min_interval is not None and state["last_time"] is not None
+                    and now - state["last_time"] < self.min_interval):
+                return False
+
+            if self.on_change or self.max_size is not None:
+                # The reserved attributes, such as the details of the latest calls, change on every call.
+                pickled_state = pickle.dumps(
+                    {key: val for key, val in obj.__dict__.items() if key not in _reserved_keys})
+
+                if self.max_size is not None and len(pickled_state) > self.max_size:
+                    return False
+
+                if self.on_change:
+                    fingerprint = fingerprint_bytes(pickled_state)
+                    if fingerprint == state["last_fingerprint"]:
+                        return False
+                    state["last_fingerprint"] = fingerprint
+
+            state["last_time"] = now
+            return True
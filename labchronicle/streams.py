@@ -0,0 +1,88 @@
+# This file contains the record streams, the attributes of a record entry that are written incrementally while the
+# function is running, instead of being assigned to the object and written once the function call finishes.
+from typing import Optional, TYPE_CHECKING
+
+import numpy as np
+
+from .handlers import RecordRows
+from .logger import setup_logging
+
+if TYPE_CHECKING:
+    from .core import RecordEntry
+
+logger = setup_logging(__name__)
+
+
+class RecordStream(object):
+    """
+    An array attribute of a record entry that grows along its first axis. Each block appended to the stream is
+    written to the record book right away, as rows of a resizable record, so the whole array never needs to be in
+    memory and the rows already written are kept if the process crashes.
+
+    The stream is loaded like the other attributes, with `RecordEntry.load_attribute`. A stream that is not attached
+    to a record entry, when the object is not being recorded, discards the blocks.
+    """
+
+    def __init__(self, record_entry: Optional["RecordEntry"], key: str, dtype: np.dtype,
+                 chunk_shape: tuple = None):
+        """
+        Initialize the stream. Use `RecordEntry.open_stream` or `LoggableObject.open_stream` to open a stream.
+
+        Parameters:
+            record_entry (RecordEntry): The record entry to write to, or None to discard the blocks.
+            key (str): The key of the attribute.
+            dtype (np.dtype): The data type of the array.
+            chunk_shape (tuple): Optional. The chunk shape of the record, including the first axis.
+        """
+        self._record_entry = record_entry
+        self.key = key
+        self.dtype = np.dtype(dtype)
+        self.chunk_shape = tuple(chunk_shape) if chunk_shape is not None else None
+        self.row_shape = None  # The shape of each row, set by the first block.
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def shape(self) -> tuple:
+        """
+        The shape of the array written so far.
+
+        Returns:
+            tuple: The shape of the array.
+        """
+        return (self._length,) + (self.row_shape if self.row_shape is not None else ())
+
+    def append(self, block):
+        """
+        Append a block of rows to the stream. A block with the shape of a row is a single row. The first block sets
+        the shape of the rows: it is split along its first axis, unless it has one dimension less than the chunk
+        shape, in which case it is a single row.
+
+        Parameters:
+            block (array_like): The rows to append.
+
+        Raises:
+            ValueError: If the rows of the block do not have the shape of the rows of the stream.
+        """
+        block = np.asarray(block, dtype=self.dtype)
+
+        if self.row_shape is None:
+            if self.chunk_shape is not None and block.ndim == len(self.chunk_shape) - 1:
+                block = block[np.newaxis]
+            if block.ndim == 0:
+                block = block[np.newaxis]
+            self.row_shape = block.shape[1:]
+        elif block.shape == self.row_shape:
+            block = block[np.newaxis]
+
+        if block.shape[1:] != self.row_shape:
+            msg = f"The rows of the block have shape {block.shape[1:]}, stream {self.key} expects {self.row_shape}."
+            logger.error(msg)
+            raise ValueError(msg)
+
+        if self._record_entry is not None:
+            self._record_entry.write_stream_rows(self.key, RecordRows(block, self.chunk_shape))
+
+        self._length += block.shape[0]
@@ -0,0 +1,229 @@
+# This file contains the background writer, that writes the records to the handlers from a dedicated thread, so the
+# decorated functions do not wait for the storage.
+import atexit
+import pathlib
+import threading
+import time
+import weakref
+from collections import deque
+
+from .handlers import RecordHandlersBase
+from .logger import setup_logging
+
+logger = setup_logging(__name__)
+
+# The names of the records that can be dropped with the `drop_snapshots` backpressure policy.
+SNAPSHOT_RECORD_NAMES = ("__object__",)
+
+# The delta encoded snapshots are never dropped: each delta is applied on top of the previous snapshot of the same
+# object, so dropping a keyframe or a delta would break the snapshots of all the following records of the object.
+UNDROPPABLE_SNAPSHOT_RECORD_NAMES = ("__object_keyframe__", "__object_delta__")
+
+# Writers whose thread is still running, closed at interpreter exit.
+_open_writers = weakref.WeakSet()
+
+
+@atexit.register
+def _close_open_writers():
+    """
+    Write the queued batches of all the writers that are still running and stop their threads, so the records are
+    not lost and the interpreter does not hang at exit when the record book is not closed.
+    """
+    for writer in list(_open_writers):
+        writer.close()
+
+
+class AsyncRecordWriter(object):
+    """
+    Write batches of records to a handler from a dedicated background thread.
+
+    The batches are passed to the thread through a bounded queue. When the queue is full, the backpressure policy
+    decides what happens to a new batch:
+
+    + `block`: Wait until there is space in the queue.
+    + `drop_snapshots`: Drop the full object snapshots of the batch, and queue the rest of the records. The delta
+      encoded snapshots are kept, see `UNDROPPABLE_SNAPSHOT_RECORD_NAMES`.
+    + `grow`: Queue the batch anyway, the queue grows without limit.
+
+    The writers that are not closed write their queued batches at interpreter exit.
+    """
+
+    backpressure_policies = ("block", "drop_snapshots", "grow")
+
+    def __init__(self, handler: RecordHandlersBase, max_queue_size: int = 64, backpressure: str = "block"):
+        """
+        Initialize the writer and start the writer thread.
+
+        Parameters:
+            handler (RecordHandlersBase): The handler to write the records to.
+            max_queue_size (int): The maximum number of batches waiting in the queue.
+            backpressure (str): The backpressure policy, one of `block`, `drop_snapshots` or `grow`.
+        """
+        if backpressure not in self.backpressure_policies:
+            msg = f"Unknown backpressure policy {backpressure}. Available policies: {self.backpressure_policies}."
+            logger.error(msg)
+            raise ValueError(msg)
+
+        self._handler = handler
+        self._max_queue_size = max_queue_size
+        self._backpressure = backpressure
+
+        self._queue = deque()
+        self._condition = threading.Condition()
+        self._pending = 0  # Number of batches queued or being written.
+        self._closed = False
+
+        self._statistics = {
+            "submitted_batches": 0,
+            "written_batches": 0,
+            "written_records": 0,
+            "dropped_records": 0,
+            "failed_batches": 0,
+            "max_queue_depth": 0,
+            "last_write_latency": 0.0,
+            "max_write_latency": 0.0,
+            "total_write_latency": 0.0,
+            "max_queue_latency": 0.0,
+            "total_queue_latency": 0.0,
+        }
+
+        self._thread = threading.Thread(target=self._run, name="labchronicle-writer", daemon=True)
+        self._thread.start()
+        _open_writers.add(self)
+
+    @staticmethod
+    def _is_snapshot(record_path) -> bool:
+        """
+        Check whether a record is an object snapshot that can be dropped. The keyframes and deltas of the delta
+        encoded snapshots are not.
+
+        Parameters:
+            record_path (pathlib.Path or str): The path to the record.
+
+        Returns:
+            bool: True if the record is a full object snapshot.
+        """
+        name = pathlib.PurePosixPath(str(record_path)).name
+        return name in SNAPSHOT_RECORD_NAMES and name not in UNDROPPABLE_SNAPSHOT_RECORD_NAMES
+
+    def submit(self, records: list):
+        """
+        Queue a batch of records to be written by the writer thread.
+
+        Parameters:
+            records (list): A list of (record_path, record) tuples. The records must not be modified afterwards.
+        """
+        with self._condition:
+            if self._closed:
+                msg = "The writer is closed."
+                logger.error(msg)
+                raise RuntimeError(msg)
+
+            if len(self._queue) >= self._max_queue_size:
+                if self._backpressure == "block":
+                    while len(self._queue) >= self._max_queue_size:
+                        self._condition.wait()
+                elif self._backpressure == "drop_snapshots":
+                    kept_records = [(path, record) for path, record in records if not self._is_snapshot(path)]
+                    self._statistics["dropped_records"] += len(records) - len(kept_records)
+                    records = kept_records
+
+            self._queue.append((records, time.perf_counter()))
+            self._pending += 1
+            self._statistics["submitted_batches"] += 1
+            self._statistics["max_queue_depth"] = max(self._statistics["max_queue_depth"], len(self._queue))
+            self._condition.notify_all()
+
+    def _run(self):
+        """
+        The loop of the writer thread.
+        """
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+
+                if not self._queue:
+                    return
+
+                records, submit_time = self._queue.popleft()
+                self._condition.notify_all()
+
+            start_time = time.perf_counter()
+            try:
+                self._handler.add_records(records)
+                failed = False
+            except Exception as e:
+                logger.error(f"Failed to write {len(records)} records: {e}")
+                failed = True
+            end_time = time.perf_counter()
+
+            with self._condition:
+                self._pending -= 1
+                self._update_statistics(len(records), failed, end_time - start_time, end_time - submit_time)
+                self._condition.notify_all()
+
+    def _update_statistics(self, number_of_records: int, failed: bool, write_latency: float, queue_latency: float):
+        """
+        Update the statistics after writing a batch. Must be called with the condition lock held.
+
+        Parameters:
+            number_of_records (int): The number of records in the batch.
+            failed (bool): Whether writing the batch failed.
+            write_latency (float): The time spent writing the batch, in seconds.
+            queue_latency (float): The time from submitting the batch to finishing writing it, in seconds.
+        """
+        statistics = self._statistics
+
+        if failed:
+            statistics["failed_batches"] += 1
+        else:
+            statistics["written_batches"] += 1
+            statistics["written_records"] += number_of_records
+
+        statistics["last_write_latency"] = write_latency
+        statistics["max_write_latency"] = max(statistics["max_write_latency"], write_latency)
+        statistics["total_write_latency"] += write_latency
+        statistics["max_queue_latency"] = max(statistics["max_queue_latency"], queue_latency)
+        statistics["total_queue_latency"] += queue_latency
+
+    def get_statistics(self) -> dict:
+        """
+        Get the statistics of the writer.
+
+        Returns:
+            dict: The queue depth, the number of batches and records written, and the write latencies in seconds.
+        """
+        with self._condition:
+            statistics = dict(self._statistics)
+            statistics["queue_depth"] = len(self._queue)
+
+        processed_batches = statistics["written_batches"] + statistics["failed_batches"]
+        statistics["mean_write_latency"] = statistics.pop("total_write_latency") / max(processed_batches, 1)
+        statistics["mean_queue_latency"] = statistics.pop("total_queue_latency") / max(processed_batches, 1)
+
+        return statistics
+
+    def flush(self):
+        """
+        Wait until all the queued batches are written, then flush the handler.
+        """
+        with self._condition:
+            while self._pending > 0:
+                self._condition.wait()
+
+        self._handler.flush()
+
+    def close(self):
+        """
+        Write all the queued batches and stop the writer thread.
+        """
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+
+        self._thread.join()
+        self._handler.flush()
+        _open_writers.discard(self)
@@ -1,8 +1,13 @@
 import h5py
 import numpy as np
 import pathlib
+import pickle
+import pytest
 
-from labchronicle.handlers import RecordHandlerHDF5
+from labchronicle.handlers import RecordHandlerHDF5, RecordAttributes, RecordLink, RecordPickle, RecordTree, \
+    HDF5DatasetProxy
+from labchronicle.serialization import capture_value
+from labchronicle.handlers.chunking import choose_chunk_shape
 
 
 def test_record_handler_hdf5_integration(tmp_path):
@@ -60,3 +65,369 @@ def test_list_records(tmp_path):
 
     assert list(handler.list_records(pathlib.Path('/'))) == ['group','root']
     assert list(handler.list_records(pathlib.Path('/group'))) == ['dataset']
+
+
+def test_session_mode_keeps_file_open(tmp_path):
+    log_path = str(tmp_path / "test.hdf5")
+    config = {"log_path": log_path, "hdf5_session": True}
+    handler = RecordHandlerHDF5(config)
+    handler.init_new_record_book()
+
+    session_file = handler._session_file
+    assert session_file is not None
+
+    record = np.random.rand(10, 10)
+    handler.add_record('group/dataset', record)
+    handler.add_record('group/name', 'abc')
+
+    assert handler._session_file is session_file
+    assert np.allclose(handler.get_record_by_path('group/dataset'), record)
+    assert handler.list_records('/group') == ['dataset', 'name']
+
+    handler.close()
+    assert handler._session_file is None
+
+    with h5py.File(log_path, 'r') as h5:
+        assert np.allclose(h5["group"]["dataset"], record)
+
+
+def test_session_mode_flushes_on_interval(tmp_path):
+    log_path = str(tmp_path / "test.hdf5")
+    config = {"log_path": log_path, "hdf5_session": True, "hdf5_flush_interval": 0}
+    handler = RecordHandlerHDF5(config)
+    handler.init_new_record_book()
+
+    handler.add_record('group/dataset', np.arange(10))
+
+    # The data is readable by another handle before the session is closed.
+    with h5py.File(log_path, 'r') as h5:
+        assert list(h5["group"]["dataset"]) == list(range(10))
+
+    handler.close()
+
+
+def test_session_mode_read_only(tmp_path):
+    log_path = str(tmp_path / "test.hdf5")
+    writer = RecordHandlerHDF5({"log_path": log_path})
+    writer.init_new_record_book()
+    writer.add_record('group/dataset', np.arange(5))
+
+    reader = RecordHandlerHDF5({"log_path": log_path, "hdf5_session": True})
+    reader.load_record_book()
+    assert reader._session_file.mode == 'r'
+    assert list(reader.get_record_by_path('group/dataset')) == list(range(5))
+    reader.close()
+
+
+def test_add_records(tmp_path):
+    log_path = str(tmp_path / "test.hdf5")
+    handler = RecordHandlerHDF5({"log_path": log_path})
+    handler.init_new_record_book()
+
+    record = np.random.rand(10, 10)
+    handler.add_records([
+        (pathlib.Path('group/dataset'), record),
+        ('group/name', 'abc'),
+        ('group/number', 1),
+    ])
+
+    with h5py.File(log_path, 'r') as h5:
+        assert np.allclose(h5["group"]["dataset"], record)
+        assert h5["group"]["name"][()] == b'abc'
+        assert h5["group"]["number"][()] == 1
+
+
+def test_default_compression_policy(tmp_path):
+    log_path = str(tmp_path / "test.hdf5")
+    handler = RecordHandlerHDF5({"log_path": log_path, "hdf5_structured_records": False})
+    handler.init_new_record_book()
+
+    handler.add_record('array', np.zeros(1000))
+    handler.add_record('object', {"a": list(range(100))})
+
+    with h5py.File(log_path, 'r') as h5:
+        assert h5["array"].compression == "gzip"
+        assert h5["array"].compression_opts == 9
+        assert h5["object"].compression is None
+
+    assert handler.get_record_by_path('object').tobytes()
+
+
+def test_compression_policy(tmp_path):
+    log_path = str(tmp_path / "test.hdf5")
+    config = {
+        "log_path": log_path,
+        "hdf5_compression": {
+            "array": {"codec": "lzf", "min_size": 1000},
+            "object": {"codec": "gzip", "level": 1},
+        },
+        "hdf5_structured_records": False,
+    }
+    handler = RecordHandlerHDF5(config)
+    handler.init_new_record_book()
+
+    handler.add_record('small_array', np.zeros(10))
+    handler.add_record('large_array', np.zeros(1000))
+    handler.add_record('object', {"a": list(range(100))})
+
+    with h5py.File(log_path, 'r') as h5:
+        assert h5["small_array"].compression is None
+        assert h5["large_array"].compression == "lzf"
+        assert h5["object"].compression == "gzip"
+        assert h5["object"].compression_opts == 1
+
+    loaded_object = handler.get_record_by_path('object')
+    assert isinstance(loaded_object, np.void)
+    assert pickle.loads(loaded_object.tobytes()) == {"a": list(range(100))}
+
+
+def test_adaptive_compression(tmp_path):
+    log_path = str(tmp_path / "test.hdf5")
+    config = {"log_path": log_path, "hdf5_adaptive_compression": True}
+    handler = RecordHandlerHDF5(config)
+    handler.init_new_record_book()
+
+    noise = np.random.randint(0, 256, size=10000, dtype=np.uint8)
+    handler.add_record('noise', noise)
+    handler.add_record('zeros', np.zeros(10000))
+
+    with h5py.File(log_path, 'r') as h5:
+        assert h5["noise"].compression is None
+        assert h5["zeros"].compression == "gzip"
+        assert np.array_equal(h5["noise"][()], noise)
+
+
+def test_record_attributes(tmp_path):
+    log_path = str(tmp_path / "test.hdf5")
+    handler = RecordHandlerHDF5({"log_path": log_path})
+    handler.init_new_record_book()
+
+    handler.add_record('group/dataset', np.arange(5))
+    handler.add_records([('group', RecordAttributes(name='abc', timestamp=1))])
+
+    assert handler.get_record_attributes('group') == {'name': 'abc', 'timestamp': 1}
+    assert handler.get_record_attributes('/root') == {}
+    assert handler.list_records('group') == ['dataset']
+
+
+def test_record_link(tmp_path):
+    log_path = str(tmp_path / "test.hdf5")
+    handler = RecordHandlerHDF5({"log_path": log_path})
+    handler.init_new_record_book()
+
+    handler.add_record('/root/0-f/data', np.arange(5))
+    handler.add_record('/root/1-f/data', RecordLink(pathlib.Path('/root/0-f/data')))
+
+    assert np.array_equal(handler.get_record_by_path('/root/1-f/data'), np.arange(5))
+
+    with h5py.File(log_path, 'r') as f:
+        # The data is stored once, both paths are hard links to it.
+        assert f['/root/1-f/data'].id == f['/root/0-f/data'].id
+
+
+def test_record_pickle(tmp_path):
+    log_path = str(tmp_path / "test.hdf5")
+    handler = RecordHandlerHDF5({"log_path": log_path})
+    handler.init_new_record_book()
+
+    value = {'waveform': np.arange(1000.), 'small': np.arange(3), 'name': 'abc'}
+    handler.add_record('/root/0-f/__args__', capture_value(value))
+
+    record = handler.get_record_by_path('/root/0-f/__args__')
+    assert isinstance(record, RecordPickle)
+
+    loaded_value = record.load()
+    assert np.array_equal(loaded_value['waveform'], value['waveform'])
+    assert np.array_equal(loaded_value['small'], value['small'])
+    assert loaded_value['name'] == 'abc'
+
+    with h5py.File(log_path, 'r') as f:
+        # Only the large array is stored out-of-band, next to the pickle.
+        assert f['/root/0-f/__args__'].attrs['__serialization__'] == 'pickle5'
+        assert sorted(f['/root/0-f/__args__'].keys()) == ['buffer_0', 'pickle']
+        assert f['/root/0-f/__args__/buffer_0'].nbytes == value['waveform'].nbytes
+
+
+def test_pickle_out_of_band_buffers(tmp_path):
+    log_path = str(tmp_path / "test.hdf5")
+    handler = RecordHandlerHDF5({"log_path": log_path, "hdf5_structured_records": False})
+    handler.init_new_record_book()
+
+    value = {'I': np.arange(2000.).reshape(20, 100), 'Q': np.asfortranarray(np.ones((100, 20), dtype=np.int32)),
+             'dates': np.arange(1000).astype('datetime64[s]'), 'label': 'sweep'}
+    handler.add_record('/root/0-f/data', value)
+    handler.add_record('/root/0-f/small', {'x': np.arange(3)})
+
+    loaded_value = handler.get_record_by_path('/root/0-f/data').load()
+    for key in ['I', 'Q', 'dates']:
+        assert np.array_equal(loaded_value[key], value[key])
+    assert loaded_value['label'] == 'sweep'
+    # The arrays are rebuilt on top of the buffers read from the file.
+    assert loaded_value['I'].base is not None
+
+    assert isinstance(handler.get_record_by_path('/root/0-f/small'), np.void)
+
+    with h5py.File(log_path, 'r') as f:
+        group = f['/root/0-f/data']
+        assert group.attrs['__serialization__'] == 'pickle5'
+        # The large numeric arrays can be read directly, the others stay in the pickle.
+        assert group.attrs['__buffers__'] == 2
+        assert np.array_equal(group['buffer_0'][()], value['I'])
+        assert group['buffer_1'].dtype == np.int32
+
+
+def test_lazy_record(tmp_path):
+    log_path = str(tmp_path / "test.hdf5")
+    handler = RecordHandlerHDF5({"log_path": log_path})
+    handler.init_new_record_book()
+
+    data = np.arange(20000.).reshape(200, 100)
+    handler.add_record('/root/0-f/data', data)
+    handler.add_record('/root/0-f/name', 'abc')
+
+    with handler.get_lazy_record_by_path('/root/0-f/data') as proxy:
+        assert isinstance(proxy, HDF5DatasetProxy)
+        assert proxy.shape == (200, 100) and proxy.dtype == np.float64 and len(proxy) == 200
+        assert np.array_equal(proxy[5], data[5])
+        assert np.array_equal(proxy[:, 3], data[:, 3])
+        assert np.array_equal(np.asarray(proxy), data)
+
+        blocks = list(proxy.iter_chunks(chunk_rows=64))
+        assert [selection.start for selection, _ in blocks] == [0, 64, 128, 192]
+        assert np.array_equal(np.concatenate([block for _, block in blocks]), data)
+
+    # The values that are not arrays are read as they are.
+    assert handler.get_lazy_record_by_path('/root/0-f/name') == b'abc'
+
+
+def test_lazy_record_then_write(tmp_path):
+    log_path = str(tmp_path / "test.hdf5")
+    handler = RecordHandlerHDF5({"log_path": log_path})
+    handler.init_new_record_book()
+
+    data = np.arange(200.).reshape(20, 10)
+    handler.add_record('/root/0-f/data', data)
+
+    # The file kept open by the proxy is closed to write the file, and opened again by the next read.
+    proxy = handler.get_lazy_record_by_path('/root/0-f/data')
+    assert np.array_equal(proxy[3], data[3])
+    handler.add_record('/root/1-f/data', data * 2)
+    assert np.array_equal(proxy[4], data[4])
+
+    for selection, block in proxy.iter_chunks(chunk_rows=8):
+        handler.add_record(f'/root/2-f/{selection.start}', block)
+    assert np.array_equal(handler.get_record_by_path('/root/2-f/16'), data[16:])
+    proxy.close()
+
+
+def test_structured_records(tmp_path):
+    log_path = str(tmp_path / "test.hdf5")
+    handler = RecordHandlerHDF5({"log_path": log_path})
+    handler.init_new_record_book()
+
+    iq = np.arange(2000.).reshape(20, 100)
+    value = {'z': iq, 'Q': [1, 2.5, True, 1 + 2j, np.float32(3), np.True_], 'settings': ({'label': 'sweep'}, 'é'),
+             'empty': {}, 'points': list(range(1000)), 'flags': (True, False)}
+    handler.add_record('/root/0-f/data', value)
+    handler.add_record('/root/0-f/captured', RecordTree.from_value({'I': iq}))
+
+    # The containers are groups, other HDF5 tools can read the fields directly.
+    with h5py.File(log_path, 'r') as f:
+        assert f['/root/0-f/data'].attrs['__serialization__'] == 'dict'
+        assert list(f['/root/0-f/data'].keys()) == ['z', 'Q', 'settings', 'empty', 'points', 'flags']
+        assert np.array_equal(f['/root/0-f/data/z'][()], iq)
+        assert f['/root/0-f/data/settings/0/label'][()] == b'sweep'
+        # The lists of numbers of a single type are one array.
+        assert isinstance(f['/root/0-f/data/points'], h5py.Dataset)
+        assert np.array_equal(f['/root/0-f/data/points'][()], np.arange(1000))
+
+    loaded_value = handler.get_record_by_path('/root/0-f/data')
+    assert list(loaded_value) == ['z', 'Q', 'settings', 'empty', 'points', 'flags']
+    assert np.array_equal(loaded_value['z'], iq)
+    assert loaded_value['Q'] == [1, 2.5, True, 1 + 2j, np.float32(3), np.True_]
+    assert [type(item) for item in loaded_value['Q']] == [int, float, bool, complex, np.float32, np.bool_]
+    assert loaded_value['settings'] == ({'label': 'sweep'}, 'é') and loaded_value['empty'] == {}
+    assert loaded_value['points'] == list(range(1000)) and type(loaded_value['points'][0]) is int
+    assert loaded_value['flags'] == (True, False) and type(loaded_value['flags'][0]) is bool
+    assert np.array_equal(handler.get_record_by_path('/root/0-f/captured')['I'], iq)
+
+    # The arrays are proxies when the tree is read lazily, and the fields can be read on their own.
+    lazy_value = handler.get_lazy_record_by_path('/root/0-f/data')
+    assert isinstance(lazy_value['z'], HDF5DatasetProxy) and lazy_value['Q'][0] == 1
+    assert lazy_value['points'] == list(range(1000))
+    assert np.array_equal(lazy_value['z'][3], iq[3])
+    lazy_value['z'].close()
+    assert np.array_equal(handler.get_record_by_path('/root/0-f/data/z'), iq)
+
+    # The values that cannot be stored as groups and datasets are pickled, and so are the internal records.
+    for name, unstructured in [('keys', {1: iq}), ('objects', [None]), ('dates', {'t': np.arange(3).astype('M8[s]')}),
+                               ('large', [{'x': i} for i in range(300)]), ('__return_values__', (iq, iq))]:
+        handler.add_record(f'/root/0-f/{name}', unstructured)
+        loaded_value = handler.get_record_by_path(f'/root/0-f/{name}')
+        assert isinstance(loaded_value, (np.void, RecordPickle))
+
+    handler = RecordHandlerHDF5({"log_path": log_path, "hdf5_structured_records": False})
+    handler.load_record_book()
+    handler.add_record('/root/0-f/pickled', value)
+    assert isinstance(handler.get_record_by_path('/root/0-f/pickled'), RecordPickle)
+
+
+def test_contiguous_arrays_memmap(tmp_path):
+    log_path = str(tmp_path / "test.hdf5")
+    handler = RecordHandlerHDF5({"log_path": log_path, "hdf5_contiguous_min_size": 4096,
+                                 "hdf5_memmap_min_size": 4096, "hdf5_structured_records": False})
+    handler.init_new_record_book()
+
+    data = np.arange(20000.).reshape(200, 100)
+    handler.add_record('/root/0-f/data', data)
+    handler.add_record('/root/0-f/small', np.arange(10))
+    handler.add_record('/root/0-f/dict', {'data': data})
+
+    loaded_data = handler.get_record_by_path('/root/0-f/data')
+    assert isinstance(loaded_data, np.memmap)
+    assert not loaded_data.flags.writeable
+    assert np.array_equal(loaded_data, data)
+
+    assert not isinstance(handler.get_record_by_path('/root/0-f/small'), np.memmap)
+    # The out-of-band buffers of the pickles are mapped as well.
+    assert np.array_equal(handler.get_record_by_path('/root/0-f/dict').load()['data'], data)
+
+    with h5py.File(log_path, 'r') as f:
+        assert f['/root/0-f/data'].chunks is None
+        assert f['/root/0-f/data'].compression is None
+        assert f['/root/0-f/small'].chunks is not None
+
+
+def test_choose_chunk_shape():
+    shape, dtype = (512, 16384), np.float64
+
+    assert choose_chunk_shape(shape, dtype, 2 ** 20, 'row') == (8, 16384)
+    assert choose_chunk_shape(shape, dtype, 2 ** 20, 'column') == (512, 256)
+    assert choose_chunk_shape(shape, dtype, 2 ** 20, 'balanced') == (64, 2048)
+    assert choose_chunk_shape((10,), dtype, 2 ** 20) == (10,)
+    # The growing first axis of the resizable datasets spans as many rows as fit in a chunk.
+    assert choose_chunk_shape((1, 4096), dtype, 2 ** 20, 'row', unlimited=True) == (32, 4096)
+    assert choose_chunk_shape((0, 3), dtype, unlimited=True) == (43690, 3)
+    assert choose_chunk_shape((0, 4096), dtype, 2 ** 20, 'column', unlimited=True) == (131072, 1)
+    assert choose_chunk_shape((0, 3), dtype) is None
+
+
+def test_chunking_policy(tmp_path):
+    log_path = str(tmp_path / "test.hdf5")
+    handler = RecordHandlerHDF5({"log_path": log_path, "hdf5_chunk_size": 2 ** 16,
+                                 "hdf5_attribute_access_patterns": {"sweep": "row"},
+                                 "hdf5_chunk_cache_size": 2 ** 24})
+    handler.init_new_record_book()
+
+    handler.add_record('/root/0-f/sweep', np.zeros((64, 1024)))
+    handler.add_record('/root/0-f/image', np.zeros((64, 1024)))
+
+    with h5py.File(log_path, 'r') as f:
+        assert f['/root/0-f/sweep'].chunks == (8, 1024)
+        assert f['/root/0-f/image'].chunks == (16, 512)
+
+    with handler._open_file('r') as f:
+        assert f.id.get_access_plist().get_cache()[2] == 2 ** 24
+
+    with pytest.raises(ValueError):
+        RecordHandlerHDF5({"log_path": log_path, "hdf5_access_pattern": "diagonal"})
@@ -1,8 +1,10 @@
 import h5py
 import numpy as np
 import pathlib
+import pickle
 
-from labchronicle.handlers import RecordHandlerMemory  # Update the import path as necessary
+from labchronicle.handlers import RecordHandlerMemory, RecordAttributes, RecordLink, RecordPickle, \
+    RecordTree  # Update the import path as necessary
 
 
 def test_record_handler_memory_integration():
@@ -51,3 +53,48 @@ def test_list_records():
     expected_records = ['group/dataset']
     records_list = handler.list_records()
     assert set(records_list) == set(expected_records)
+
+
+def test_record_attributes():
+    handler = RecordHandlerMemory({"max_records": 5})
+    handler.init_new_record_book()
+
+    handler.add_record('group', RecordAttributes(name='abc'))
+    handler.add_record('group', RecordAttributes(timestamp=1))
+
+    assert handler.get_record_attributes('group') == {'name': 'abc', 'timestamp': 1}
+    assert handler.get_record_attributes('other') == {}
+    assert handler.list_records() == []
+
+
+def test_record_link():
+    handler = RecordHandlerMemory({"max_records": 5})
+    handler.init_new_record_book()
+
+    handler.add_record('a/data', [1, 2])
+    handler.add_record('b/data', RecordLink('a/data'))
+
+    assert handler.get_record_by_path('b/data') == [1, 2]
+
+
+def test_record_pickle():
+    handler = RecordHandlerMemory({"max_records": 5})
+    handler.init_new_record_book()
+
+    record = RecordPickle(pickle.dumps([1, 2], protocol=5))
+    handler.add_record('a/data', record)
+
+    assert handler.get_record_by_path('a/data').load() == [1, 2]
+
+
+def test_record_tree():
+    handler = RecordHandlerMemory({"max_records": 5})
+    handler.init_new_record_book()
+
+    value = {'I': np.arange(3.), 'meta': [1, 'a']}
+    handler.add_record('a/data', RecordTree.from_value(value))
+    value['meta'].append(2)
+
+    loaded_value = handler.get_record_by_path('a/data').load()
+    assert np.array_equal(loaded_value['I'], np.arange(3.)) and loaded_value['meta'] == [1, 'a']
+    assert RecordTree.from_value({'t': {1, 2}}) is None
@@ -0,0 +1,99 @@
+import pytest
+
+from labchronicle import Chronicle, LoggableObject, log_and_record, load_object
+from labchronicle.catalog import RecordCatalog, get_catalog_path, main
+
+
+class SampleClass(LoggableObject):
+    def __init__(self):
+        super().__init__()
+        self.value = 0
+
+    @log_and_record
+    def set_value(self, value):
+        self.value = value
+
+    @log_and_record
+    def reset(self):
+        self.value = 0
+
+
+@pytest.fixture
+def chronicle(tmp_path):
+    Chronicle._instance = None
+    chronicle = Chronicle(config={'log_path': str(tmp_path), 'catalog': True})
+    yield chronicle
+    Chronicle._instance = None
+
+
+def test_add_and_query_records(tmp_path):
+    catalog = RecordCatalog(tmp_path / "catalog.sqlite")
+    catalog.add_records([
+        ("id-0", "/log/book-a", "/root/0-A.f", "A.f", 100, "alice"),
+        ("id-1", "/log/book-a", "/root/1-A.g", "A.g", 200, "alice"),
+        ("id-2", "/log/book-b", "/root/0-A.f", "A.f", 300, "bob"),
+    ])
+
+    assert [record["record_id"] for record in catalog.query(name="A.f")] == ["id-0", "id-2"]
+    assert [record["record_id"] for record in catalog.query(start_time=150, end_time=300)] == ["id-1", "id-2"]
+    assert [record["record_id"] for record in catalog.query(user="alice", name="A.g")] == ["id-1"]
+    assert [record["record_id"] for record in catalog.query(book_path="/log/book-b")] == ["id-2"]
+    assert len(catalog.query(limit=2)) == 2
+    assert catalog.get_record_location("id-1") == ("/log/book-a", "/root/1-A.g")
+    assert catalog.get_record_location("missing") is None
+
+    catalog.close()
+
+    # The records are persisted.
+    catalog = RecordCatalog(tmp_path / "catalog.sqlite")
+    assert len(catalog.query()) == 3
+    catalog.close()
+
+
+def test_catalog_updated_when_recording(chronicle, tmp_path):
+    chronicle.start_log('catalog')
+    sample = SampleClass()
+    sample.set_value(3)
+    sample.reset()
+    book_path = chronicle._active_record_book.get_path()
+    chronicle.end_log()
+
+    catalog = chronicle.get_catalog()
+    assert catalog.get_path() == get_catalog_path(tmp_path)
+
+    records = catalog.query(name="SampleClass.set_value")
+    assert len(records) == 1
+    assert records[0]["book_path"] == book_path.resolve().as_posix()
+    assert records[0]["entry_path"] == "/root/0-SampleClass.set_value"
+
+    record_id = sample.retrieve_latest_record_entry_details(sample.set_value)["record_id"]
+    assert records[0]["record_id"] == record_id
+
+    # The record can be loaded without the record book path.
+    assert load_object(record_id=record_id).value == 3
+
+    with pytest.raises(ValueError):
+        load_object(record_id="missing")
+
+
+def test_rebuild_catalog(chronicle, tmp_path):
+    chronicle.start_log('first')
+    sample = SampleClass()
+    sample.set_value(1)
+    chronicle.end_log()
+
+    chronicle.start_log('second')
+    sample.set_value(2)
+    sample.reset()
+    chronicle.end_log()
+
+    chronicle.get_catalog().close()
+    catalog_path = get_catalog_path(tmp_path)
+    catalog_path.unlink()
+
+    main(["rebuild", str(tmp_path)])
+
+    catalog = RecordCatalog(catalog_path)
+    assert len(catalog.query()) == 3
+    assert len(catalog.query(name="SampleClass.set_value")) == 2
+    catalog.close()
@@ -1,10 +1,13 @@
 import os
 import pathlib
+import time
 
 import pytest
+import h5py
 import numpy as np
 
-from labchronicle import Chronicle, LoggableObject, log_and_record, load_object, load_attributes
+from labchronicle import Chronicle, LoggableObject, SnapshotPolicy, log_and_record, log_event, load_object, \
+    load_attributes
 
 
 class MockChronicle(Chronicle):
@@ -125,3 +128,590 @@ def test_run_logs_and_read_logs(tmp_path):
     assert sample_method_2_entry.get_recorded_attribute_names() == ['data']
     assert np.allclose(sample_method_2_entry.load_attribute('data'), np.arange(30))
     assert sample_method_2_entry.load_return_values() == 123
+
+
+def new_chronicle(tmp_path, **config):
+    """
+    Replace the chronicle singleton with a new instance that uses the given configuration.
+    """
+    Chronicle._instance = None
+    config['log_path'] = str(tmp_path)
+    return Chronicle(config=config)
+
+
+def test_run_logs_with_write_buffer(tmp_path):
+    chronicle = new_chronicle(tmp_path, write_buffer=True)
+    chronicle.start_log('')
+
+    sample_class = SampleClass()
+    sample_class.sample_method_1(1, 2, c=3)
+    sample_class.sample_method_2(4, 5, f=6)
+
+    path = chronicle._active_record_book.get_path()
+    chronicle.end_log()
+
+    record_details = sample_class.retrieve_latest_record_entry_details(sample_class.sample_method_2)
+    attributes = load_attributes(record_book_path=str(record_details['record_book_path']),
+                                 record_id=str(record_details['record_id']))
+    assert np.allclose(attributes['data'], np.arange(30))
+    assert attributes['__return_values__'] == 123
+
+    record_book = chronicle.open_record_book(path)
+    children = record_book.get_root_entry().children
+    assert [child.name for child in children] == ['SampleClass.sample_method_1', 'SampleClass.sample_method_2']
+    assert children[0].get_recorded_attribute_names() == ['data', 'ai', 'bi', 'ci']
+    assert children[0].get_args() == ((1, 2, 3), {})
+    assert np.allclose(children[0].load_attribute('data'), np.arange(20))
+
+    Chronicle._instance = None
+
+
+def test_run_logs_with_async_write(tmp_path):
+    chronicle = new_chronicle(tmp_path, async_write=True, async_queue_size=2)
+    chronicle.start_log('')
+
+    sample_class = SampleClass()
+    for i in range(5):
+        sample_class.sample_method_1(i, 2, c=3)
+
+    chronicle.flush()
+    statistics = chronicle._active_record_book.get_writer_statistics()
+    assert statistics["queue_depth"] == 0
+    assert statistics["written_batches"] == statistics["submitted_batches"] >= 5
+
+    path = chronicle._active_record_book.get_path()
+    chronicle.end_log()
+
+    record_book = chronicle.open_record_book(path)
+    children = record_book.get_root_entry().children
+    assert [child.load_attribute('ai') for child in children] == list(range(5))
+    assert record_book.get_record_by_id(children[3].record_id).get_object().ai == 3
+
+    Chronicle._instance = None
+
+
+class NestedClass(LoggableObject):
+    @log_and_record
+    def inner(self, x):
+        self.x = x
+        return x
+
+    @log_and_record
+    def outer(self, x):
+        return self.inner(x) + self.inner(x + 1)
+
+
+@pytest.mark.parametrize('config', [{'write_buffer': True}, {'async_write': True}])
+def test_run_logs_nested_calls_with_write_buffer(tmp_path, config):
+    chronicle = new_chronicle(tmp_path, **config)
+    chronicle.start_log('')
+
+    # The outer record entry is still in the write buffer when the inner ones are created.
+    assert NestedClass().outer(1) == 3
+
+    path = chronicle._active_record_book.get_path()
+    chronicle.end_log()
+
+    record_book = chronicle.open_record_book(path)
+    outer = record_book.get_root_entry().children[0]
+    assert outer.name == 'NestedClass.outer'
+    assert [child.name for child in outer.children] == ['NestedClass.inner', 'NestedClass.inner']
+    assert [child.load_attribute('x') for child in outer.children] == [1, 2]
+
+    Chronicle._instance = None
+
+
+@pytest.mark.parametrize('write_buffer', [False, True])
+def test_run_logs_with_attribute_metadata(tmp_path, write_buffer):
+    chronicle = new_chronicle(tmp_path, metadata_layout='attributes', write_buffer=write_buffer)
+    chronicle.start_log('')
+
+    sample_class = SampleClass()
+    sample_class.sample_method_1(1, 2, c=3)
+
+    path = chronicle._active_record_book.get_path()
+    chronicle.end_log()
+
+    record_book = chronicle.open_record_book(path)
+    entry = record_book.get_root_entry().children[0]
+    assert entry.name == 'SampleClass.sample_method_1'
+    assert entry.get_recorded_attribute_names() == ['data', 'ai', 'bi', 'ci']
+    assert entry.load_attribute('ai') == 1
+
+    record_details = sample_class.retrieve_latest_record_entry_details(sample_class.sample_method_1)
+    assert entry.record_id == record_details['record_id']
+    assert entry.record_time == record_details['record_time']
+
+    # Only the attributes and the snapshot are saved as separate records.
+    assert '__name__' not in record_book.handler.list_records(entry.get_path())
+
+    Chronicle._instance = None
+
+
+@pytest.mark.parametrize('record_id_layout', ['datasets', 'index'])
+def test_run_logs_with_record_id_layout(tmp_path, record_id_layout):
+    chronicle = new_chronicle(tmp_path, record_id_layout=record_id_layout)
+    chronicle.start_log('')
+
+    sample_class = SampleClass()
+    for i in range(3):
+        sample_class.sample_method_1(i, 2, c=3)
+
+    path = chronicle._active_record_book.get_path()
+    chronicle.end_log()
+
+    record_book = chronicle.open_record_book(path)
+    children = record_book.get_root_entry().children
+    assert sorted(record_book.get_available_record_ids()) == sorted(str(child.record_id) for child in children)
+    assert record_book.get_record_by_id(children[1].record_id).load_attribute('ai') == 1
+
+    # The index layout does not create a record for each record id.
+    assert ('uuid' in record_book.handler.list_records('/')) == (record_id_layout == 'datasets')
+
+    Chronicle._instance = None
+
+
+class CountingClass(LoggableObject):
+    def __init__(self):
+        super().__init__()
+        self.gain = 2
+        self.trace = np.zeros(4)
+
+    @log_and_record
+    def measure(self, repeat):
+        for i in range(repeat):
+            self.trace = self.trace + self.gain
+
+
+@pytest.mark.parametrize('metadata_layout', ['datasets', 'attributes'])
+def test_run_logs_with_attribute_counts(tmp_path, metadata_layout):
+    chronicle = new_chronicle(tmp_path, metadata_layout=metadata_layout)
+    chronicle.start_log('')
+
+    counting_class = CountingClass()
+    counting_class.measure(3)
+
+    path = chronicle._active_record_book.get_path()
+    chronicle.end_log()
+
+    record_book = chronicle.open_record_book(path)
+    entry = record_book.get_root_entry().children[0]
+    assert entry.get_recorded_attribute_names() == ['trace', 'gain']
+    assert entry.get_recorded_attribute_names(with_counts=True) == {'trace': (3, 3), 'gain': (3, 0)}
+
+    Chronicle._instance = None
+
+
+class WriteOnlyCountingClass(CountingClass):
+    _tracking_mode = 'write'
+
+
+def test_run_logs_with_write_only_tracking(tmp_path):
+    chronicle = new_chronicle(tmp_path)
+    chronicle.start_log('')
+
+    counting_class = WriteOnlyCountingClass()
+    counting_class.measure(3)
+
+    path = chronicle._active_record_book.get_path()
+    chronicle.end_log()
+
+    record_book = chronicle.open_record_book(path)
+    entry = record_book.get_root_entry().children[0]
+    # The gain is only read, so it is not saved with the record.
+    assert entry.get_recorded_attribute_names(with_counts=True) == {'trace': (0, 3)}
+    assert 'gain' not in record_book.handler.list_records(entry.get_path())
+
+    Chronicle._instance = None
+
+
+def test_run_logs_with_change_detection(tmp_path):
+    chronicle = new_chronicle(tmp_path, change_detection=True)
+    chronicle.start_log('')
+
+    counting_class = CountingClass()
+    counting_class.measure(1)
+    counting_class.measure(1)
+    counting_class.gain = 3
+    counting_class.measure(1)
+
+    path = chronicle._active_record_book.get_path()
+    chronicle.end_log()
+
+    record_book = chronicle.open_record_book(path)
+    children = record_book.get_root_entry().children
+    assert [child.load_attribute('gain') for child in children[:2]] == [2, 2]
+    assert [child.load_attribute('trace')[0] for child in children[:2]] == [2, 4]
+
+    with h5py.File(path, 'r') as f:
+        paths = [child.get_path().as_posix() for child in children]
+        # The unchanged gain is linked to the first record, the changed trace is written again.
+        assert f[paths[1] + '/gain'].id == f[paths[0] + '/gain'].id
+        assert f[paths[1] + '/trace'].id != f[paths[0] + '/trace'].id
+        assert f[paths[2] + '/gain'].id != f[paths[0] + '/gain'].id
+
+    assert children[2].load_attribute('gain') == 3
+
+    Chronicle._instance = None
+
+
+class SnapshotClass(LoggableObject):
+    def __init__(self):
+        super().__init__()
+        self.calibration = np.arange(10000.)
+        self.count = 0
+
+    @log_and_record
+    def step(self):
+        self.count += 1
+
+
+def test_run_logs_with_deduplicated_snapshots(tmp_path):
+    chronicle = new_chronicle(tmp_path, deduplicate_snapshots=True)
+    chronicle.start_log('')
+
+    snapshot_class = SnapshotClass()
+    for i in range(3):
+        snapshot_class.step()
+
+    record_book = chronicle._active_record_book
+    path = record_book.get_path()
+    report = record_book.get_deduplication_report()
+    chronicle.end_log()
+
+    # The calibration array is stored once, the three snapshots only differ by their small skeletons.
+    assert report['values'] == 6
+    assert report['stored_values'] == 4
+    assert report['saved_bytes'] == 2 * snapshot_class.calibration.nbytes
+
+    record_book = chronicle.open_record_book(path)
+    assert record_book.get_deduplication_report() == report
+
+    objects = [child.get_object() for child in record_book.get_root_entry().children]
+    assert [obj.count for obj in objects] == [1, 2, 3]
+    assert np.array_equal(objects[2].calibration, snapshot_class.calibration)
+
+    with h5py.File(path, 'r') as f:
+        assert len(f['blobs']) == 4
+
+    Chronicle._instance = None
+
+
+class DeltaClass(SnapshotClass):
+    @log_and_record
+    def drop_count(self):
+        del self.count
+
+
+def test_run_logs_with_delta_snapshots(tmp_path):
+    chronicle = new_chronicle(tmp_path, snapshot_mode='delta', snapshot_keyframe_interval=3)
+    chronicle.start_log('')
+
+    delta_class = DeltaClass()
+    for i in range(4):
+        delta_class.step()
+    delta_class.drop_count()
+
+    path = chronicle._active_record_book.get_path()
+    chronicle.end_log()
+
+    record_book = chronicle.open_record_book(path)
+    children = record_book.get_root_entry().children
+    assert [('__object_keyframe__' in record_book.handler.list_records(child.get_path())) for child in children] == \
+           [True, False, False, True, False]
+
+    # The unchanged calibration array is only stored in the keyframes.
+    with h5py.File(path, 'r') as f:
+        assert f[children[1].get_path().as_posix() + '/__object_delta__'][()].nbytes < \
+               delta_class.calibration.nbytes
+
+    objects = [child.get_object() for child in children]
+    assert [obj.__dict__.get('count') for obj in objects] == [1, 2, 3, 4, None]
+    assert np.array_equal(objects[2].calibration, delta_class.calibration)
+
+    # The cached snapshots are copied, so modifying a loaded object does not affect the next loads.
+    objects[1].calibration[0] = -1
+    assert children[2].get_object().calibration[0] == 0
+    record_book._snapshot_cache.clear()
+    assert children[2].get_object().count == 3
+
+    Chronicle._instance = None
+
+
+def test_drop_snapshots_keeps_delta_snapshots(tmp_path):
+    chronicle = new_chronicle(tmp_path, async_write=True, async_queue_size=1, async_backpressure='drop_snapshots',
+                              snapshot_mode='delta', snapshot_keyframe_interval=3)
+    chronicle.start_log('')
+
+    # Slow down the writes, so the queue is full.
+    handler = chronicle._active_record_book.handler
+    add_records = handler.add_records
+    handler.add_records = lambda records: (time.sleep(0.01), add_records(records))
+
+    delta_class = DeltaClass()
+    for i in range(10):
+        delta_class.step()
+
+    statistics = chronicle._active_record_book.get_writer_statistics()
+    path = chronicle._active_record_book.get_path()
+    chronicle.end_log()
+
+    # The keyframes and deltas are not dropped, every snapshot can be rebuilt.
+    assert statistics['max_queue_depth'] > 1
+    assert statistics['dropped_records'] == 0
+
+    record_book = chronicle.open_record_book(path)
+    assert [child.get_object().count for child in record_book.get_root_entry().children] == list(range(1, 11))
+
+    Chronicle._instance = None
+
+
+class PolicyClass(SnapshotClass):
+    _snapshot_policy = SnapshotPolicy(every=2)
+
+    @log_and_record(snapshot_policy=SnapshotPolicy(on_change=True))
+    def check(self):
+        return self.count
+
+    @log_and_record(snapshot_policy=SnapshotPolicy(max_size=1000))
+    def limited_step(self):
+        self.count += 1
+
+    @log_event
+    def log_something(self):
+        return self.count
+
+
+def test_run_logs_with_snapshot_policies(tmp_path):
+    chronicle = new_chronicle(tmp_path)
+    chronicle.start_log('')
+
+    policy_class = PolicyClass()
+    for i in range(3):
+        policy_class.step()
+    for i in range(2):
+        policy_class.check()
+    policy_class.count = 10
+    policy_class.check()
+    policy_class.limited_step()
+    policy_class.log_something()
+
+    path = chronicle._active_record_book.get_path()
+    chronicle.end_log()
+
+    record_book = chronicle.open_record_book(path)
+    children = record_book.get_root_entry().children
+    has_snapshot = ['__object__' in record_book.handler.list_records(child.get_path()) for child in children]
+    # Every other call of step, check when the state changed, never limited_step as the object is too large, and
+    # never for the events.
+    assert has_snapshot == [True, False, True, True, False, True, False, False]
+
+    # The touched attributes are recorded without the snapshot.
+    assert children[6].load_attribute('count') == 11
+    with pytest.raises(KeyError):
+        children[6].get_object()
+
+    Chronicle._instance = None
+
+
+def test_snapshot_policy_interval():
+    policy = SnapshotPolicy(min_interval=3600)
+    first_object, second_object = SnapshotClass(), SnapshotClass()
+
+    assert policy.should_snapshot(first_object)
+    assert not policy.should_snapshot(first_object)
+    # The policy state is kept for each object separately.
+    assert policy.should_snapshot(second_object)
+
+    with pytest.raises(ValueError):
+        SnapshotPolicy(every=0)
+
+
+class ArgumentsClass(LoggableObject):
+    @log_and_record(overwrite_func_name='apply')
+    def apply(self, func, *values, scale=2, **options):
+        return func(values) * scale
+
+    @log_event
+    def configure(self, snapshot_policy, overwrite_func_name=None):
+        return snapshot_policy
+
+
+def test_run_logs_with_keyword_arguments(tmp_path):
+    chronicle = new_chronicle(tmp_path)
+    chronicle.start_log('')
+
+    arguments_class = ArgumentsClass()
+    # The names of the parameters of the decorators can be used by the logged functions as well.
+    assert arguments_class.apply(sum, 1, 2, mode='fast') == 6
+    assert arguments_class.apply(func=len, scale=3) == 0
+    assert arguments_class.configure(snapshot_policy='every') == 'every'
+
+    with pytest.raises(TypeError):
+        arguments_class.apply()
+
+    assert arguments_class.retrieve_args(arguments_class.apply) == {'func': len, 'values': (), 'scale': 3}
+
+    path = chronicle._active_record_book.get_path()
+    chronicle.end_log()
+
+    record_book = chronicle.open_record_book(path)
+    children = record_book.get_root_entry().children
+    assert [child.name for child in children] == ['apply', 'apply', 'ArgumentsClass.configure']
+    assert children[0].load_return_values() == 6
+    assert children[2].load_return_values() == 'every'
+
+    Chronicle._instance = None
+
+
+class WaveformClass(LoggableObject):
+    @log_and_record
+    def play(self, waveform, repeat=1):
+        waveform *= 2
+        return repeat
+
+
+def test_run_logs_with_captured_arguments(tmp_path):
+    chronicle = new_chronicle(tmp_path, write_buffer=True)
+    chronicle.start_log('')
+
+    waveform_class = WaveformClass()
+    waveform = np.arange(10000.)
+    waveform_class.play(waveform, repeat=3)
+
+    # The arguments are captured before the call modifies them.
+    retrieved_args = waveform_class.retrieve_args(waveform_class.play)
+    assert np.array_equal(retrieved_args['waveform'], np.arange(10000.))
+    assert retrieved_args['repeat'] == 3
+
+    path = chronicle._active_record_book.get_path()
+    chronicle.end_log()
+
+    record_book = chronicle.open_record_book(path)
+    entry = record_book.get_root_entry().children[0]
+    args, kwargs = entry.get_args()
+    assert np.array_equal(args[0], np.arange(10000.))
+    assert args[1] == 3 and kwargs == {}
+
+    Chronicle._instance = None
+
+
+def test_load_lazy_attributes(tmp_path):
+    chronicle = new_chronicle(tmp_path)
+    chronicle.start_log('')
+
+    sample_class = SampleClass()
+    sample_class.sample_method_1(1, 2, c=3)
+
+    path = chronicle._active_record_book.get_path()
+    chronicle.end_log()
+
+    record_book = chronicle.open_record_book(path)
+    entry = record_book.get_root_entry().children[0]
+
+    with entry.load_attribute('data', lazy=True) as data:
+        assert data.shape == (20,)
+        assert np.array_equal(data[5:8], np.arange(5, 8))
+    assert entry.get_attribute('ai', lazy=True) == 1
+
+    Chronicle._instance = None
+
+
+class IQClass(LoggableObject):
+    @log_and_record
+    def measure(self, points):
+        self.iq = {'I': np.arange(float(points)), 'Q': np.ones(points), 'meta': {'points': points, 'unit': 'V'}}
+        self.points = points
+        return self.iq['I'], self.iq['Q']
+
+
+@pytest.mark.parametrize('config', [{}, {'write_buffer': True}, {'change_detection': True}])
+def test_run_logs_with_structured_attributes(tmp_path, config):
+    chronicle = new_chronicle(tmp_path, **config)
+    chronicle.start_log('')
+
+    iq_class = IQClass()
+    iq_class.measure(100)
+    iq_class.measure(100)
+
+    path = chronicle._active_record_book.get_path()
+    chronicle.end_log()
+
+    # The dicts are stored as groups, which can be read without the package.
+    with h5py.File(path, 'r') as f:
+        for order in range(2):
+            assert f[f'root/{order}-IQClass.measure/iq'].attrs['__serialization__'] == 'dict'
+            assert f[f'root/{order}-IQClass.measure/iq/meta/unit'][()] == b'V'
+
+    record_book = chronicle.open_record_book(path)
+    entry = record_book.get_root_entry().children[1]
+    iq = entry.load_attribute('iq')
+    assert np.array_equal(iq['I'], np.arange(100.)) and iq['meta'] == {'points': 100, 'unit': 'V'}
+
+    i, q = entry.load_attribute('__return_values__')
+    assert np.array_equal(i, np.arange(100.)) and np.array_equal(q, np.ones(100))
+
+    lazy_iq = entry.load_attribute('iq', lazy=True)
+    with lazy_iq['Q'] as q:
+        assert np.array_equal(q[10:20], np.ones(10))
+    lazy_iq['I'].close()
+    assert np.array_equal(entry.load_attribute('iq/I'), np.arange(100.))
+
+    Chronicle._instance = None
+
+
+class StreamClass(LoggableObject):
+    @log_and_record
+    def acquire(self, log_path=None):
+        stream = self.open_stream('trace', np.float64, chunk_shape=(4, 3))
+        for i in range(5):
+            stream.append(np.full(3, i))
+        stream.append(np.ones((2, 3)))
+
+        if log_path is not None:
+            # The rows are on disk before the function call finishes.
+            with h5py.File(log_path, 'r') as f:
+                assert any(dataset.endswith('/trace') and f[dataset].shape == (7, 3) for dataset in _datasets(f))
+
+        with pytest.raises(ValueError):
+            stream.append(np.ones(4))
+
+        self.count = len(stream)
+        return stream.shape
+
+
+def _datasets(f):
+    names = []
+    f.visit(names.append)
+    return names
+
+
+@pytest.mark.parametrize('write_buffer', [False, True])
+def test_run_logs_with_streams(tmp_path, write_buffer):
+    chronicle = new_chronicle(tmp_path, write_buffer=write_buffer)
+    chronicle.start_log('')
+
+    stream_class = StreamClass()
+    path = chronicle._active_record_book.get_path()
+    assert stream_class.acquire(log_path=str(path)) == (7, 3)
+
+    chronicle.end_log()
+
+    record_book = chronicle.open_record_book(path)
+    entry = record_book.get_root_entry().children[0]
+    assert entry.get_recorded_attribute_names() == ['trace', 'count']
+
+    expected = np.concatenate([np.repeat(np.arange(5.)[:, None], 3, axis=1), np.ones((2, 3))])
+    assert np.array_equal(entry.load_attribute('trace'), expected)
+    assert entry.load_attribute('count') == 7
+    # The stream is not an attribute of the object.
+    assert not hasattr(entry.get_object(), 'trace')
+
+    Chronicle._instance = None
+
+
+def test_stream_without_active_log():
+    Chronicle._instance = None
+
+    # The stream discards the blocks when the object is not being recorded.
+    assert StreamClass().acquire() == (7, 3)
@@ -1,4 +1,7 @@
 import copy
+from unittest.mock import MagicMock
+
+import numpy as np
 import pytest
 
 from labchronicle.core import LoggableObject
@@ -12,6 +15,9 @@ class SampleClass(LoggableObject):
     def another_function(self, x, y=10):
         return x * y
 
+    def variadic_function(self, a, *values, scale=2, **options):
+        return a
+
 
 class TestLoggableObject:
 
@@ -64,6 +70,16 @@ class TestLoggableObject:
 
         assert true_args == {'a': 1, 'b': 5, 'c': 5}  # since default c=5
 
+    def test_rebuild_args_dict_with_variadic_parameters(self):
+        log_obj = LoggableObject()
+        true_args = log_obj._rebuild_args_dict(SampleClass.variadic_function, [1, 2, 3], {'mode': 'fast'})
+
+        assert true_args == {'a': 1, 'values': (2, 3), 'scale': 2, 'mode': 'fast'}
+
+        true_args = log_obj._rebuild_args_dict(SampleClass.variadic_function, [], {'a': 4, 'scale': 3})
+
+        assert true_args == {'a': 4, 'values': (), 'scale': 3}
+
     def test_retrieve_args(self):
         log_obj = LoggableObject()
 
@@ -93,3 +109,90 @@ class TestLoggableObject:
         retrieved_args = log_obj.retrieve_args(SampleClass.sample_function)
 
         assert retrieved_args == {'a': 4, 'b': 5, 'c': 6}
+
+    def test_retrieve_captured_args(self):
+        log_obj = LoggableObject()
+
+        waveform = np.arange(1000.)
+        args, kwargs = log_obj.capture_log_and_record_args([waveform, 2], {'c': [3]})
+        log_obj.register_log_and_record_args(SampleClass.sample_function, args, kwargs, record_details={},
+                                             deepcopy=False)
+        waveform[0] = -1
+
+        retrieved_args = log_obj.retrieve_args(SampleClass.sample_function)
+
+        assert np.array_equal(retrieved_args['a'], np.arange(1000.))
+        assert retrieved_args['b'] == 2 and retrieved_args['c'] == [3]
+        # The arrays are read-only views of the captured arguments.
+        assert not retrieved_args['a'].flags.writeable
+
+    def test_capture_args_not_picklable(self):
+        log_obj = LoggableObject()
+        args, kwargs = log_obj.capture_log_and_record_args([lambda x: x], {})
+
+        assert args[0](1) == 1
+
+    def test_attribute_tracking(self):
+        log_obj = SampleClass()
+        log_obj.x = 1
+        other_obj = SampleClass()
+        record_entry = MagicMock()
+
+        assert '__getattribute__' not in LoggableObject.__dict__
+
+        log_obj.set_record_entry(record_entry)
+        other_obj.set_record_entry(MagicMock())
+        assert '__getattribute__' in LoggableObject.__dict__
+
+        assert log_obj.x == 1
+        log_obj.another_function(1)
+        assert log_obj.hrid
+        log_obj.y = 2
+        assert [call.args[0] for call in record_entry.touch_attribute.call_args_list] == ['x', 'hrid', 'y']
+
+        # Tracking stays enabled until no object is being recorded.
+        log_obj.set_record_entry()
+        assert '__getattribute__' in LoggableObject.__dict__
+        other_obj.set_record_entry()
+        assert '__getattribute__' not in LoggableObject.__dict__
+
+        assert log_obj.x == 1
+        assert record_entry.touch_attribute.call_count == 3
+
+    def test_write_only_tracking(self):
+        class WriteOnlyClass(LoggableObject):
+            _tracking_mode = 'write'
+
+        log_obj = WriteOnlyClass()
+        log_obj.x = 1
+        record_entry = MagicMock()
+
+        log_obj.set_record_entry(record_entry)
+        # Write only objects do not intercept the reads.
+        assert '__getattribute__' not in LoggableObject.__dict__
+
+        log_obj.y = log_obj.x
+        log_obj.set_record_entry()
+
+        assert [call.args for call in record_entry.touch_attribute.call_args_list] == [('y',)]
+
+    def test_declared_tracked_attributes(self):
+        class DeclaredClass(LoggableObject):
+            _tracked_attributes = ['x', 'y']
+            _untracked_attributes = ['y']
+
+        log_obj = DeclaredClass()
+        record_entry = MagicMock()
+
+        log_obj.set_record_entry(record_entry)
+        log_obj.x = 1
+        log_obj.y = 2
+        log_obj.z = log_obj.x + log_obj.y
+        log_obj.set_record_entry()
+
+        assert [call.args[0] for call in record_entry.touch_attribute.call_args_list] == ['x', 'x']
+
+    def test_unknown_tracking_mode(self):
+        with pytest.raises(ValueError, match='Unknown tracking mode'):
+            class InvalidClass(LoggableObject):
+                _tracking_mode = 'read'
@@ -1,5 +1,13 @@
+import os
+import pathlib
+import subprocess
+import sys
+import textwrap
+import uuid
+
 import pytest
-from labchronicle.core import RecordBook
+from labchronicle import Chronicle
+from labchronicle.core import RecordBook, RecordEntry, _open_record_books
 from labchronicle.utils import get_system_info
 
 
@@ -31,3 +39,178 @@ def test_create_and_load_record_book(config):
 
     system_info = get_system_info()
     assert load_record_book._system_info['user'] == system_info['user']
+
+
+class SampleObject:
+    def __init__(self):
+        self.x = 1
+
+
+@pytest.mark.parametrize('metadata_layout', ['datasets', 'attributes'])
+def test_load_tree(config, metadata_layout):
+    record_book = RecordBook(config, enable_write=True)
+
+    for i in range(12):
+        entry = RecordEntry(record_book=record_book, timestamp=i, record_id=f"id-{i}", record_order=i,
+                            base_path=pathlib.Path("/root"), metadata_layout=metadata_layout)
+        entry.set_name(f"f{i}")
+        entry.record_metadata()
+
+    child = RecordEntry(record_book=record_book, timestamp=20, record_id="id-child", record_order=0,
+                        base_path=pathlib.Path("/root/3-f3"), metadata_layout=metadata_layout)
+    child.set_name("child")
+    child.record_metadata()
+    child.touch_attribute("x")
+    child.record_object(SampleObject())
+
+    load_record_book = RecordBook(config, enable_write=False)
+    root = load_record_book.load_tree()
+
+    assert [entry.name for entry in root.children] == [f"f{i}" for i in range(12)]
+    assert [entry.record_id for entry in root.children] == [f"id-{i}" for i in range(12)]
+    assert root.children[3].children[0].name == "child"
+    assert root.children[3].children[0].timestamp == 20
+    assert root.children[3].children[0].get_recorded_attribute_names() == ["x"]
+    assert root.children[3].children[0].load_attribute("x") == 1
+
+    entries = list(load_record_book.iter_entries())
+    assert [entry.name for entry in entries] == ["f0", "f1", "f2", "f3", "child"] + [f"f{i}" for i in range(4, 12)]
+
+
+def write_timed_entries(record_book, record_times):
+    start_time = record_book.get_start_time()
+    for i, record_time in enumerate(record_times):
+        entry = RecordEntry(record_book=record_book, timestamp=record_time - start_time, record_id=f"id-{i}",
+                            record_order=i, base_path=pathlib.Path("/root"))
+        entry.set_name(f"f{i}")
+        entry.record_metadata()
+        entry.record_index()
+
+
+def test_time_index(config):
+    config['index_flush_size'] = 2
+    record_book = RecordBook(config, enable_write=True)
+    start_time = record_book.get_start_time()
+
+    # Records are indexed when they finish, so the record times are not in order.
+    write_timed_entries(record_book, [start_time + 10, start_time + 30, start_time + 20, start_time + 40,
+                                      start_time + 50])
+
+    assert record_book.get_record_by_timestamp(start_time + 25).name == "f2"
+    record_book.close()
+
+    load_record_book = RecordBook(config, enable_write=False)
+    assert load_record_book.get_record_by_timestamp(start_time) is None
+    assert load_record_book.get_record_by_timestamp(start_time + 10).name == "f0"
+    assert load_record_book.get_record_by_timestamp(start_time + 25).name == "f2"
+    assert load_record_book.get_record_by_timestamp(start_time + 100).name == "f4"
+
+    records = load_record_book.get_records_by_time_range(start_time + 15, start_time + 40)
+    assert [record.name for record in records] == ["f2", "f1", "f3"]
+
+
+def test_time_index_without_index_records(config):
+    record_book = RecordBook(config, enable_write=True)
+    start_time = record_book.get_start_time()
+    write_timed_entries(record_book, [start_time + 10, start_time + 20])
+
+    # Drop the pending index, as a record book written before the index was introduced.
+    record_book._index._pending_times = []
+
+    load_record_book = RecordBook(config, enable_write=False)
+    assert load_record_book.get_record_by_timestamp(start_time + 15).name == "f0"
+
+
+def test_record_id_index(config):
+    config['record_id_layout'] = 'index'
+    record_book = RecordBook(config, enable_write=True)
+
+    # The trailing null bytes of the uuids must survive the fixed width storage.
+    record_ids = [str(uuid.UUID(int=i << 8)) for i in range(3)] + ["not-a-uuid"]
+    for i, record_id in enumerate(record_ids):
+        entry = RecordEntry(record_book=record_book, timestamp=i, record_id=record_id, record_order=i,
+                            base_path=pathlib.Path("/root"))
+        entry.set_name(f"f{i}")
+        entry.record_metadata()
+        entry.record_index()
+
+    assert record_book.get_record_by_id(record_ids[1]).name == "f1"
+    record_book.close()
+
+    load_record_book = RecordBook(config, enable_write=False)
+    assert sorted(load_record_book.get_available_record_ids()) == sorted(record_ids)
+    assert [load_record_book.get_record_by_id(record_id).name for record_id in record_ids] == ["f0", "f1", "f2", "f3"]
+
+    # Only the record id that is not a uuid has its own record.
+    assert load_record_book.handler.list_records("/uuid") == ["not-a-uuid"]
+
+
+@pytest.mark.parametrize('record_id_layout', ['datasets', 'index'])
+def test_incomplete_index(config, record_id_layout):
+    config['index_flush_size'] = 2
+    config['record_id_layout'] = record_id_layout
+    record_book = RecordBook(config, enable_write=True)
+    start_time = record_book.get_start_time()
+    write_timed_entries(record_book, [start_time + 10, start_time + 20, start_time + 30, start_time + 40,
+                                      start_time + 50])
+
+    # The process is killed, the last entry is not written to the index.
+    _open_record_books.discard(record_book)
+
+    load_record_book = RecordBook(config, enable_write=False)
+    records = load_record_book.get_records_by_time_range(start_time, start_time + 100)
+    assert [record.name for record in records] == [f"f{i}" for i in range(5)]
+    assert load_record_book.get_record_by_id("id-4").name == "f4"
+    assert sorted(load_record_book.get_available_record_ids()) == [f"id-{i}" for i in range(5)]
+
+
+def test_record_id_lookup_without_index(config, monkeypatch):
+    record_book = RecordBook(config, enable_write=True)
+    write_timed_entries(record_book, [record_book.get_start_time() + 10, record_book.get_start_time() + 20])
+
+    # Drop the pending index, as a record book written before the index was introduced.
+    record_book._index._pending_times = []
+    _open_record_books.discard(record_book)
+
+    # The record ids are found from their own records, without indexing the whole record book.
+    load_record_book = RecordBook(config, enable_write=False)
+    monkeypatch.setattr(load_record_book, "iter_entries", lambda: pytest.fail("The record book is indexed."))
+    assert load_record_book.get_record_by_id("id-1").name == "f1"
+
+    with pytest.raises(KeyError):
+        RecordBook(config, enable_write=False).get_record_by_id("id-2")
+
+
+# A script that writes more records than the flush size of the index and exits without ending the log.
+_script_without_end_log = textwrap.dedent("""
+    import sys
+    from labchronicle import Chronicle, LoggableObject, log_and_record
+
+    class SampleClass(LoggableObject):
+        @log_and_record
+        def sample_method(self, a):
+            self.a = a
+
+    chronicle = Chronicle(config={"log_path": sys.argv[1], "record_id_layout": sys.argv[2]})
+    chronicle.start_log("")
+    for i in range(150):
+        SampleClass().sample_method(i)
+    print(chronicle._active_record_book.get_path())
+""")
+
+
+@pytest.mark.parametrize('record_id_layout', ['datasets', 'index'])
+def test_index_closed_at_exit(tmp_path, record_id_layout):
+    env = dict(os.environ, PYTHONPATH=str(pathlib.Path(__file__).parents[1]))
+    result = subprocess.run([sys.executable, "-c", _script_without_end_log, str(tmp_path), record_id_layout],
+                            capture_output=True, text=True, timeout=60, env=env)
+    assert result.returncode == 0
+
+    Chronicle._instance = None
+    record_book = Chronicle(config={"log_path": str(tmp_path)}).open_record_book(result.stdout.strip())
+    assert record_book.handler.get_record_attributes("/index")["complete"]
+
+    records = record_book.get_records_by_time_range(0, 2 ** 62)
+    assert len(records) == len(record_book.get_available_record_ids()) == 150
+    assert record_book.get_record_by_id(records[-1].record_id).load_attribute("a") == 149
+    Chronicle._instance = None
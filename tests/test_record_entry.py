@@ -6,6 +6,7 @@ from pathlib import Path
 
 from labchronicle.core import RecordEntry
 from labchronicle.core import RecordBook
+from labchronicle.handlers import RecordRows
 
 
 # Mock the RecordBook and its handler
@@ -47,6 +48,22 @@ def test_touch_attribute(sample_record_entry):
     assert "test_attr" in sample_record_entry.get_recorded_attribute_names()
 
 
+def test_touch_attribute_counts(sample_record_entry):
+    sample_record_entry.touch_attribute("b", write=True)
+    sample_record_entry.touch_attribute("a")
+    sample_record_entry.touch_attribute("b")
+    sample_record_entry.touch_attribute("b")
+
+    assert sample_record_entry.get_recorded_attribute_names() == ["b", "a"]
+    assert sample_record_entry.get_recorded_attribute_names(with_counts=True) == {"b": (2, 1), "a": (1, 0)}
+
+
+def test_parse_touched_attributes_without_counts():
+    # Records written before the counts were introduced store the attribute names only.
+    assert RecordEntry._parse_touched_attributes(["a", "b"]) == {"a": None, "b": None}
+    assert RecordEntry._parse_touched_attributes('{"a": [1, 2]}') == {"a": [1, 2]}
+
+
 @patch.object(RecordEntry, "_load_from_path")
 def test_initialization_with_missing_args_raises_assertion(load_mock, mock_record_book):
     with pytest.raises(AssertionError):
@@ -212,3 +229,65 @@ def test_integration_save_load_value(tmp_path):
 
     assert isinstance(loaded_key5, list)
     assert loaded_key5 == [1, 2, 3]
+
+
+def test_allocate_child_order(mock_record_book, sample_record_entry):
+    sample_record_entry.set_name('test_function')
+    handler = mock_record_book.handler
+    handler.list_records.return_value = ["0-child0", "1-child1", "attr1"]
+
+    # A new record entry has no children, it may not be written to the record book yet.
+    assert sample_record_entry.allocate_child_order() == 0
+    assert sample_record_entry.allocate_child_order() == 1
+    handler.list_records.assert_not_called()
+
+    loaded_entry = RecordEntry(record_book=mock_record_book, full_path=Path("/root"))
+    assert loaded_entry.allocate_child_order() == 2
+    assert loaded_entry.allocate_child_order() == 3
+    assert loaded_entry.allocate_child_order() == 4
+
+    # The existing children are only listed once.
+    assert handler.list_records.call_count == 1
+
+
+def test_write_buffer_commit(mock_record_book):
+    entry = RecordEntry(
+        record_book=mock_record_book,
+        timestamp=1234567890,
+        record_id=uuid.uuid4(),
+        record_order=1,
+        base_path=Path("/tmp"),
+        write_buffer=True,
+    )
+    entry.set_name('test_function')
+
+    args = [1, 2]
+    entry.record_args(args, {})
+    entry.record_return_values(3)
+    args.append(3)  # Modifications after saving are not recorded.
+
+    mock_record_book.handler.add_record.assert_not_called()
+    mock_record_book.write_records.assert_not_called()
+
+    entry.commit()
+
+    mock_record_book.write_records.assert_called_once()
+    batch = mock_record_book.write_records.call_args[0][0]
+    assert [path for path, _ in batch] == [
+        entry._get_attribute_path(key) for key in ('__args__', '__kwargs__', '__return_values__')
+    ]
+    assert batch[2][1] == 3
+
+
+@pytest.mark.parametrize('is_async', [False, True])
+def test_write_stream_rows(mock_record_book, sample_record_entry, is_async):
+    mock_record_book.is_async = is_async
+    sample_record_entry.set_name('test_function')
+    rows = RecordRows(np.arange(6.).reshape(2, 3))
+    sample_record_entry.write_stream_rows('trace', rows)
+    rows.rows[:] = 0  # The block of the stream is reused.
+
+    written_rows = mock_record_book.write_records.call_args[0][0][0][1]
+    # The rows are only copied if they are written by the background writer.
+    assert (written_rows is not rows) == is_async
+    assert np.array_equal(written_rows.rows, np.zeros((2, 3)) if not is_async else np.arange(6.).reshape(2, 3))
@@ -0,0 +1,177 @@
+import os
+import pathlib
+import subprocess
+import sys
+import textwrap
+import threading
+
+import pytest
+
+from labchronicle import Chronicle
+from labchronicle.handlers import RecordHandlersBase
+from labchronicle.writer import AsyncRecordWriter
+
+
+class BlockingHandler(RecordHandlersBase):
+    """
+    A handler that stores the written batches, and waits for a release before writing each of them.
+    """
+
+    def __init__(self):
+        super().__init__({})
+        self.batches = []
+        self.release = threading.Event()
+        self.flushed = 0
+
+    def add_records(self, records: list):
+        self.release.wait()
+        self.batches.append(records)
+
+    def flush(self):
+        self.flushed += 1
+
+
+def test_writer_writes_all_batches():
+    handler = BlockingHandler()
+    handler.release.set()
+    writer = AsyncRecordWriter(handler)
+
+    for i in range(10):
+        writer.submit([(f"/root/{i}-a/__name__", "a")])
+
+    writer.flush()
+    assert len(handler.batches) == 10
+    assert handler.flushed == 1
+
+    statistics = writer.get_statistics()
+    assert statistics["queue_depth"] == 0
+    assert statistics["written_batches"] == 10
+    assert statistics["written_records"] == 10
+    assert statistics["mean_write_latency"] >= 0
+
+    writer.close()
+
+
+def test_writer_close_drains_queue():
+    handler = BlockingHandler()
+    writer = AsyncRecordWriter(handler)
+
+    for i in range(5):
+        writer.submit([(f"/root/{i}-a/__name__", "a")])
+
+    handler.release.set()
+    writer.close()
+    assert len(handler.batches) == 5
+
+    with pytest.raises(RuntimeError):
+        writer.submit([("/root/5-a/__name__", "a")])
+
+
+def test_writer_drop_snapshots_when_full():
+    handler = BlockingHandler()
+    writer = AsyncRecordWriter(handler, max_queue_size=1, backpressure="drop_snapshots")
+
+    batch = [("/root/0-a/__name__", "a"), ("/root/0-a/__object__", b"snapshot")]
+    for i in range(4):
+        writer.submit(list(batch))
+
+    statistics = writer.get_statistics()
+    assert statistics["max_queue_depth"] > 1
+    assert statistics["dropped_records"] >= 2
+
+    handler.release.set()
+    writer.close()
+
+    assert sum(len(records) for records in handler.batches) == 8 - writer.get_statistics()["dropped_records"]
+
+
+def test_writer_drop_snapshots_keeps_delta_snapshots():
+    handler = BlockingHandler()
+    writer = AsyncRecordWriter(handler, max_queue_size=1, backpressure="drop_snapshots")
+
+    batch = [("/root/0-a/__object_keyframe__", b"keyframe"), ("/root/1-a/__object_delta__", b"delta"),
+             ("/root/1-a/__object__", b"snapshot")]
+    for i in range(4):
+        writer.submit(list(batch))
+
+    handler.release.set()
+    writer.close()
+
+    # Only the full snapshots are dropped, the delta encoded snapshots depend on each other.
+    assert writer.get_statistics()["dropped_records"] >= 2
+    written_names = [pathlib.PurePosixPath(path).name for records in handler.batches for path, _ in records]
+    assert written_names.count("__object_keyframe__") == 4
+    assert written_names.count("__object_delta__") == 4
+
+
+def test_writer_grow_when_full():
+    handler = BlockingHandler()
+    writer = AsyncRecordWriter(handler, max_queue_size=1, backpressure="grow")
+
+    for i in range(5):
+        writer.submit([(f"/root/{i}-a/__object__", b"snapshot")])
+
+    assert writer.get_statistics()["max_queue_depth"] >= 4
+
+    handler.release.set()
+    writer.close()
+    assert len(handler.batches) == 5
+    assert writer.get_statistics()["dropped_records"] == 0
+
+
+def test_writer_block_when_full():
+    handler = BlockingHandler()
+    writer = AsyncRecordWriter(handler, max_queue_size=1, backpressure="block")
+
+    submitter = threading.Thread(target=lambda: [writer.submit([(f"/root/{i}-a/__name__", "a")]) for i in range(5)])
+    submitter.start()
+    submitter.join(timeout=0.2)
+
+    # The submitter is blocked by the full queue.
+    assert submitter.is_alive()
+    assert writer.get_statistics()["queue_depth"] <= 1
+
+    handler.release.set()
+    submitter.join()
+    writer.close()
+    assert len(handler.batches) == 5
+
+
+def test_writer_invalid_backpressure_policy():
+    with pytest.raises(ValueError):
+        AsyncRecordWriter(BlockingHandler(), backpressure="invalid")
+
+
+# A script that logs with the async writer and exits without ending the log.
+_script_without_end_log = textwrap.dedent("""
+    import sys
+    from labchronicle import Chronicle, LoggableObject, log_and_record
+
+    class SampleClass(LoggableObject):
+        @log_and_record
+        def sample_method(self, a):
+            self.a = a
+
+    chronicle = Chronicle(config={"log_path": sys.argv[1], "async_write": True})
+    chronicle.start_log("")
+    for i in range(3):
+        SampleClass().sample_method(i)
+    print(chronicle._active_record_book.get_path())
+
+    if sys.argv[2] == "error":
+        raise RuntimeError("The script failed.")
+""")
+
+
+@pytest.mark.parametrize("ending", ["normal", "error"])
+def test_writer_closed_at_exit(tmp_path, ending):
+    env = dict(os.environ, PYTHONPATH=str(pathlib.Path(__file__).parents[1]))
+    result = subprocess.run([sys.executable, "-c", _script_without_end_log, str(tmp_path), ending],
+                            capture_output=True, text=True, timeout=20, env=env)
+    assert result.returncode == (0 if ending == "normal" else 1)
+
+    # The queued records are written before the interpreter exits.
+    Chronicle._instance = None
+    record_book = Chronicle(config={"log_path": str(tmp_path)}).open_record_book(result.stdout.strip())
+    assert [child.load_attribute("a") for child in record_book.get_root_entry().children] == [0, 1, 2]
+    Chronicle._instance = None